@@ -0,0 +1,3 @@
+from .rcon_server import FakeRconServer
+from .log_writer import SyntheticLogWriter, LogTraffic
+from .telegram_api import FakeTelegramAPI
@@ -0,0 +1,94 @@
+import random
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+# Relative weights of the generated traffic, roughly what a busy survival server logs
+DEFAULT_MIX = {"join": 2, "leave": 2, "chat": 20, "command": 5, "error": 1, "spam": 70}
+
+_PLAYERS = ["Steve", "Alex", "Notch", "jeb_", "Dinnerbone", "Grumm", "xX_Miner_Xx", "Builder42"]
+_CHAT = ["hi", "anyone got iron?", "brb", "lag?", "gg", "where is the nether portal", "lol"]
+_COMMANDS = ["/home", "/spawn", "/tpa Steve", "/msg Alex hey", "/sethome base"]
+_SPAM = [
+    "Can't keep up! Is the server overloaded? Running 2046ms or 40 ticks behind",
+    "{player} moved too quickly! 3.51,0.0,2.2",
+    "{player} moved wrongly!",
+    "Saving chunks for level 'ServerLevel[world]'/minecraft:overworld",
+    "ThreadedAnvilChunkStorage (world): All chunks are saved",
+]
+_ERRORS = [
+    "Encountered an unexpected exception",
+    "Failed to handle packet for /127.0.0.1:51234",
+    "Couldn't load chunk [12, -7]",
+]
+
+
+class LogTraffic:
+    """Generates realistic vanilla log lines with a deterministic random mix."""
+
+    def __init__(self, mix: Optional[dict[str, float]] = None, seed: int = 42):
+        self.mix = mix or DEFAULT_MIX
+        self._kinds = list(self.mix)
+        self._weights = [self.mix[k] for k in self._kinds]
+        self._rng = random.Random(seed)
+
+    def _prefix(self, thread: str = "Server thread", level: str = "INFO") -> str:
+        return f"[{datetime.now().strftime('%H:%M:%S')}] [{thread}/{level}]: "
+
+    def line(self, kind: Optional[str] = None) -> str:
+        kind = kind or self._rng.choices(self._kinds, self._weights)[0]
+        player = self._rng.choice(_PLAYERS)
+        if kind == "join":
+            return f"{self._prefix()}{player} joined the game"
+        if kind == "leave":
+            return f"{self._prefix()}{player} left the game"
+        if kind == "chat":
+            return f"{self._prefix('Async Chat Thread - #0')}<{player}> {self._rng.choice(_CHAT)}"
+        if kind == "command":
+            return f"{self._prefix()}{player} issued server command: {self._rng.choice(_COMMANDS)}"
+        if kind == "error":
+            return f"{self._prefix(level='ERROR')}{self._rng.choice(_ERRORS)}"
+        if kind == "done":
+            return f"{self._prefix()}Done (12.345s)! For help, type \"help\""
+        return f"{self._prefix(level='WARN')}{self._rng.choice(_SPAM).format(player=player)}"
+
+    def lines(self, count: int) -> list[str]:
+        return [self.line() for _ in range(count)]
+
+
+class SyntheticLogWriter:
+    """Appends generated traffic to a log file, either at once or at a fixed rate in a thread."""
+
+    def __init__(self, path: Path, traffic: Optional[LogTraffic] = None):
+        self.path = Path(path)
+        self.traffic = traffic or LogTraffic()
+        self.lines_written = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.touch()
+
+    def write(self, lines: list[str]):
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write("".join(f"{line}\n" for line in lines))
+        self.lines_written += len(lines)
+
+    def start(self, lines_per_second: float, tick: float = 0.05):
+        """Writes lines_per_second lines per second in batches every 'tick' seconds until stop()."""
+        def run():
+            carry = 0.0
+            while not self._stop.wait(tick):
+                carry += lines_per_second * tick
+                batch, carry = int(carry), carry - int(carry)
+                if batch:
+                    self.write(self.traffic.lines(batch))
+
+        self._thread = threading.Thread(target=run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
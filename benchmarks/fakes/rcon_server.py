@@ -0,0 +1,119 @@
+import logging
+import socketserver
+import struct
+import threading
+import time
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Packet types of the RCON protocol
+TYPE_RESPONSE = 0
+TYPE_COMMAND = 2
+TYPE_LOGIN = 3
+
+# Vanilla splits responses into packets of at most 4096 payload bytes
+MAX_PAYLOAD = 4096
+
+
+def encode_packet(request_id: int, packet_type: int, body: str | bytes) -> bytes:
+    payload = body.encode("utf-8") if isinstance(body, str) else body
+    packet = struct.pack("<ii", request_id, packet_type) + payload + b"\x00\x00"
+    return struct.pack("<i", len(packet)) + packet
+
+
+class _RconHandler(socketserver.BaseRequestHandler):
+    server: "_RconTCPServer"
+
+    def _read_exactly(self, length: int) -> Optional[bytes]:
+        data = b""
+        while len(data) < length:
+            chunk = self.request.recv(length - len(data))
+            if not chunk:
+                return None
+            data += chunk
+        return data
+
+    def handle(self):
+        fake: FakeRconServer = self.server.fake
+        authenticated = False
+        while True:
+            header = self._read_exactly(4)
+            if header is None:
+                return
+            (length,) = struct.unpack("<i", header)
+            packet = self._read_exactly(length)
+            if packet is None:
+                return
+            request_id, packet_type = struct.unpack("<ii", packet[:8])
+            body = packet[8:-2].decode("utf-8")
+
+            if packet_type == TYPE_LOGIN:
+                authenticated = body == fake.password
+                self.request.sendall(encode_packet(request_id if authenticated else -1, TYPE_COMMAND, ""))
+            elif packet_type == TYPE_COMMAND:
+                if not authenticated:
+                    self.request.sendall(encode_packet(-1, TYPE_RESPONSE, ""))
+                    continue
+                if fake.latency:
+                    time.sleep(fake.latency)
+                response = fake.respond(body).encode("utf-8")
+                chunks = [response[i:i + MAX_PAYLOAD] for i in range(0, len(response), MAX_PAYLOAD)] or [b""]
+                # All fragments in one write, so the client sees them as one multi-packet reply
+                self.request.sendall(b"".join(encode_packet(request_id, TYPE_RESPONSE, c) for c in chunks))
+
+
+class _RconTCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, fake: "FakeRconServer"):
+        self.fake = fake
+        super().__init__(address, _RconHandler)
+
+
+class FakeRconServer:
+    """
+    A local RCON server speaking the Minecraft protocol, with password auth,
+    multi-packet replies and an injectable per-command latency.
+    """
+
+    def __init__(self, password: str = "bench", host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 responses: Optional[dict[str, str | Callable[[str], str]]] = None):
+        self.password = password
+        self.latency = latency
+        self.responses = {"list": "There are 0 of a max of 20 players online: ", **(responses or {})}
+        self.commands: list[str] = []
+        self._lock = threading.Lock()
+        self._server = _RconTCPServer((host, port), self)
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-rcon", daemon=True)
+
+    @property
+    def host(self) -> str:
+        return self._server.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def respond(self, command: str) -> str:
+        """Returns the reply for a command, looked up by its first word."""
+        with self._lock:
+            self.commands.append(command)
+        name = command.split(maxsplit=1)[0] if command.strip() else ""
+        response = self.responses.get(name, "")
+        return response(command) if callable(response) else response
+
+    def start(self) -> "FakeRconServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeRconServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
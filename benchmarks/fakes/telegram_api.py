@@ -0,0 +1,103 @@
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import parse_qsl
+
+_BOT_USER = {"id": 1, "is_bot": True, "first_name": "Bench", "username": "bench_bot"}
+
+
+@dataclass
+class ApiCall:
+    method: str
+    params: dict
+    received_at: float  # time.perf_counter() when the request was read
+
+
+class FakeTelegramAPI:
+    """
+    A local stand-in for the Bot API. Point a bot at it with
+    Bot(token, base_url=api.base_url) and inspect the recorded calls.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.calls: list[ApiCall] = []
+        self._message_id = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._changed = asyncio.Condition()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self._server.sockets[0].getsockname()[1]}/bot"
+
+    async def start(self) -> "FakeTelegramAPI":
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "FakeTelegramAPI":
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    def sent_messages(self) -> list[ApiCall]:
+        return [call for call in self.calls if call.method == "sendMessage"]
+
+    async def wait_for_messages(self, count: int, timeout: float = 5.0):
+        """Waits until at least 'count' messages were sent."""
+        async with self._changed:
+            await asyncio.wait_for(self._changed.wait_for(lambda: len(self.sent_messages()) >= count), timeout)
+
+    def _result(self, method: str, params: dict):
+        if method == "getMe":
+            return _BOT_USER
+        if method == "sendMessage":
+            self._message_id += 1
+            chat_id = int(params.get("chat_id", 0))
+            return {"message_id": self._message_id, "date": int(time.time()), "text": params.get("text", ""),
+                    "chat": {"id": chat_id, "type": "private"}, "from": _BOT_USER}
+        return True
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # Keep-alive: the HTTP client reuses the connection for many calls
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    return
+                headers = {}
+                while (line := await reader.readline()).strip():
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                received_at = time.perf_counter()
+
+                method = request_line.decode("latin-1").split()[1].rsplit("/", 1)[-1]
+                if headers.get("content-type", "").startswith("application/json"):
+                    params = json.loads(body or b"{}")
+                else:
+                    params = dict(parse_qsl(body.decode("utf-8")))
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+
+                payload = json.dumps({"ok": True, "result": self._result(method, params)}).encode("utf-8")
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                             + f"Content-Length: {len(payload)}\r\n\r\n".encode("latin-1") + payload)
+                await writer.drain()
+                async with self._changed:
+                    self.calls.append(ApiCall(method, params, received_at))
+                    self._changed.notify_all()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
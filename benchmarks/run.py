@@ -0,0 +1,179 @@
+"""
+End-to-end benchmarks of the bot's hot paths against local stand-ins.
+
+    python -m benchmarks.run                     # run and compare with the baseline
+    python -m benchmarks.run --update-baseline   # store the results as the new baseline
+"""
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from telegram import Bot
+from watchdog.events import FileModifiedEvent
+
+from src.config_models import ServerConfig
+from src.mc_service.command_service import CommandService
+from src.mc_service.services import MinecraftServerController
+from src.metrics.tracing import percentile
+from src.server_log.log_watcher import LogFileHandler, start_watching, stop_watching
+from src.server_log.state_manager import StateManager
+from .fakes import FakeRconServer, FakeTelegramAPI, LogTraffic, SyntheticLogWriter
+
+BASELINE_FILE = Path(__file__).with_name("baseline.json")
+# A result this much worse than the baseline counts as a regression
+DEFAULT_TOLERANCE = 0.25
+
+
+@dataclass(frozen=True)
+class Metric:
+    name: str
+    unit: str
+    higher_is_better: bool
+
+
+METRICS = {m.name: m for m in (
+    Metric("rcon_commands_per_second", "cmd/s", True),
+    Metric("rcon_p99_ms", "ms", False),
+    Metric("log_lines_per_second", "lines/s", True),
+    Metric("notify_p50_ms", "ms", False),
+    Metric("notify_p95_ms", "ms", False),
+)}
+
+
+def _server_config(server_dir: Path, rcon: FakeRconServer) -> ServerConfig:
+    return ServerConfig(dir=str(server_dir), jar="server.jar", min_gb=1, max_gb=1, screen_name="bench",
+                        rcon_host=rcon.host, rcon_port=rcon.port, rcon_password=rcon.password)
+
+
+async def bench_rcon_commands(server_dir: Path, commands: int, latency: float) -> dict[str, float]:
+    """Commands per second through CommandService, one RCON connection per command like in production."""
+    with FakeRconServer(latency=latency) as rcon:
+        command_service = CommandService(MinecraftServerController(_server_config(server_dir, rcon)))
+        durations = []
+        start = time.perf_counter()
+        for i in range(commands):
+            t0 = time.perf_counter()
+            if await command_service.say(f"benchmark {i}") is False:
+                raise RuntimeError("RCON command failed during the benchmark.")
+            durations.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - start
+    return {"rcon_commands_per_second": commands / elapsed,
+            "rcon_p99_ms": percentile(sorted(durations), 99) * 1000}
+
+
+def bench_log_throughput(server_dir: Path, lines: int) -> dict[str, float]:
+    """Log lines per second from the file through LogFileHandler and the parser into the StateManager."""
+    log_path = server_dir / "logs" / "latest.log"
+    writer = SyntheticLogWriter(log_path)
+    handler = LogFileHandler(str(log_path), StateManager())
+    writer.write(writer.traffic.lines(lines))
+
+    start = time.perf_counter()
+    handler.on_modified(FileModifiedEvent(handler.file_path))
+    elapsed = time.perf_counter() - start
+    return {"log_lines_per_second": lines / elapsed}
+
+
+async def bench_event_to_notification(server_dir: Path, events: int, background_rate: float) -> dict[str, float]:
+    """
+    Time from a 'Done' line being written to the ready notification reaching the Telegram API,
+    through the watchdog observer, the StateManager callback and the bot, with spam in the background.
+    """
+    log_path = server_dir / "logs" / "notify.log"
+    writer = SyntheticLogWriter(log_path, LogTraffic(seed=7))
+    state_manager = StateManager()
+    state_manager.set_event_loop(asyncio.get_running_loop())
+
+    async with FakeTelegramAPI() as api:
+        bot = Bot("123456:bench", base_url=api.base_url)
+        async with bot:
+            async def on_ready():
+                await bot.send_message(chat_id=1, text="🚀 Server is now ready and accepting players!")
+            state_manager.register_ready_callback(on_ready)
+
+            observer = start_watching(str(log_path), state_manager)
+            writer.start(background_rate)
+            latencies = []
+            try:
+                for i in range(events):
+                    state_manager.reset()
+                    written_at = time.perf_counter()
+                    writer.write([writer.traffic.line("done")])
+                    await api.wait_for_messages(i + 1)
+                    latencies.append(api.sent_messages()[i].received_at - written_at)
+                    await asyncio.sleep(0.02)
+            finally:
+                writer.stop()
+                stop_watching(observer)
+
+    latencies.sort()
+    return {"notify_p50_ms": statistics.median(latencies) * 1000,
+            "notify_p95_ms": percentile(latencies, 95) * 1000}
+
+
+async def run_suite(quick: bool = False) -> dict[str, float]:
+    """Runs all benchmarks, 'quick' uses small sizes for smoke tests."""
+    scale = 0.05 if quick else 1
+    with tempfile.TemporaryDirectory() as tmp:
+        server_dir = Path(tmp)
+        results = {}
+        results.update(await bench_rcon_commands(server_dir, commands=max(int(500 * scale), 5), latency=0.0))
+        results.update(bench_log_throughput(server_dir, lines=max(int(200_000 * scale), 100)))
+        results.update(await bench_event_to_notification(server_dir, events=max(int(40 * scale), 2),
+                                                         background_rate=500))
+    return results
+
+
+def compare(results: dict[str, float], baseline: dict[str, float],
+            tolerance: float = DEFAULT_TOLERANCE) -> list[str]:
+    """Returns a description of every metric that is worse than the baseline by more than 'tolerance'."""
+    regressions = []
+    for name, value in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        metric = METRICS[name]
+        change = (value - reference) / reference
+        worse = -change if metric.higher_is_better else change
+        if worse > tolerance:
+            regressions.append(f"{name}: {value:.1f} {metric.unit} vs. baseline {reference:.1f} "
+                               f"({worse:.0%} worse)")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--update-baseline", action="store_true", help="store the results as the new baseline")
+    arg_parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                            help="allowed relative slowdown before a result counts as a regression")
+    arg_parser.add_argument("--quick", action="store_true", help="run with small sizes, e.g. as a smoke test")
+    args = arg_parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    results = asyncio.run(run_suite(quick=args.quick))
+    for name, value in results.items():
+        print(f"{name:<28} {value:>12.1f} {METRICS[name].unit}")
+
+    if args.update_baseline:
+        BASELINE_FILE.write_text(json.dumps({k: round(v, 2) for k, v in results.items()}, indent=2) + "\n")
+        print(f"Baseline written to {BASELINE_FILE}.")
+        return 0
+
+    if not BASELINE_FILE.exists():
+        print("No baseline yet, run with --update-baseline to create one.")
+        return 0
+    regressions = compare(results, json.loads(BASELINE_FILE.read_text()), args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,11 @@
+import time
+# Taken before the other imports, so the startup profile includes them
+_STARTED_AT = time.perf_counter()
+
 import os
 import logging
 import asyncio
+from typing import Optional
 
 from dotenv import load_dotenv, find_dotenv
 
@@ -9,6 +14,7 @@ from src.mc_service.services import MinecraftServerController
 from src.server_log.state_manager import StateManager
 from src.telegram_bot.core import TelegramBot
 from src.server_log.log_watcher import stop_watching
+from src.metrics.startup import StartupProfile
 
 
 logging.basicConfig(level=logging.INFO,
@@ -21,29 +27,50 @@ logger = logging.getLogger(__name__)
 load_dotenv(find_dotenv())
 _TOKEN = os.getenv("BOT_TOKEN")
 
+startup = StartupProfile(_STARTED_AT)
+startup.record("imports", _STARTED_AT, time.perf_counter())
+
+def _on_state_sync_done(task: asyncio.Task):
+    """Logs the startup profile once the background state sync, the last startup phase, is done."""
+    if not task.cancelled() and task.exception():
+        logger.error("Initial state sync failed.", exc_info=task.exception())
+    logger.info(startup.report())
+
+async def _initial_state_sync(bot: TelegramBot, msc: MinecraftServerController):
+    server_running = await startup.run("rcon:probe", asyncio.to_thread(lambda: msc.is_running))
+    await bot.initial_state_sync(server_running)
+
 async def main():
     if not _TOKEN:
         logger.critical("BOT_TOKEN not found in environment variables. Please check your .env file.")
         exit(1)
     
-    config = load_config()
-    msc = MinecraftServerController(config.mc)
-    state_manager = StateManager()
-    
+    with startup.phase("config"):
+        config = load_config()
+    with startup.phase("setup"):
+        msc = MinecraftServerController(config.mc)
+        state_manager = StateManager()
+        bot = TelegramBot(token=_TOKEN, msc=msc, state_manager=state_manager, config=config)
+
     shutdown_event = asyncio.Event()
-    bot = TelegramBot(token=_TOKEN, msc=msc, state_manager=state_manager, config=config)
-    
+    # Store the shutdown event in bot_data for handlers to access
+    bot.application.bot_data["shutdown_event"] = shutdown_event
+    state_sync: Optional[asyncio.Task] = None
+
     try:
-        # Initialize the bot and its components (e.g., post_init)
-        await bot.application.initialize()
-        # Sync state if the server is already running
-        await bot.initial_state_sync()
-        # Store the shutdown event in bot_data for handlers to access
-        bot.application.bot_data["shutdown_event"] = shutdown_event
-        # Start the bot in the background
-        await bot.application.start()
-        # Start polling for updates
-        await bot.application.updater.start_polling()
+        await startup.run("telegram:initialize", bot.application.initialize())
+        # post_init is only run automatically by run_polling(), so run it explicitly here
+        await startup.run("post_init", bot.application.post_init(bot.application))
+        # Start the bot in the background and poll for updates
+        await startup.run("telegram:start", bot.application.start())
+        await startup.run("telegram:polling", bot.application.updater.start_polling())
+        startup.mark_ready()
+
+        # The RCON probe, restoring the state, backfilling the log and the RCON player check continue
+        # while commands are answered
+        state_sync = asyncio.create_task(startup.run("state_sync", _initial_state_sync(bot, msc)),
+                                         name="initial-state-sync")
+        state_sync.add_done_callback(_on_state_sync_done)
         # Keep the main coroutine alive until a shutdown is signaled
         await shutdown_event.wait()
             
@@ -51,6 +78,10 @@ async def main():
         logger.info("Shutdown signal received. Stopping services...")
     
     finally:
+        if state_sync and not state_sync.done():
+            state_sync.cancel()
+        # Stop background services like the scheduler
+        await bot.shutdown()
         # Gracefully stop the bot's updater and application
         if bot.application.updater and bot.application.updater._running:
             await bot.application.updater.stop()
@@ -60,13 +91,15 @@ async def main():
         # Ensure a clean shutdown of the Minecraft server and watchdog
         if msc.is_running:
             logger.info("Minecraft server is running, initiating shutdown.")
-            # Stop the log watcher before stopping the server
-            observer = bot.application.bot_data.get("watchdog_observer")
-            if observer:
-                stop_watching(observer)
-            
-            await asyncio.to_thread(msc.stop)
-            logger.info("Minecraft server stopped.")
+            # Waits until the server process has exited, escalating if necessary
+            result = await bot.stop_server()
+            logger.info(f"Minecraft server stopped: success={result.success}, took {result.duration:.1f}s.")
+
+        # Stop the log watcher if it is still running
+        observer = bot.application.bot_data.get("watchdog_observer")
+        if observer:
+            stop_watching(observer)
+        bot.application.bot_data["store"].close()
         logger.info("Application has been shut down gracefully.")
 
 if __name__ == "__main__":
@@ -0,0 +1,267 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, astuple
+from datetime import datetime
+from typing import Optional
+
+from src.config_models import AnalyticsConfig
+from src.server_log.parser import LogPattern
+
+logger = logging.getLogger(__name__)
+
+EXPORT_VERSION = 1
+OTHER_COMMANDS = "other"
+
+_SESSION_END_EVENTS = (LogPattern.USER_LOGOUT, LogPattern.PLAYER_DISCONNECTED)
+
+
+class BucketSeries:
+    """
+    A fixed number of consecutive time buckets (hours or days) in a ring.
+    Each slot remembers which bucket it holds and is reset when it is reused for a newer one.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.keys = [-1] * size
+        self.events = [0] * size
+        self.peaks = [0] * size
+
+    def _slot(self, key: int) -> int:
+        i = key % self.size
+        if self.keys[i] != key:
+            self.keys[i], self.events[i], self.peaks[i] = key, 0, 0
+        return i
+
+    def add(self, key: int, events: int = 1):
+        self.events[self._slot(key)] += events
+
+    def peak(self, key: int, players: int):
+        i = self._slot(key)
+        self.peaks[i] = max(self.peaks[i], players)
+
+    def get(self, key: int) -> tuple[int, int]:
+        """Returns (events, peak players) of a bucket, zeros if it is not in the ring (anymore)."""
+        i = key % self.size
+        return (self.events[i], self.peaks[i]) if self.keys[i] == key else (0, 0)
+
+    def series(self, last_key: int) -> tuple[list[int], list[int]]:
+        """Returns the events and peaks of the 'size' buckets up to and including 'last_key', oldest first."""
+        buckets = [self.get(key) for key in range(last_key - self.size + 1, last_key + 1)]
+        return [b[0] for b in buckets], [b[1] for b in buckets]
+
+    def load(self, last_key: int, events: list[int], peaks: list[int]):
+        """Restores a series as returned by series(), dropping what does not fit."""
+        first_key = last_key - len(events) + 1
+        for key, e, p in zip(range(first_key, last_key + 1), events, peaks):
+            if key > last_key - self.size and (e or p):
+                i = self._slot(key)
+                self.events[i], self.peaks[i] = e, p
+
+
+@dataclass
+class PlayerStats:
+    joins: int = 0
+    chats: int = 0
+    commands: int = 0
+    online_seconds: float = 0.0
+
+
+def _hour_key(ts: float) -> int:
+    return int(ts // 3600)
+
+
+def _day_key(ts: float) -> int:
+    return datetime.fromtimestamp(ts).toordinal()
+
+
+def command_name(command: str) -> str:
+    """'/tp Steve 0 64 0' -> 'tp'"""
+    parts = command.strip().lstrip("/").split(maxsplit=1)
+    return parts[0].lower() if parts else ""
+
+
+class ActivityStats:
+    """
+    Player and command analytics, updated incrementally from parsed log events.
+
+    Everything is kept in fixed-size structures: ring buffers of hourly and daily buckets
+    (events and peak concurrent players), a weekday x hour heatmap and counters per player
+    and command. Reads never rescan the log and only touch these buckets.
+    """
+
+    def __init__(self, config: AnalyticsConfig):
+        self.config = config
+        self._lock = threading.Lock()
+        self.hourly = BucketSeries(config.hours)
+        self.daily = BucketSeries(config.days)
+        # Events per local weekday (Monday first) and hour of the day, over all time
+        self.heatmap = [[0] * 24 for _ in range(7)]
+        self.players: dict[str, PlayerStats] = {}
+        self.commands: dict[str, int] = {}
+        # Players online and since when, to add up their online time
+        self.online: dict[str, float] = {}
+        self.peak_players = 0
+        self.peak_at: Optional[float] = None
+        self._last_hour: Optional[int] = None
+        self._changed = False
+
+    # --- Updates (log watcher thread) ---
+
+    def on_log_event(self, event_type: LogPattern, data: dict):
+        """StateManager listener that counts joins, chat messages and commands."""
+        if event_type not in (LogPattern.USER_LOGIN, LogPattern.PLAYER_CHAT, LogPattern.USER_COMMAND,
+                              LogPattern.SERVER_STOPPING, *_SESSION_END_EVENTS):
+            return
+        self.record(event_type, data, time.time())
+
+    def record(self, event_type: LogPattern, data: dict, now: float):
+        with self._lock:
+            self._advance(now)
+            player = data.get("username")
+            if event_type == LogPattern.SERVER_STOPPING:
+                for name in list(self.online):
+                    self._leave(name, now)
+            elif event_type in _SESSION_END_EVENTS:
+                self._leave(player, now)
+            else:
+                stats = self.players.setdefault(player, PlayerStats())
+                if event_type == LogPattern.USER_LOGIN:
+                    stats.joins += 1
+                    self._leave(player, now)
+                    self.online[player] = now
+                    self._update_peak(now)
+                elif event_type == LogPattern.PLAYER_CHAT:
+                    stats.chats += 1
+                else:
+                    stats.commands += 1
+                    self._count_command(command_name(data.get("command", "")))
+                self._count_event(now)
+            self._changed = True
+
+    def _count_event(self, now: float):
+        self.hourly.add(_hour_key(now))
+        self.daily.add(_day_key(now))
+        local = datetime.fromtimestamp(now)
+        self.heatmap[local.weekday()][local.hour] += 1
+
+    def _count_command(self, name: str):
+        if not name:
+            return
+        if name not in self.commands and len(self.commands) >= self.config.max_commands:
+            # Bounds the counters if players try lots of unknown commands
+            name = OTHER_COMMANDS
+        self.commands[name] = self.commands.get(name, 0) + 1
+
+    def _leave(self, player: Optional[str], now: float):
+        joined_at = self.online.pop(player, None)
+        if joined_at is not None:
+            self.players.setdefault(player, PlayerStats()).online_seconds += max(now - joined_at, 0)
+
+    def _update_peak(self, now: float):
+        count = len(self.online)
+        self.hourly.peak(_hour_key(now), count)
+        self.daily.peak(_day_key(now), count)
+        if count > self.peak_players:
+            self.peak_players, self.peak_at = count, now
+
+    def _advance(self, now: float):
+        """Carries the players still online into the hours that passed without events."""
+        hour = _hour_key(now)
+        if self._last_hour is not None and hour > self._last_hour and self.online:
+            for key in range(max(self._last_hour + 1, hour - self.hourly.size + 1), hour + 1):
+                self.hourly.peak(key, len(self.online))
+                self.daily.peak(_day_key(key * 3600), len(self.online))
+        self._last_hour = hour
+
+    # --- Reads ---
+
+    def overview(self, now: Optional[float] = None) -> dict:
+        """The numbers shown by /stats."""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._advance(now)
+            hourly_events, hourly_peaks = self.hourly.series(_hour_key(now))
+            day_events, day_peak = self.daily.get(_day_key(now))
+            top = self.config.top
+            by_online_time = sorted(self.players.items(), key=lambda item: self._online_seconds(*item, now),
+                                    reverse=True)[:top]
+            return {
+                "online": len(self.online),
+                "peak_today": day_peak,
+                "peak_all_time": self.peak_players,
+                "peak_at": self.peak_at,
+                "events_24h": sum(hourly_events[-24:]),
+                "peak_24h": max(hourly_peaks[-24:], default=0),
+                "events_today": day_events,
+                "top_players": [(name, self._online_seconds(name, stats, now), stats)
+                                for name, stats in by_online_time],
+                "top_commands": sorted(self.commands.items(), key=lambda item: item[1], reverse=True)[:top],
+                "heatmap": [row[:] for row in self.heatmap],
+            }
+
+    def player(self, name: str, now: Optional[float] = None) -> Optional[tuple[str, PlayerStats, float, bool]]:
+        """Returns (name as logged, stats, online seconds, online now) for a case-insensitive name."""
+        now = time.time() if now is None else now
+        with self._lock:
+            match = next((n for n in self.players if n.lower() == name.lower()), None)
+            if match is None:
+                return None
+            stats = self.players[match]
+            return match, PlayerStats(*astuple(stats)), self._online_seconds(match, stats, now), match in self.online
+
+    def _online_seconds(self, name: str, stats: PlayerStats, now: float) -> float:
+        joined_at = self.online.get(name)
+        return stats.online_seconds + (max(now - joined_at, 0) if joined_at is not None else 0)
+
+    # --- Export ---
+
+    def export(self, now: Optional[float] = None) -> dict:
+        """
+        A compact, JSON serializable snapshot for charting elsewhere and for persisting.
+        Series are plain arrays, oldest first, ending with the bucket of 'hour_end' / 'day_end'
+        (hours since the epoch, proleptic Gregorian ordinals of local dates).
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            hour_end, day_end = _hour_key(now), _day_key(now)
+            hourly_events, hourly_peaks = self.hourly.series(hour_end)
+            daily_events, daily_peaks = self.daily.series(day_end)
+            return {
+                "version": EXPORT_VERSION,
+                "hour_end": hour_end,
+                "hourly": {"events": hourly_events, "peak": hourly_peaks},
+                "day_end": day_end,
+                "daily": {"events": daily_events, "peak": daily_peaks},
+                "heatmap": [row[:] for row in self.heatmap],
+                # [joins, chats, commands, online seconds]
+                "players": {name: [s.joins, s.chats, s.commands, round(s.online_seconds)]
+                            for name, s in self.players.items()},
+                "commands": dict(self.commands),
+                "online": dict(self.online),
+                "peak": [self.peak_players, self.peak_at],
+            }
+
+    def export_if_changed(self) -> Optional[dict]:
+        """Returns an export if anything was recorded since the last call, for the store's log batches."""
+        if not self._changed:
+            return None
+        self._changed = False
+        return self.export()
+
+    def load(self, data: dict):
+        """Restores an export, e.g. the one persisted before a restart."""
+        if data.get("version") != EXPORT_VERSION:
+            logger.warning(f"Ignoring activity stats in an unknown format (version {data.get('version')}).")
+            return
+        with self._lock:
+            self.hourly.load(data["hour_end"], data["hourly"]["events"], data["hourly"]["peak"])
+            self.daily.load(data["day_end"], data["daily"]["events"], data["daily"]["peak"])
+            self.heatmap = [list(row) for row in data["heatmap"]]
+            self.players = {name: PlayerStats(*values) for name, values in data["players"].items()}
+            self.commands = dict(data["commands"])
+            self.online = dict(data["online"])
+            self.peak_players, self.peak_at = data["peak"]
+            self._last_hour = data["hour_end"]
+
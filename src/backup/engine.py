@@ -0,0 +1,296 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+from src.config_models import BackupConfig
+from src.mc_service.command_models import SaveAllCommand, SaveOffCommand, SaveOnCommand
+from src.mc_service.services import MinecraftServerController
+
+logger = logging.getLogger(__name__)
+
+# Files inside a world folder that make up a snapshot (relative glob patterns).
+WORLD_FILE_PATTERNS = (
+    "level.dat",
+    "**/region/*.mca",
+    "**/entities/*.mca",
+    "**/poi/*.mca",
+    "playerdata/*.dat",
+    "data/*.dat",
+)
+
+SNAPSHOT_DIR_NAME = "snapshots"
+OBJECT_DIR_NAME = "objects"
+MANIFEST_NAME = "manifest.json"
+SNAPSHOT_TIME_FORMAT = "%Y-%m-%dT%H-%M-%S"
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class BackupInProgressError(RuntimeError):
+    """Raised when a backup is requested while another one is still running."""
+
+
+@dataclass
+class BackupResult:
+    snapshot: str
+    files_total: int
+    files_changed: int
+    bytes_total: int  # Logical size of all files in the snapshot
+    bytes_new: int  # Uncompressed size of content that was not in the store yet
+    bytes_copied: int  # Compressed bytes actually written to disk
+    duration: float
+    pruned: list[str]
+
+    @property
+    def dedup_ratio(self) -> float:
+        """Logical snapshot size divided by the amount of new content that had to be stored."""
+        if self.bytes_new == 0:
+            return float("inf")
+        return self.bytes_total / self.bytes_new
+
+
+def snapshot_time(name: str) -> datetime:
+    """Returns when a snapshot was taken, ignoring the suffix of one taken in the same second as another."""
+    return datetime.strptime(name.split(".", 1)[0], SNAPSHOT_TIME_FORMAT)
+
+
+def hash_file(path: str) -> str:
+    """Returns the SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compress_file(src: str, dest: str, level: int) -> int:
+    """
+    Gzips 'src' into 'dest' atomically and returns the number of bytes written.
+    Runs inside the process pool, so it must stay a module-level function.
+    """
+    tmp = f"{dest}.tmp"
+    with open(src, "rb") as f_in, gzip.open(tmp, "wb", compresslevel=level) as f_out:
+        shutil.copyfileobj(f_in, f_out, _HASH_CHUNK_SIZE)
+    os.replace(tmp, dest)
+    return os.path.getsize(dest)
+
+
+class BackupEngine:
+    """
+    Incremental, content-addressed world backups.
+
+    Each snapshot is a manifest mapping relative file paths to their size, mtime and SHA-256.
+    File contents live once in a gzip-compressed object store, so unchanged files cost nothing.
+    """
+
+    def __init__(self, backup_config: BackupConfig, msc: MinecraftServerController):
+        self.config = backup_config
+        self.msc = msc
+        self.server_dir = Path(msc.config.dir)
+        self.root = backup_config.target_path
+        self.snapshot_dir = self.root / SNAPSHOT_DIR_NAME
+        self.object_dir = self.root / OBJECT_DIR_NAME
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return self._lock.locked()
+
+    def run(self) -> BackupResult:
+        """Coordinates saving with the server and creates a new snapshot."""
+        if not self._lock.acquire(blocking=False):
+            raise BackupInProgressError("A backup is already running.")
+        try:
+            server_online = self.msc.is_running
+            if server_online:
+                self._prepare_server()
+            try:
+                result = self._snapshot()
+            finally:
+                if server_online:
+                    self._command(SaveOnCommand())
+            result.pruned = self.prune()
+            return result
+        finally:
+            self._lock.release()
+
+    def _command(self, command_model) -> bool | str:
+        command_str = command_model.to_command_string()
+        response = self.msc.run_server_command(command_str)
+        if response is False:
+            logger.warning(f"Backup: RCON command '{command_str}' failed.")
+        return response
+
+    def _prepare_server(self):
+        """Disables autosave and flushes all chunks to disk before the files are read."""
+        logger.info(">> Backup: disabling autosave and flushing the world...")
+        self._command(SaveOffCommand())
+        if self._command(SaveAllCommand(flush=True)) is False:
+            self._command(SaveOnCommand())
+            raise RuntimeError("Could not flush the world via RCON, backup aborted.")
+
+    def world_dirs(self) -> list[Path]:
+        """Returns the world folders to back up."""
+        if self.config.worlds:
+            return [self.server_dir / name for name in self.config.worlds]
+        return sorted(p.parent for p in self.server_dir.glob("*/level.dat"))
+
+    def _collect_files(self) -> dict[str, os.stat_result]:
+        files = {}
+        for world in self.world_dirs():
+            for pattern in WORLD_FILE_PATTERNS:
+                for path in world.glob(pattern):
+                    if path.is_file():
+                        files[path.relative_to(self.server_dir).as_posix()] = path.stat()
+        return files
+
+    def _object_path(self, digest: str) -> Path:
+        return self.object_dir / digest[:2] / f"{digest}.gz"
+
+    def list_snapshots(self) -> list[str]:
+        """Returns the names of all complete snapshots, oldest first."""
+        if not self.snapshot_dir.exists():
+            return []
+        return sorted(p.parent.name for p in self.snapshot_dir.glob(f"*/{MANIFEST_NAME}"))
+
+    def load_manifest(self, snapshot: str) -> dict:
+        with (self.snapshot_dir / snapshot / MANIFEST_NAME).open("r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _previous_files(self) -> dict:
+        snapshots = self.list_snapshots()
+        if not snapshots:
+            return {}
+        return self.load_manifest(snapshots[-1]).get("files", {})
+
+    def _snapshot(self) -> BackupResult:
+        start = time.perf_counter()
+        name = self._new_snapshot_name(datetime.now())
+        previous = self._previous_files()
+        current = self._collect_files()
+
+        entries: dict[str, dict] = {}
+        to_hash: list[str] = []
+        for rel_path, st in current.items():
+            prev = previous.get(rel_path)
+            # Cheap check first: identical size and mtime means identical content
+            if prev and prev["size"] == st.st_size and prev["mtime_ns"] == st.st_mtime_ns:
+                entries[rel_path] = prev
+            else:
+                to_hash.append(rel_path)
+
+        # Hashing is the backstop for files that were touched but may not have changed
+        with ThreadPoolExecutor(max_workers=self.config.workers) as pool:
+            digests = pool.map(hash_file, (str(self.server_dir / p) for p in to_hash))
+            for rel_path, digest in zip(to_hash, digests):
+                st = current[rel_path]
+                entries[rel_path] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+
+        missing: dict[str, str] = {}
+        for rel_path in to_hash:
+            digest = entries[rel_path]["sha256"]
+            if digest not in missing and not self._object_path(digest).exists():
+                missing[digest] = rel_path
+
+        bytes_copied = 0
+        if missing:
+            # multiprocessing is only imported once a backup has something to compress, not at bot startup
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=self.config.workers) as pool:
+                futures = []
+                for digest, rel_path in missing.items():
+                    dest = self._object_path(digest)
+                    dest.parent.mkdir(parents=True, exist_ok=True)
+                    futures.append(pool.submit(compress_file, str(self.server_dir / rel_path),
+                                               str(dest), self.config.compression_level))
+                bytes_copied = sum(f.result() for f in futures)
+
+        # Touched files with the same content as before were hashed, but did not change
+        changed = [p for p in to_hash if entries[p]["sha256"] != previous.get(p, {}).get("sha256")]
+        result = BackupResult(
+            snapshot=name,
+            files_total=len(entries),
+            files_changed=len(changed),
+            bytes_total=sum(e["size"] for e in entries.values()),
+            bytes_new=sum(current[p].st_size for p in missing.values()),
+            bytes_copied=bytes_copied,
+            duration=time.perf_counter() - start,
+            pruned=[],
+        )
+        self._write_manifest(name, entries, result)
+        logger.info(f"Backup '{name}' finished: {result.files_changed}/{result.files_total} files changed, "
+                    f"{result.bytes_copied} bytes copied in {result.duration:.2f}s.")
+        return result
+
+    def _new_snapshot_name(self, now: datetime) -> str:
+        """The snapshot name for 'now', with a '.N' suffix if a snapshot was already taken in the same second."""
+        base = name = now.strftime(SNAPSHOT_TIME_FORMAT)
+        n = 0
+        while (self.snapshot_dir / name).exists():
+            n += 1
+            name = f"{base}.{n}"
+        return name
+
+    def _write_manifest(self, name: str, entries: dict, result: BackupResult):
+        target = self.snapshot_dir / name
+        # Never completes another snapshot's directory
+        target.mkdir(parents=True, exist_ok=False)
+        manifest = {
+            "created_at": datetime.now().isoformat(),
+            "files": entries,
+            "stats": {
+                "files_changed": result.files_changed,
+                "bytes_total": result.bytes_total,
+                "bytes_copied": result.bytes_copied,
+                "duration": round(result.duration, 3),
+            },
+        }
+        # Written last and atomically: a snapshot without a manifest does not exist
+        tmp = target / f"{MANIFEST_NAME}.tmp"
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, target / MANIFEST_NAME)
+
+    def _snapshots_to_keep(self, snapshots: list[str], now: datetime) -> set[str]:
+        keep = set(snapshots[-self.config.keep_last:])
+        newest_per_day: dict[str, str] = {}
+        oldest_day = (now - timedelta(days=self.config.keep_days)).date()
+        for name in snapshots:
+            taken = snapshot_time(name)
+            if taken.date() > oldest_day:
+                newest_per_day[taken.date().isoformat()] = name
+        return keep | set(newest_per_day.values())
+
+    def prune(self, now: Optional[datetime] = None) -> list[str]:
+        """Deletes snapshots outside the retention policy and unreferenced objects."""
+        snapshots = self.list_snapshots()
+        keep = self._snapshots_to_keep(snapshots, now or datetime.now())
+        pruned = [name for name in snapshots if name not in keep]
+        for name in pruned:
+            shutil.rmtree(self.snapshot_dir / name)
+            logger.info(f"Backup: pruned snapshot '{name}'.")
+
+        if pruned:
+            referenced = set()
+            for name in keep:
+                referenced.update(e["sha256"] for e in self.load_manifest(name)["files"].values())
+            for obj in self.object_dir.glob("*/*.gz"):
+                if obj.name.removesuffix(".gz") not in referenced:
+                    obj.unlink()
+        return pruned
+
+    def restore_file(self, snapshot: str, rel_path: str, dest: Path):
+        """Restores a single file of a snapshot to 'dest'."""
+        entry = self.load_manifest(snapshot)["files"][rel_path]
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(self._object_path(entry["sha256"]), "rb") as f_in, dest.open("wb") as f_out:
+            shutil.copyfileobj(f_in, f_out, _HASH_CHUNK_SIZE)
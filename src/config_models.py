@@ -4,7 +4,10 @@ from pydantic import (BaseModel,
                       field_validator, ValidationError)
 
 from pathlib import Path
+from typing import Literal, Optional
 import logging
+
+from .scheduler.cron import CronExpression
 logger = logging.getLogger(__name__)
 
 class BotConfig(BaseModel):
@@ -90,10 +93,182 @@ class ServerConfig(BaseModel):
         """Returns the string representation of the java command."""
         return f"java -Xms{self.min_gb}G -Xmx{self.max_gb}G -jar {self.jar}"
 
+class BackupConfig(BaseModel):
+    """Holds the configuration of the world backup engine."""
+    target_dir: str = "backups"  # Absolute, or relative to the bot's working directory
+    worlds: list[str] = []  # World folders inside the server dir, empty = auto-detect via 'level.dat'
+    keep_last: int = Field(7, ge=1)  # Always keep the newest N snapshots
+    keep_days: int = Field(14, ge=0)  # Additionally keep the newest snapshot of each of the last N days
+    compression_level: int = Field(6, ge=1, le=9)
+    workers: int = Field(2, ge=1, le=32)  # Size of the compression process pool
+
+    @property
+    def target_path(self) -> Path:
+        """Returns the absolute path of the backup repository."""
+        return Path(self.target_dir).resolve()
+
+class ScheduledJobConfig(BaseModel):
+    """Holds a single job of the task scheduler."""
+    name: str = Field(..., min_length=1)
+    cron: str  # Five-field cron expression or an alias like '@daily'
+    action: Literal["save", "broadcast", "command", "restart", "backup", "compress_logs"]
+    args: str = ""  # The message for 'broadcast', the console command for 'command'
+    jitter_seconds: int = Field(0, ge=0)  # Random delay added to every run
+    countdown: list[int] = [300, 60, 10]  # Seconds before a 'restart' at which players are warned
+    catch_up: bool = False  # Run once on startup if a run was missed while the bot was offline
+    enabled: bool = True
+
+    @field_validator("cron")
+    @classmethod
+    def validate_cron(cls, v: str) -> str:
+        """Validates that the cron expression can be parsed."""
+        CronExpression(v)
+        return v
+
+class ScheduleConfig(BaseModel):
+    """Holds the configuration of the task scheduler."""
+    state_file: str = "schedule_state.json"  # Persists the last run of each job
+    jobs: list[ScheduledJobConfig] = []
+
+    @field_validator("jobs")
+    @classmethod
+    def check_unique_names(cls, v: list[ScheduledJobConfig]) -> list[ScheduledJobConfig]:
+        """Ensures that job names are unique, as they are used to trigger jobs."""
+        names = [job.name for job in v]
+        if len(names) != len(set(names)):
+            raise ValueError("Every job in '[schedule]' needs a unique 'name'.")
+        return v
+
+class IdleConfig(BaseModel):
+    """Holds the configuration of the idle auto-stop and wake-on-connect feature."""
+    enabled: bool = False
+    idle_minutes: int = Field(15, ge=1)  # Stop the server after this many minutes without players
+    check_interval: int = Field(30, ge=5)  # Seconds between two idle checks
+    wake_on_connect: bool = True  # Answer on the game port while stopped and start on a login attempt
+    listen_host: str = "0.0.0.0"
+    game_port: int = Field(25565, ge=1, le=65535)  # Must match 'server-port' in server.properties
+    motd: str = "Server is sleeping - join to wake it up!"
+    wake_message: str = "The server is starting, please reconnect in a minute."
+
+class SupervisorConfig(BaseModel):
+    """Holds the configuration of the crash detection and auto-restart supervisor."""
+    enabled: bool = True
+    auto_restart: bool = True  # If false, crashes are only reported
+    check_interval: int = Field(15, ge=1)  # Seconds between two health checks
+    rcon_failure_threshold: int = Field(4, ge=1)  # Failed RCON checks in a row that count as a hang
+    backoff_base: float = Field(10, gt=0)  # Delay before the first restart, doubled for every further one
+    backoff_max: float = Field(300, gt=0)
+    max_restarts: int = Field(3, ge=1)  # Give up after this many restarts ...
+    restart_window: int = Field(900, ge=1)  # ... within this many seconds
+
+class StopConfig(BaseModel):
+    """Holds the timeouts of the graceful stop pipeline."""
+    stop_timeout: float = Field(120, gt=0)  # Seconds to wait for the process to exit after 'stop'
+    term_timeout: float = Field(30, gt=0)  # Seconds to wait after SIGTERM before sending SIGKILL
+    kill_timeout: float = Field(10, gt=0)  # Seconds to wait after SIGKILL before giving up
+    progress_interval: float = Field(15, gt=0)  # Seconds between two progress updates while waiting
+
+class MetricsConfig(BaseModel):
+    """Holds the configuration of the local Prometheus-style metrics endpoint."""
+    enabled: bool = False
+    host: str = "127.0.0.1"  # Keep it local, the endpoint has no authentication
+    port: int = Field(9108, ge=0, le=65535)
+
+class ReconcilerConfig(BaseModel):
+    """Holds the configuration of the periodic player list reconciliation over RCON."""
+    enabled: bool = True
+    min_interval: float = Field(15, gt=0)  # Seconds between two 'list' polls after drift or activity
+    max_interval: float = Field(300, gt=0)  # Upper bound while the lists keep agreeing
+    growth_factor: float = Field(2.0, ge=1)  # The interval is multiplied by this after every agreeing poll
+    burst_events: int = Field(3, ge=1)  # Joins/leaves within 'burst_window' that count as a burst ...
+    burst_window: float = Field(60, gt=0)  # ... and poll again soon
+
+    @model_validator(mode="after")
+    def check_interval_order(self):
+        if self.min_interval > self.max_interval:
+            raise ValueError("'min_interval' must not be greater than 'max_interval' in the '[reconciler]' section.")
+        return self
+
+class ErrorsConfig(BaseModel):
+    """Holds the configuration of the server error aggregation and digests."""
+    enabled: bool = True
+    digest_interval: float = Field(300, gt=0)  # Seconds between two digests, only sent if errors occurred
+    digest_top: int = Field(5, ge=1)  # Error types listed per digest
+    max_fingerprints: int = Field(500, ge=1)  # Error types kept, the least recently seen are dropped first
+    top_frames: int = Field(3, ge=0)  # Stack frames that are part of an error's fingerprint
+    max_trace_lines: int = Field(50, ge=1)  # Stack trace lines kept per error
+    trace_idle_timeout: float = Field(2, gt=0)  # Seconds without a new trace line after which an error is complete
+
+class NotificationsConfig(BaseModel):
+    """Holds the configuration of the per-chat notification subscriptions."""
+    state_file: str = "subscriptions.json"
+    # Topics of chats that never ran /subscribe or /unsubscribe
+    default_topics: list[Literal["server", "players", "errors", "performance", "chat"]] = ["server", "errors"]
+    max_concurrent_sends: int = Field(8, ge=1)
+    lag_alert_cooldown: float = Field(600, ge=0)  # Seconds between two 'server overloaded' alerts
+
+class StoreConfig(BaseModel):
+    """Holds the configuration of the local state database."""
+    path: str = "bot_state.db"
+    flush_interval: float = Field(5, gt=0)  # Seconds between commits of writes outside of log batches
+
+class AnalyticsConfig(BaseModel):
+    """Holds the configuration of the player and command statistics."""
+    hours: int = Field(168, ge=24)  # Hourly buckets kept, one week by default
+    days: int = Field(90, ge=1)  # Daily buckets kept
+    max_commands: int = Field(200, ge=1)  # Distinct command names counted, further ones count as 'other'
+    top: int = Field(5, ge=1)  # Players and commands listed by /stats
+
+class PregenConfig(BaseModel):
+    """Holds the configuration of the TPS-aware chunk pre-generation (Chunky) orchestrator."""
+    enabled: bool = True
+    world: str = "world"  # Default world for /pregen start
+    check_interval: float = Field(30, gt=0)  # Seconds between two player and TPS checks while a task exists
+    pause_with_players: int = Field(1, ge=0)  # Pause while at least this many players are online, 0 to ignore players
+    min_tps: float = Field(17.0, gt=0, le=20)  # Pause below this TPS (1 minute average) ...
+    resume_tps: float = Field(19.5, gt=0, le=20)  # ... and resume at or above this one
+    overload_window: float = Field(60, ge=0)  # A "Can't keep up!" within this many seconds counts as low TPS
+    cooldown: float = Field(60, ge=0)  # Minimum pause after low TPS, doubled for every further one in a row ...
+    max_cooldown: float = Field(900, ge=0)  # ... up to this many seconds
+
+    @model_validator(mode="after")
+    def check_tps_order(self):
+        if self.min_tps > self.resume_tps:
+            raise ValueError("'min_tps' must not be greater than 'resume_tps' in the '[pregen]' section.")
+        return self
+
+class LogArchiveConfig(BaseModel):
+    """Holds the configuration of the rotated log recompression (the 'compress_logs' job action)."""
+    block_size: int = Field(1024 * 1024, ge=4096)  # Uncompressed bytes per independently compressed block
+    preset: int = Field(6, ge=0, le=9)  # xz compression preset
+    workers: int = Field(2, ge=1, le=32)  # Size of the compression process pool
+    delete_source: bool = True  # Delete the gzip file once its archive has been verified
+
+class PlayerListsConfig(BaseModel):
+    """Holds the desired whitelist, ops and bans for /sync. Lists that are not set are left alone."""
+    whitelist: Optional[list[str]] = None
+    ops: Optional[list[str]] = None
+    bans: Optional[list[str]] = None
+    prune: bool = True  # Remove players that are not in the desired list
+
 class AppConfig(BaseModel):
     """The root model for the entire application configuration."""
     mc: ServerConfig = Field(..., alias='mc')
     bot: BotConfig = Field(..., alias='bot')
+    backup: BackupConfig = Field(default_factory=BackupConfig, alias='backup')
+    schedule: ScheduleConfig = Field(default_factory=ScheduleConfig, alias='schedule')
+    idle: IdleConfig = Field(default_factory=IdleConfig, alias='idle')
+    supervisor: SupervisorConfig = Field(default_factory=SupervisorConfig, alias='supervisor')
+    stop: StopConfig = Field(default_factory=StopConfig, alias='stop')
+    metrics: MetricsConfig = Field(default_factory=MetricsConfig, alias='metrics')
+    player_lists: PlayerListsConfig = Field(default_factory=PlayerListsConfig, alias='player_lists')
+    reconciler: ReconcilerConfig = Field(default_factory=ReconcilerConfig, alias='reconciler')
+    errors: ErrorsConfig = Field(default_factory=ErrorsConfig, alias='errors')
+    notifications: NotificationsConfig = Field(default_factory=NotificationsConfig, alias='notifications')
+    store: StoreConfig = Field(default_factory=StoreConfig, alias='store')
+    analytics: AnalyticsConfig = Field(default_factory=AnalyticsConfig, alias='analytics')
+    pregen: PregenConfig = Field(default_factory=PregenConfig, alias='pregen')
+    log_archive: LogArchiveConfig = Field(default_factory=LogArchiveConfig, alias='log_archive')
 
 if __name__ == "__main__":
     # A quick Test
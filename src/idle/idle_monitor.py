@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+from src.config_models import IdleConfig
+from src.mc_service.services import MinecraftServerController
+from src.server_log.state_manager import StateManager
+from .sleep_listener import SleepListener
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for the server to go down and to release the game port.
+_STOP_TIMEOUT = 120
+_BIND_RETRY_INTERVAL = 2
+
+
+class IdleMonitor:
+    """
+    Stops the server after a configurable time without players and, while it is stopped,
+    lets a SleepListener wake it again when somebody tries to join.
+    """
+
+    def __init__(self, idle_config: IdleConfig, msc: MinecraftServerController, state_manager: StateManager,
+                 maintenance_lock: asyncio.Lock,
+                 stop_server: Callable[[], Awaitable[bool]],
+                 start_server: Callable[[], Awaitable[None]],
+                 notify: Callable[[str], Awaitable[None]]):
+        self.config = idle_config
+        self.msc = msc
+        self.state_manager = state_manager
+        self.maintenance_lock = maintenance_lock
+        self._stop_server = stop_server
+        self._start_server = start_server
+        self._notify = notify
+        self.listener = SleepListener(
+            host=idle_config.listen_host,
+            port=idle_config.game_port,
+            motd=idle_config.motd,
+            wake_message=idle_config.wake_message,
+            on_wake=self._wake,
+        )
+        self._idle_since: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_sleeping(self) -> bool:
+        return self.listener.is_serving
+
+    def start(self):
+        """Starts the periodic idle check on the running event loop."""
+        if self.config.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run_loop(), name="idle-monitor")
+            logger.info(f"Idle monitor started: stopping the server after {self.config.idle_minutes} idle minutes.")
+
+    async def stop(self):
+        """Stops the idle check and releases the game port."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.listener.close()
+
+    async def cancel_sleep(self):
+        """Releases the game port before the server is started by other means, e.g. /start."""
+        await self.listener.close()
+
+    async def _run_loop(self):
+        while True:
+            await asyncio.sleep(self.config.check_interval)
+            try:
+                await self.check()
+            except Exception as e:
+                logger.exception(f"Idle check failed: {e}")
+
+    async def check(self, now: Optional[float] = None):
+        """Tracks how long the server has been empty and puts it to sleep when the limit is reached."""
+        now = time.monotonic() if now is None else now
+        if self.is_sleeping or self.maintenance_lock.locked():
+            self._idle_since = None
+            return
+
+        state = self.state_manager.get_current_state()
+        if state.online_players or not await asyncio.to_thread(lambda: self.msc.is_running):
+            self._idle_since = None
+            return
+
+        if self._idle_since is None:
+            self._idle_since = now
+            logger.info("Idle monitor: no players online, starting the idle timer.")
+        elif now - self._idle_since >= self.config.idle_minutes * 60:
+            self._idle_since = None
+            await self._go_to_sleep()
+
+    async def _go_to_sleep(self):
+        async with self.maintenance_lock:
+            logger.info("Idle monitor: server is idle, stopping it.")
+            await self._notify(f"💤 No players for {self.config.idle_minutes} minutes, stopping the server.")
+            if not await self._stop_server():
+                logger.error("Idle monitor: failed to stop the idle server.")
+                return
+
+            if self.config.wake_on_connect:
+                await self._start_listener()
+
+    async def _start_listener(self):
+        # The JVM keeps the game port bound until it has fully exited
+        deadline = time.monotonic() + _STOP_TIMEOUT
+        while True:
+            try:
+                await self.listener.start()
+                return
+            except OSError as e:
+                if time.monotonic() >= deadline:
+                    logger.error(f"Idle monitor: could not bind the game port for the sleep listener: {e}")
+                    return
+                await asyncio.sleep(_BIND_RETRY_INTERVAL)
+
+    async def _wake(self, player_name: str):
+        """Called by the SleepListener when a player tries to join."""
+        await self.listener.close()
+        await self._notify(f"⏰ '{player_name}' tried to join, waking the server up.")
+        try:
+            await self._start_server()
+        except Exception as e:
+            logger.exception(f"Idle monitor: failed to wake the server: {e}")
+            await self._notify("❌ Failed to wake the server. Check logs for details.")
@@ -0,0 +1,127 @@
+import asyncio
+import json
+import struct
+
+# Only the parts of the Java Edition protocol needed to answer server list pings
+# and to turn away login attempts while the server is sleeping.
+
+# Connection states a client can request in its handshake.
+STATE_STATUS = 1
+STATE_LOGIN = 2
+STATE_TRANSFER = 3
+
+# Packet ids (serverbound and clientbound share the same ids here).
+HANDSHAKE_PACKET_ID = 0x00
+STATUS_PACKET_ID = 0x00
+PING_PACKET_ID = 0x01
+LOGIN_START_PACKET_ID = 0x00
+LOGIN_DISCONNECT_PACKET_ID = 0x00
+
+# Pre-1.7 clients start their server list ping with this byte instead of a handshake.
+LEGACY_PING_BYTE = 0xFE
+MAX_PACKET_LENGTH = 2 ** 21
+
+
+class ProtocolError(Exception):
+    """Raised when a client sends data that does not follow the protocol."""
+
+
+def encode_varint(value: int) -> bytes:
+    """Encodes an int as a protocol VarInt (7 bits per byte, little endian groups)."""
+    value &= 0xFFFFFFFF
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def decode_varint(data: bytes, offset: int = 0) -> tuple[int, int]:
+    """Decodes a VarInt from 'data' and returns the value and the new offset."""
+    result = 0
+    for i in range(5):
+        if offset >= len(data):
+            raise ProtocolError("VarInt is truncated.")
+        byte = data[offset]
+        offset += 1
+        result |= (byte & 0x7F) << (7 * i)
+        if not byte & 0x80:
+            # Interpret as a signed 32 bit integer
+            if result & 0x80000000:
+                result -= 1 << 32
+            return result, offset
+    raise ProtocolError("VarInt is too long.")
+
+
+async def read_varint(reader: asyncio.StreamReader) -> int:
+    """Reads a VarInt byte by byte from the stream."""
+    data = bytearray()
+    for _ in range(5):
+        byte = await reader.readexactly(1)
+        data += byte
+        if not byte[0] & 0x80:
+            return decode_varint(bytes(data))[0]
+    raise ProtocolError("VarInt is too long.")
+
+
+def encode_string(value: str) -> bytes:
+    raw = value.encode("utf-8")
+    return encode_varint(len(raw)) + raw
+
+
+def decode_string(data: bytes, offset: int) -> tuple[str, int]:
+    length, offset = decode_varint(data, offset)
+    if length < 0 or offset + length > len(data):
+        raise ProtocolError("String is truncated.")
+    return data[offset:offset + length].decode("utf-8"), offset + length
+
+
+def encode_packet(packet_id: int, payload: bytes = b"") -> bytes:
+    """Prefixes packet id and payload with their total length."""
+    body = encode_varint(packet_id) + payload
+    return encode_varint(len(body)) + body
+
+
+async def read_packet(reader: asyncio.StreamReader) -> tuple[int, bytes]:
+    """Reads one length-prefixed packet and returns its id and payload."""
+    length = await read_varint(reader)
+    if not 0 < length <= MAX_PACKET_LENGTH:
+        raise ProtocolError(f"Invalid packet length {length}.")
+    body = await reader.readexactly(length)
+    packet_id, offset = decode_varint(body)
+    return packet_id, body[offset:]
+
+
+def encode_handshake(protocol_version: int, host: str, port: int, next_state: int) -> bytes:
+    payload = encode_varint(protocol_version) + encode_string(host) + struct.pack(">H", port) + encode_varint(next_state)
+    return encode_packet(HANDSHAKE_PACKET_ID, payload)
+
+
+def decode_handshake(payload: bytes) -> tuple[int, str, int, int]:
+    """Returns protocol version, server address, port and the requested next state."""
+    protocol_version, offset = decode_varint(payload)
+    host, offset = decode_string(payload, offset)
+    if offset + 2 > len(payload):
+        raise ProtocolError("Handshake is truncated.")
+    (port,) = struct.unpack_from(">H", payload, offset)
+    next_state, _ = decode_varint(payload, offset + 2)
+    return protocol_version, host, port, next_state
+
+
+def status_response(motd: str, protocol_version: int, version_name: str = "Sleeping") -> bytes:
+    """Builds the status response packet shown in the client's server list."""
+    status = {
+        "version": {"name": version_name, "protocol": protocol_version},
+        "players": {"max": 0, "online": 0},
+        "description": {"text": motd},
+    }
+    return encode_packet(STATUS_PACKET_ID, encode_string(json.dumps(status)))
+
+
+def login_disconnect(message: str) -> bytes:
+    """Builds the packet that disconnects a client during login with a message."""
+    return encode_packet(LOGIN_DISCONNECT_PACKET_ID, encode_string(json.dumps({"text": message})))
@@ -0,0 +1,114 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+from . import protocol
+
+logger = logging.getLogger(__name__)
+
+# Seconds a client may take for each step before the connection is dropped.
+_CLIENT_TIMEOUT = 5
+
+
+class SleepListener:
+    """
+    A lightweight stand-in that binds the game port while the server is stopped.
+    It answers server list pings with a 'sleeping' MOTD and wakes the server on a login attempt.
+    """
+
+    def __init__(self, host: str, port: int, motd: str, wake_message: str,
+                 on_wake: Callable[[str], Awaitable[None]]):
+        self.host = host
+        self.port = port
+        self.motd = motd
+        self.wake_message = wake_message
+        self.on_wake = on_wake
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._wake_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_serving(self) -> bool:
+        return self._server is not None and self._server.is_serving()
+
+    @property
+    def bound_port(self) -> Optional[int]:
+        """The actual port, useful when listening on port 0."""
+        if not self._server or not self._server.sockets:
+            return None
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self):
+        """Binds the game port and starts answering clients."""
+        if self.is_serving:
+            return
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port, reuse_address=True)
+        logger.info(f"Sleep listener is answering on {self.host}:{self.bound_port}.")
+
+    async def close(self):
+        """Releases the game port, so the real server can bind it."""
+        if self._server is None:
+            return
+        self._server.close()
+        await self._server.wait_closed()
+        self._server = None
+        logger.info("Sleep listener closed.")
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        peer = writer.get_extra_info("peername")
+        try:
+            first_byte = await asyncio.wait_for(reader.readexactly(1), _CLIENT_TIMEOUT)
+            if first_byte[0] == protocol.LEGACY_PING_BYTE:
+                return  # Legacy clients just see the server as offline
+
+            # Otherwise the first byte starts the length VarInt of the handshake packet
+            length_bytes = bytearray(first_byte)
+            while length_bytes[-1] & 0x80 and len(length_bytes) < 5:
+                length_bytes += await asyncio.wait_for(reader.readexactly(1), _CLIENT_TIMEOUT)
+            length, _ = protocol.decode_varint(bytes(length_bytes))
+            if not 0 < length <= protocol.MAX_PACKET_LENGTH:
+                raise protocol.ProtocolError(f"Invalid packet length {length}.")
+            body = await asyncio.wait_for(reader.readexactly(length), _CLIENT_TIMEOUT)
+            packet_id, offset = protocol.decode_varint(body)
+            if packet_id != protocol.HANDSHAKE_PACKET_ID:
+                raise protocol.ProtocolError(f"Expected a handshake, got packet {packet_id:#x}.")
+
+            protocol_version, _, _, next_state = protocol.decode_handshake(body[offset:])
+            if next_state == protocol.STATE_STATUS:
+                await self._handle_status(reader, writer, protocol_version)
+            elif next_state in (protocol.STATE_LOGIN, protocol.STATE_TRANSFER):
+                await self._handle_login(reader, writer)
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+            pass
+        except (protocol.ProtocolError, UnicodeDecodeError) as e:
+            logger.debug(f"Sleep listener: invalid data from {peer}: {e}")
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _handle_status(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, protocol_version: int):
+        packet_id, _ = await asyncio.wait_for(protocol.read_packet(reader), _CLIENT_TIMEOUT)
+        if packet_id != protocol.STATUS_PACKET_ID:
+            return
+        writer.write(protocol.status_response(self.motd, protocol_version))
+        await writer.drain()
+
+        # The client measures latency with a ping, which is echoed back unchanged
+        packet_id, payload = await asyncio.wait_for(protocol.read_packet(reader), _CLIENT_TIMEOUT)
+        if packet_id == protocol.PING_PACKET_ID:
+            writer.write(protocol.encode_packet(protocol.PING_PACKET_ID, payload))
+            await writer.drain()
+
+    async def _handle_login(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        packet_id, payload = await asyncio.wait_for(protocol.read_packet(reader), _CLIENT_TIMEOUT)
+        if packet_id != protocol.LOGIN_START_PACKET_ID:
+            return
+        player_name, _ = protocol.decode_string(payload, 0)
+        writer.write(protocol.login_disconnect(self.wake_message))
+        await writer.drain()
+
+        if self._wake_task is None or self._wake_task.done():
+            logger.info(f"Login attempt by '{player_name}' while sleeping, waking the server.")
+            self._wake_task = asyncio.create_task(self.on_wake(player_name))
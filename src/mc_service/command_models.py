@@ -1,8 +1,14 @@
+from typing import Optional
+
 from pydantic import BaseModel, Field
 
 from .server_commands import ServerCommand
 
 
+# Minecraft player names: 3-16 letters, digits and underscores (a few legacy names are shorter)
+PLAYER_NAME_PATTERN = r"^\w{1,16}$"
+
+
 class BaseCommandModel(BaseModel):
     """
     Abstract base model for a server command.
@@ -35,4 +41,82 @@ class StopCommand(BaseCommandModel):
     """Model for the 'stop' command."""
     def to_command_string(self) -> str:
         """Returns the formatted stop command string."""
-        return f"{ServerCommand.STOP.value}"
\ No newline at end of file
+        return f"{ServerCommand.STOP.value}"
+
+class SaveAllCommand(BaseCommandModel):
+    """Model for the 'save-all' command."""
+    flush: bool = False
+
+    def to_command_string(self) -> str:
+        """Returns the formatted save-all command string."""
+        return f"{ServerCommand.SAVE_ALL.value} flush" if self.flush else ServerCommand.SAVE_ALL.value
+
+
+class SaveOffCommand(BaseCommandModel):
+    """Model for the 'save-off' command."""
+    def to_command_string(self) -> str:
+        """Returns the formatted save-off command string."""
+        return ServerCommand.SAVE_OFF.value
+
+
+class SaveOnCommand(BaseCommandModel):
+    """Model for the 'save-on' command."""
+    def to_command_string(self) -> str:
+        """Returns the formatted save-on command string."""
+        return ServerCommand.SAVE_ON.value
+
+
+class SayCommand(BaseCommandModel):
+    """Model for the 'say' command."""
+    message: str = Field(..., min_length=1)
+
+    def to_command_string(self) -> str:
+        """Returns the formatted say command string."""
+        return f"{ServerCommand.SAY.value} {self.message}"
+
+
+class DeopPlayerCommand(BaseCommandModel):
+    """Model for the 'deop' command."""
+    player_name: str = Field(..., pattern=PLAYER_NAME_PATTERN)
+
+    def to_command_string(self) -> str:
+        """Returns the formatted deop command string."""
+        return f"{ServerCommand.DEOP.value} {self.player_name}"
+
+
+class WhitelistAddCommand(BaseCommandModel):
+    """Model for the 'whitelist add' command."""
+    player_name: str = Field(..., pattern=PLAYER_NAME_PATTERN)
+
+    def to_command_string(self) -> str:
+        """Returns the formatted whitelist add command string."""
+        return f"{ServerCommand.WHITELIST.value} add {self.player_name}"
+
+
+class WhitelistRemoveCommand(BaseCommandModel):
+    """Model for the 'whitelist remove' command."""
+    player_name: str = Field(..., pattern=PLAYER_NAME_PATTERN)
+
+    def to_command_string(self) -> str:
+        """Returns the formatted whitelist remove command string."""
+        return f"{ServerCommand.WHITELIST.value} remove {self.player_name}"
+
+
+class BanPlayerCommand(BaseCommandModel):
+    """Model for the 'ban' command."""
+    player_name: str = Field(..., pattern=PLAYER_NAME_PATTERN)
+    reason: Optional[str] = None
+
+    def to_command_string(self) -> str:
+        """Returns the formatted ban command string."""
+        command = f"{ServerCommand.BAN.value} {self.player_name}"
+        return f"{command} {self.reason}" if self.reason else command
+
+
+class PardonPlayerCommand(BaseCommandModel):
+    """Model for the 'pardon' command."""
+    player_name: str = Field(..., pattern=PLAYER_NAME_PATTERN)
+
+    def to_command_string(self) -> str:
+        """Returns the formatted pardon command string."""
+        return f"{ServerCommand.PARDON.value} {self.player_name}"
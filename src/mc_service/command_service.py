@@ -4,7 +4,8 @@ from typing import Union
 
 from pydantic import ValidationError
 
-from .command_models import KickPlayerCommand, OpPlayerCommand, BaseCommandModel, StopCommand
+from .command_models import (KickPlayerCommand, OpPlayerCommand, BaseCommandModel, StopCommand,
+                             SaveAllCommand, SayCommand)
 from .services import MinecraftServerController
 
 logger = logging.getLogger(__name__)
@@ -33,6 +34,14 @@ class CommandService:
             logger.exception(f"An unexpected error occurred during command execution: {e}")
             return False
 
+    async def execute_batch(self, command_models: list[BaseCommandModel]) -> list[Union[str, bool]]:
+        """Runs several command models in one RCON session and returns one response per command."""
+        commands = [command_model.to_command_string() for command_model in command_models]
+        if not commands:
+            return []
+        logger.info(f"Executing {len(commands)} commands in one batch.")
+        return await asyncio.to_thread(self.msc.run_server_commands, commands)
+
     async def kick_player(self, player_name: str) -> Union[str, bool]:
         """Builds and executes the 'kick' command."""
         try:
@@ -51,6 +60,19 @@ class CommandService:
             logger.error(f"Op command validation failed for player '{player_name}': {e}")
             return False
 
+    async def save_all(self, flush: bool = False) -> Union[str, bool]:
+        """Builds and executes the 'save-all' command."""
+        return await self._execute_command(SaveAllCommand(flush=flush))
+
+    async def say(self, message: str) -> Union[str, bool]:
+        """Builds and executes the 'say' command to broadcast a message to all players."""
+        try:
+            command_model = SayCommand(message=message)
+            return await self._execute_command(command_model)
+        except ValidationError as e:
+            logger.error(f"Say command validation failed: {e}")
+            return False
+
     async def stop(self) -> bool:
         """Stops the server."""
         try:
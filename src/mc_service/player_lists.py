@@ -0,0 +1,150 @@
+import json
+import logging
+import re
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Iterable, Optional
+
+from .command_models import (BaseCommandModel, PLAYER_NAME_PATTERN, OpPlayerCommand, DeopPlayerCommand,
+                             WhitelistAddCommand, WhitelistRemoveCommand, BanPlayerCommand, PardonPlayerCommand)
+from .command_service import CommandService
+from .server_files import ServerFiles, WHITELIST_FILE, OPS_FILE, BANS_FILE
+
+logger = logging.getLogger(__name__)
+
+
+class PlayerList(Enum):
+    """The player lists the server keeps in JSON files next to the server jar."""
+    WHITELIST = "whitelist"
+    OPS = "ops"
+    BANS = "bans"
+
+    @property
+    def file_name(self) -> str:
+        return _FILE_NAMES[self]
+
+
+_FILE_NAMES = {
+    PlayerList.WHITELIST: WHITELIST_FILE,
+    PlayerList.OPS: OPS_FILE,
+    PlayerList.BANS: BANS_FILE,
+}
+
+# Command models that add or remove a player from each list
+_ADD_COMMANDS: dict[PlayerList, type[BaseCommandModel]] = {
+    PlayerList.WHITELIST: WhitelistAddCommand,
+    PlayerList.OPS: OpPlayerCommand,
+    PlayerList.BANS: BanPlayerCommand,
+}
+_REMOVE_COMMANDS: dict[PlayerList, type[BaseCommandModel]] = {
+    PlayerList.WHITELIST: WhitelistRemoveCommand,
+    PlayerList.OPS: DeopPlayerCommand,
+    PlayerList.BANS: PardonPlayerCommand,
+}
+
+# Start of the server's reply when a command changed the list. Anything else, e.g. "That player
+# does not exist" or "Nothing changed. ...", means the list was left as it was
+_SUCCESS_REPLIES: dict[type[BaseCommandModel], re.Pattern] = {
+    WhitelistAddCommand: re.compile(r"^Added \S+ to the whitelist", re.IGNORECASE),
+    WhitelistRemoveCommand: re.compile(r"^Removed \S+ from the whitelist", re.IGNORECASE),
+    OpPlayerCommand: re.compile(r"^Made \S+ a server operator", re.IGNORECASE),
+    DeopPlayerCommand: re.compile(r"^Made \S+ no longer a server operator", re.IGNORECASE),
+    BanPlayerCommand: re.compile(r"^Banned \S+", re.IGNORECASE),
+    PardonPlayerCommand: re.compile(r"^Unbanned \S+", re.IGNORECASE),
+}
+
+
+def command_succeeded(command: BaseCommandModel, response: bool | str) -> bool:
+    """True if the server's reply to a list command says the list was changed."""
+    if response is False:
+        return False
+    return bool(_SUCCESS_REPLIES[type(command)].search(response.strip()))
+
+
+@dataclass
+class SyncResult:
+    """What a sync changed. 'failed' holds players whose command was not answered or was rejected by the server."""
+    player_list: PlayerList
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    unchanged: int = 0
+    invalid: list[str] = field(default_factory=list)
+    failed: list[str] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.removed)
+
+
+def parse_player_names(data: str) -> list[str]:
+    """
+    Parses an uploaded list: either a JSON file in the server's format (or a plain
+    JSON list of names), or one name per line with '#' comments.
+    """
+    stripped = data.strip()
+    if stripped.startswith("["):
+        entries = json.loads(stripped)
+        return [entry["name"] if isinstance(entry, dict) else str(entry) for entry in entries]
+    names = []
+    for line in stripped.splitlines():
+        name = line.split("#", 1)[0].strip()
+        if name:
+            names.append(name)
+    return names
+
+
+def diff_players(current: Iterable[str], desired: Iterable[str], prune: bool = True) -> tuple[list[str], list[str], int]:
+    """
+    Returns (to_add, to_remove, unchanged). Names are compared case-insensitively like
+    the server does; removals use the spelling from the server file.
+    """
+    current_by_key = {name.lower(): name for name in current}
+    desired_by_key = {name.lower(): name for name in desired}
+    to_add = [name for key, name in desired_by_key.items() if key not in current_by_key]
+    to_remove = [name for key, name in current_by_key.items() if key not in desired_by_key] if prune else []
+    unchanged = len(desired_by_key.keys() & current_by_key.keys())
+    return to_add, to_remove, unchanged
+
+
+class PlayerListSync:
+    """Brings the whitelist, ops or bans in line with a desired list using as few commands as possible."""
+
+    def __init__(self, command_service: CommandService, server_files: ServerFiles):
+        self.command_service = command_service
+        self.server_files = server_files
+
+    def plan(self, player_list: PlayerList, desired: list[str], prune: bool = True,
+             reason: Optional[str] = None) -> tuple[SyncResult, list[BaseCommandModel], list[BaseCommandModel]]:
+        """Diffs the desired list against the server file and builds the add and remove commands."""
+        result = SyncResult(player_list)
+        valid = []
+        for name in desired:
+            (valid if re.fullmatch(PLAYER_NAME_PATTERN, name) else result.invalid).append(name)
+
+        current = self.server_files.player_names(player_list.file_name)
+        to_add, to_remove, result.unchanged = diff_players(current, valid, prune)
+        extra = {"reason": reason} if player_list == PlayerList.BANS and reason else {}
+        add_commands = [_ADD_COMMANDS[player_list](player_name=name, **extra) for name in to_add]
+        remove_commands = [_REMOVE_COMMANDS[player_list](player_name=name) for name in to_remove]
+        return result, add_commands, remove_commands
+
+    async def sync(self, player_list: PlayerList, desired: list[str], prune: bool = True,
+                   reason: Optional[str] = None) -> SyncResult:
+        """Applies the minimal set of add and remove commands in one batched RCON session."""
+        result, add_commands, remove_commands = self.plan(player_list, desired, prune, reason)
+        if not add_commands and not remove_commands:
+            return result
+
+        responses = await self.command_service.execute_batch(add_commands + remove_commands)
+        for i, (command, response) in enumerate(zip(add_commands + remove_commands, responses)):
+            if not command_succeeded(command, response):
+                if response is not False:
+                    logger.warning(f"'{command.to_command_string()}' was rejected: {response.strip() or 'no reply'}")
+                result.failed.append(command.player_name)
+            elif i < len(add_commands):
+                result.added.append(command.player_name)
+            else:
+                result.removed.append(command.player_name)
+        logger.info(f"Synced {player_list.value}: +{len(result.added)} -{len(result.removed)}, "
+                    f"{len(result.failed)} failed, {len(result.invalid)} invalid.")
+        return result
@@ -0,0 +1,316 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Awaitable, Callable, Optional
+
+from src.config_models import PregenConfig
+from src.metrics.registry import REGISTRY
+from src.server_log.parser import LogPattern
+from src.server_log.state_manager import StateManager
+from .services import MinecraftServerController
+
+logger = logging.getLogger(__name__)
+
+PREGEN_PROGRESS = REGISTRY.gauge("mc_pregen_progress_percent", "Progress of the current chunk pre-generation task.")
+PREGEN_PAUSES = REGISTRY.counter("mc_pregen_auto_pauses_total", "Automatic pauses of the pre-generation.", ("reason",))
+
+# Progress samples used for the ETA, the rate of the last few minutes of generation
+_RATE_WINDOW = 600
+# Seconds after a pause in which progress lines are taken as written before it
+_PAUSE_GRACE = 10
+
+
+class PregenState(Enum):
+    IDLE = "idle"
+    RUNNING = "running"
+    PAUSED = "paused"
+    DONE = "done"
+
+
+@dataclass
+class PregenProgress:
+    world: str
+    chunks: int = 0
+    percent: float = 0.0
+    rate: float = 0.0  # Chunks per second, as reported by Chunky
+    eta: Optional[float] = None  # Seconds, as reported by Chunky
+
+
+def parse_tps(response: str) -> Optional[float]:
+    """Returns the 1 minute average of a Paper 'tps' response, or None (e.g. on vanilla servers)."""
+    match = LogPattern.TPS_REPORT.value.search(response)
+    return float(match.group("tps")) if match else None
+
+
+def _parse_number(value: str) -> float:
+    return float(value.replace(",", "."))
+
+
+def _parse_eta(value: str) -> float:
+    """'1:23:45' -> seconds"""
+    seconds = 0
+    for part in value.split(":"):
+        seconds = seconds * 60 + int(part)
+    return seconds
+
+
+class PregenOrchestrator:
+    """
+    Drives world pre-generation with the Chunky plugin over RCON and keeps it from hurting players.
+
+    While a task exists, the players online and the tick health (Paper's 'tps', or "Can't keep up!"
+    lines on servers without it) are checked every 'check_interval'. Generation pauses while players
+    are online or the TPS drops below 'min_tps', and resumes once the server is empty and back at
+    'resume_tps'. Each pause for low TPS lasts at least 'cooldown', doubled for every further one in a
+    row, so a server that cannot keep up runs generation in ever shorter bursts instead of lagging.
+    """
+
+    def __init__(self, config: PregenConfig, msc: MinecraftServerController, state_manager: StateManager,
+                 notify: Optional[Callable[[str], Awaitable[None]]] = None):
+        self.config = config
+        self.msc = msc
+        self.state_manager = state_manager
+        self.notify = notify
+        self.state = PregenState.IDLE
+        self.progress: Optional[PregenProgress] = None
+        self.pause_reason: Optional[str] = None
+        # Paused with /pregen pause, no automatic resume
+        self.manual_pause = False
+        self.last_tps: Optional[float] = None
+        self._cooldown = config.cooldown
+        self._resume_after = 0.0
+        self._running_since = 0.0
+        self._paused_at = float("-inf")
+        self._last_overload = float("-inf")
+        self._samples: deque[tuple[float, float]] = deque()
+        self._lock = threading.Lock()
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        PREGEN_PROGRESS.set_function(lambda: self.progress.percent if self.progress else 0)
+
+    def start(self):
+        """Starts the check loop on the running event loop."""
+        if self.config.enabled and self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            self.state_manager.add_listener(self.on_log_event)
+            self._task = asyncio.create_task(self._run_loop(), name="pregen-orchestrator")
+            logger.info("Pre-generation orchestrator started.")
+
+    async def stop(self):
+        """Stops the check loop. A running Chunky task is left alone."""
+        if self._task:
+            self.state_manager.remove_listener(self.on_log_event)
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    # --- Log events (log watcher thread) ---
+
+    def on_log_event(self, event_type: LogPattern, data: dict):
+        """StateManager listener for Chunky's progress lines, tick warnings and joins."""
+        now = time.monotonic()
+        if event_type == LogPattern.PREGEN_PROGRESS:
+            with self._lock:
+                self.progress = PregenProgress(data["world"], int(data["chunks"]), _parse_number(data["percent"]),
+                                               _parse_number(data["rate"]), _parse_eta(data["eta"]))
+                self._samples.append((now, self.progress.percent))
+                while self._samples and now - self._samples[0][0] > _RATE_WINDOW:
+                    self._samples.popleft()
+                # E.g. started or continued from the console. Lines logged just before a pause are not
+                if self.state != PregenState.RUNNING and now - self._paused_at > _PAUSE_GRACE:
+                    self._set_running(now)
+        elif event_type == LogPattern.PREGEN_DONE:
+            with self._lock:
+                self.progress = PregenProgress(data["world"], int(data["chunks"]), 100.0)
+                self.state, self.pause_reason, self.manual_pause = PregenState.DONE, None, False
+            logger.info(f"Pre-generation of '{data['world']}' finished with {data['chunks']} chunks.")
+            self._call_soon(self._notify_done(data["world"], int(data["chunks"])))
+        elif event_type == LogPattern.PREGEN_STOPPED:
+            with self._lock:
+                if data["state"] == "cancelled":
+                    self.state, self.pause_reason = PregenState.IDLE, None
+                elif self.state == PregenState.RUNNING:
+                    # Paused by someone else, e.g. from the console, so do not resume it on our own
+                    self.state, self.pause_reason, self.manual_pause = PregenState.PAUSED, "paused outside the bot", True
+                self._samples.clear()
+        elif event_type == LogPattern.SERVER_STOPPING:
+            with self._lock:
+                if self.state == PregenState.RUNNING:
+                    # Chunky stops with the server, the task is continued once the server is back
+                    self.state, self.pause_reason = PregenState.PAUSED, "server stopped"
+                    self._samples.clear()
+        elif event_type == LogPattern.SERVER_OVERLOADED:
+            self._last_overload = now
+            self._wake_loop()
+        elif event_type == LogPattern.USER_LOGIN and self.state == PregenState.RUNNING:
+            # Pause right away instead of at the next check
+            self._wake_loop()
+
+    def _set_running(self, now: float):
+        self.state, self.pause_reason, self.manual_pause = PregenState.RUNNING, None, False
+        self._running_since = now
+
+    def _wake_loop(self):
+        if self._loop and self._wake:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def _call_soon(self, coro: Awaitable):
+        if self._loop:
+            asyncio.run_coroutine_threadsafe(coro, self._loop)
+        else:
+            coro.close()
+
+    async def _notify_done(self, world: str, chunks: int):
+        if self.notify:
+            await self.notify(f"✅ Pre-generation of '{world}' finished: {chunks:,} chunks.")
+
+    # --- Control ---
+
+    async def _send(self, *commands: str) -> Optional[list[str]]:
+        """Sends Chunky commands in one RCON session, None if any of them could not be sent."""
+        responses = await asyncio.to_thread(self.msc.run_server_commands, list(commands))
+        if any(response is False for response in responses):
+            logger.error(f"Could not send {commands} to the server.")
+            return None
+        return responses
+
+    async def begin(self, radius: int, world: Optional[str] = None, center: tuple[float, float] = (0, 0)) -> bool:
+        """Starts a new task for a square of 'radius' blocks around 'center'."""
+        world = world or self.config.world
+        responses = await self._send(f"chunky world {world}", f"chunky center {center[0]:g} {center[1]:g}",
+                                     f"chunky radius {radius}", "chunky start")
+        if responses is None:
+            return False
+        if "confirm" in responses[-1].lower():
+            # Chunky asks before replacing an existing task for the world
+            if await self._send("chunky confirm") is None:
+                return False
+        with self._lock:
+            self.progress = PregenProgress(world)
+            self._samples.clear()
+            self._cooldown = self.config.cooldown
+            self._set_running(time.monotonic())
+        logger.info(f"Pre-generation of '{world}' started with a radius of {radius} blocks.")
+        # Chunky starts even if players are online, let the next check decide right away
+        self._wake_loop()
+        return True
+
+    async def pause(self, reason: str = "paused with /pregen pause", manual: bool = True) -> bool:
+        with self._lock:
+            # Set before sending, so Chunky's 'stopped' line is not taken for a pause from outside the bot
+            previous = self.state, self.pause_reason, self.manual_pause
+            self.state, self.pause_reason = PregenState.PAUSED, reason
+            self.manual_pause = self.manual_pause or manual
+            self._paused_at = time.monotonic()
+            self._samples.clear()
+        if await self._send("chunky pause") is None:
+            with self._lock:
+                self.state, self.pause_reason, self.manual_pause = previous
+            return False
+        return True
+
+    async def resume(self) -> bool:
+        """Continues a paused task. Automatic pauses apply again at the next check."""
+        if await self._send("chunky continue") is None:
+            return False
+        with self._lock:
+            self._set_running(time.monotonic())
+        self._wake_loop()
+        return True
+
+    async def cancel(self) -> bool:
+        if await self._send("chunky cancel", "chunky confirm") is None:
+            return False
+        with self._lock:
+            self.state, self.pause_reason, self.manual_pause = PregenState.IDLE, None, False
+            self.progress = None
+            self._samples.clear()
+        return True
+
+    # --- Automatic throttling ---
+
+    async def _run_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.config.check_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.check()
+            except Exception as e:
+                logger.exception(f"Pre-generation check failed: {e}")
+
+    async def measure_tps(self) -> Optional[float]:
+        response = await asyncio.to_thread(self.msc.run_server_command, "tps")
+        self.last_tps = parse_tps(response) if response else None
+        return self.last_tps
+
+    def _pause_reason(self, players: int, tps: Optional[float], now: float) -> Optional[tuple[str, str]]:
+        """Returns the kind ('players' or 'tps') and a description of why generation should pause, if it should."""
+        if self.config.pause_with_players and players >= self.config.pause_with_players:
+            return "players", f"{players} player{'s' if players != 1 else ''} online"
+        if tps is not None and tps < self.config.min_tps:
+            return "tps", f"TPS {tps:.1f}"
+        if now - self._last_overload < self.config.overload_window:
+            return "tps", "server can't keep up"
+        return None
+
+    async def check(self) -> Optional[str]:
+        """Pauses or resumes the task if needed. Returns 'paused', 'resumed' or None if nothing changed."""
+        if self.state not in (PregenState.RUNNING, PregenState.PAUSED) or self.manual_pause:
+            return None
+        server_state = self.state_manager.get_current_state()
+        if self.msc.stop_requested or not server_state.is_ready:
+            return None
+
+        tps = await self.measure_tps()
+        now = time.monotonic()
+        reason = self._pause_reason(len(server_state.online_players), tps, now)
+
+        if self.state == PregenState.RUNNING:
+            if reason is None:
+                if now - self._running_since > self.config.max_cooldown:
+                    # Ran without trouble for a while, so the next low TPS pause starts short again
+                    self._cooldown = self.config.cooldown
+                return None
+            kind, description = reason
+            if not await self.pause(description, manual=False):
+                return None
+            if kind == "tps":
+                self._resume_after = now + self._cooldown
+                self._cooldown = min(self._cooldown * 2, self.config.max_cooldown)
+            PREGEN_PAUSES.inc(reason=kind)
+            logger.info(f"Pre-generation paused: {description}.")
+            return "paused"
+
+        # Paused: the lower 'min_tps' only pauses, resuming needs 'resume_tps'
+        if reason is None and (tps is None or tps >= self.config.resume_tps) and now >= self._resume_after:
+            if await self.resume():
+                logger.info("Pre-generation resumed.")
+                return "resumed"
+        elif reason:
+            self.pause_reason = reason[1]
+        return None
+
+    # --- Reporting ---
+
+    def eta(self) -> Optional[float]:
+        """
+        Seconds of generation left, from the progress rate of the last minutes of running.
+        Falls back to Chunky's own estimate. Paused time is not included.
+        """
+        with self._lock:
+            if self.progress is None:
+                return None
+            if len(self._samples) >= 2:
+                (t0, p0), (t1, p1) = self._samples[0], self._samples[-1]
+                if t1 > t0 and p1 > p0:
+                    return (100 - p1) / ((p1 - p0) / (t1 - t0))
+            return self.progress.eta
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from src.config_models import ReconcilerConfig
+from src.metrics.registry import REGISTRY
+from src.server_log.parser import LogPattern
+from src.server_log.state_manager import StateManager
+from .services import MinecraftServerController
+
+logger = logging.getLogger(__name__)
+
+DRIFT_TOTAL = REGISTRY.counter("mc_player_list_drift_total", "RCON 'list' results that disagreed with the log-derived players.")
+RECONCILE_INTERVAL = REGISTRY.gauge("mc_player_list_reconcile_interval_seconds", "Current delay between two 'list' polls.")
+
+_PLAYER_EVENTS = (LogPattern.USER_LOGIN, LogPattern.USER_LOGOUT, LogPattern.PLAYER_DISCONNECTED)
+
+
+def parse_list_response(response: str) -> Optional[list[str]]:
+    """Returns the players of a 'list' response, or None if it is not one."""
+    match = LogPattern.LIST_PLAYERS.value.search(response)
+    if not match:
+        return None
+    players = match.group("players").strip()
+    return [name.strip() for name in players.split(",") if name.strip()] if players else []
+
+
+class PlayerListReconciler:
+    """
+    Polls 'list' over RCON and corrects the log-derived player list when the two disagree.
+
+    The poll interval grows by 'growth_factor' while they agree, up to 'max_interval', and drops
+    back to 'min_interval' after drift or a burst of joins/leaves, so a quiet server costs almost nothing.
+    """
+
+    def __init__(self, config: ReconcilerConfig, msc: MinecraftServerController, state_manager: StateManager):
+        self.config = config
+        self.msc = msc
+        self.state_manager = state_manager
+        self.interval = config.min_interval
+        self.drift_count = 0
+        self.checks = 0
+        # Join/leave events seen in the log, updated from the log watcher thread
+        self._event_times: deque[float] = deque()
+        self._event_seq = 0
+        self._lock = threading.Lock()
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        RECONCILE_INTERVAL.set_function(lambda: self.interval)
+
+    def start(self):
+        """Starts the polling loop on the running event loop."""
+        if self.config.enabled and self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            self.state_manager.add_listener(self.on_log_event)
+            self._task = asyncio.create_task(self._run_loop(), name="player-reconciler")
+            logger.info("Player list reconciler started.")
+
+    async def stop(self):
+        """Stops the polling loop."""
+        if self._task:
+            self.state_manager.remove_listener(self.on_log_event)
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def on_log_event(self, event_type: LogPattern, data: dict):
+        """StateManager listener, runs in the log watcher thread."""
+        if event_type not in _PLAYER_EVENTS:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._event_seq += 1
+            self._event_times.append(now)
+            while self._event_times and now - self._event_times[0] > self.config.burst_window:
+                self._event_times.popleft()
+            burst = len(self._event_times) >= self.config.burst_events
+        if burst and self.interval > self.config.min_interval:
+            self.interval = self.config.min_interval
+            if self._loop and self._wake:
+                # Wake the sleeping loop so the shorter interval applies right away
+                self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def _run_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.check()
+            except Exception as e:
+                logger.exception(f"Player list reconciliation failed: {e}")
+
+    async def check(self, force: bool = False) -> Optional[bool]:
+        """
+        Runs one reconciliation. Returns True if drift was found and corrected, False if the lists
+        agreed, and None if nothing could be compared (server not ready, RCON failed, concurrent joins).
+        'force' skips the readiness check, e.g. when the bot starts next to an already running server.
+        """
+        if self.msc.stop_requested or not (force or self.state_manager.get_current_state().is_ready):
+            return None
+
+        with self._lock:
+            seq_before = self._event_seq
+        response = await asyncio.to_thread(self.msc.run_server_command, "list")
+        players = parse_list_response(response) if response else None
+        if players is None:
+            return None
+        self.checks += 1
+
+        with self._lock:
+            raced = self._event_seq != seq_before
+        if raced:
+            # A join or leave was logged during the round trip, either answer may be the newer one
+            self.interval = self.config.min_interval
+            return None
+
+        log_players = self.state_manager.get_current_state().online_players
+        if sorted(log_players) == sorted(players):
+            self.interval = min(self.interval * self.config.growth_factor, self.config.max_interval)
+            return False
+
+        self.drift_count += 1
+        DRIFT_TOTAL.inc()
+        joined, left = self.state_manager.set_online_players(players)
+        logger.warning(f"Player list drift corrected (#{self.drift_count}): "
+                       f"missing {joined or 'none'}, stale {left or 'none'}.")
+        self.interval = self.config.min_interval
+        return True
@@ -5,6 +5,8 @@ class ServerCommand(Enum):
     STOP = "stop"
     RELOAD = "reload"
     SAVE_ALL = "save-all"
+    SAVE_OFF = "save-off"
+    SAVE_ON = "save-on"
     LIST = "list"
     BAN = "ban"
     PARDON = "pardon"
@@ -0,0 +1,176 @@
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Generic, Optional, TypeVar
+
+from src.server_log.parser import LogPattern
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+PROPERTIES_FILE = "server.properties"
+WHITELIST_FILE = "whitelist.json"
+OPS_FILE = "ops.json"
+BANS_FILE = "banned-players.json"
+USERCACHE_FILE = "usercache.json"
+
+
+def parse_properties(text: str) -> dict[str, str]:
+    """Parses a Java .properties file as written by the server (no line continuations)."""
+    properties = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line[0] in "#!":
+            continue
+        # The key ends at the first unescaped '=' or ':'
+        for i, char in enumerate(line):
+            if char in "=:" and (i == 0 or line[i - 1] != "\\"):
+                key, value = line[:i], line[i + 1:]
+                break
+        else:
+            key, value = line, ""
+        properties[key.strip().replace("\\:", ":").replace("\\=", "=")] = (
+            value.strip().replace("\\:", ":").replace("\\=", "=").replace("\\\\", "\\"))
+    return properties
+
+
+def parse_json_list(text: str) -> list[dict]:
+    """Parses one of the server's JSON player files, tolerating an empty file."""
+    data = json.loads(text) if text.strip() else []
+    return data if isinstance(data, list) else []
+
+
+class CachedFile(Generic[T]):
+    """A parsed file that is only read again when its modification time or size changed."""
+
+    def __init__(self, path: Path, parser: Callable[[str], T], default: T):
+        self.path = path
+        self.parser = parser
+        self.default = default
+        self.parse_count = 0
+        self._signature: Optional[tuple[int, int]] = None
+        self._value: T = default
+        self._lock = threading.Lock()
+
+    @property
+    def signature(self) -> Optional[tuple[int, int]]:
+        """(mtime_ns, size) of the file the current value was parsed from."""
+        return self._signature
+
+    def get(self) -> T:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return self.default
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if signature != self._signature:
+                try:
+                    self._value = self.parser(self.path.read_text(encoding="utf-8"))
+                    self.parse_count += 1
+                except (OSError, ValueError) as e:
+                    # The server may be rewriting the file, keep the last good value
+                    logger.warning(f"Could not parse '{self.path.name}': {e}")
+                    return self._value
+                self._signature = signature
+            return self._value
+
+
+class ServerFiles:
+    """
+    Read-only access to the server's configuration and player files, so questions like
+    'who is whitelisted' need no RCON round trip. Every file is parsed once and cached.
+    """
+
+    def __init__(self, server_dir: Path):
+        self.server_dir = Path(server_dir)
+        self._properties = CachedFile(self.server_dir / PROPERTIES_FILE, parse_properties, {})
+        self._json_files: dict[str, CachedFile[list[dict]]] = {}
+        # UUIDs seen in the log since the start, newer than the usercache the server writes lazily
+        self._seen_uuids: dict[str, str] = {}
+        self._seen_version = 0
+        # Lookup tables derived from the usercache and the seen UUIDs, rebuilt only when one of them changed
+        self._index_key: Optional[tuple] = None
+        self._uuids: dict[str, str] = {}
+        self._uuids_lower: dict[str, str] = {}
+        self._names: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def properties(self) -> dict[str, str]:
+        return self._properties.get()
+
+    def json_file(self, file_name: str) -> list[dict]:
+        return self._cached_json(file_name).get()
+
+    def _cached_json(self, file_name: str) -> CachedFile[list[dict]]:
+        with self._lock:
+            cached = self._json_files.get(file_name)
+            if cached is None:
+                cached = self._json_files[file_name] = CachedFile(self.server_dir / file_name, parse_json_list, [])
+        return cached
+
+    def player_names(self, file_name: str) -> list[str]:
+        """Returns the names in a player file like whitelist.json or ops.json."""
+        return [entry["name"] for entry in self.json_file(file_name) if entry.get("name")]
+
+    def whitelist(self) -> list[dict]:
+        return self.json_file(WHITELIST_FILE)
+
+    def ops(self) -> list[dict]:
+        return self.json_file(OPS_FILE)
+
+    def bans(self) -> list[dict]:
+        return self.json_file(BANS_FILE)
+
+    def record_uuid(self, name: str, uuid: str):
+        """Remembers a UUID from a 'UUID of player ...' log line."""
+        with self._lock:
+            if self._seen_uuids.get(name) != uuid:
+                self._seen_uuids[name] = uuid
+                self._seen_version += 1
+
+    def _update_indexes(self):
+        """Rebuilds the lookup tables if the usercache or the seen UUIDs changed since the last lookup."""
+        usercache = self._cached_json(USERCACHE_FILE)
+        entries = usercache.get()
+        with self._lock:
+            key = (usercache.signature if entries is not usercache.default else None, self._seen_version)
+            if key == self._index_key:
+                return
+            cached = [(entry["name"], entry["uuid"]) for entry in entries if entry.get("name") and entry.get("uuid")]
+            self._uuids = dict(cached)
+            self._uuids.update(self._seen_uuids)
+            self._uuids_lower = {}
+            for name, uuid in self._uuids.items():
+                self._uuids_lower.setdefault(name.lower(), uuid)
+            # The first usercache entry of a UUID, overridden by the newest name seen in the log
+            self._names = {}
+            for name, uuid in cached:
+                self._names.setdefault(uuid.lower(), name)
+            self._names.update((uuid.lower(), name) for name, uuid in self._seen_uuids.items())
+            self._index_key = key
+
+    def uuid_index(self) -> dict[str, str]:
+        """Returns name -> UUID from the usercache, overridden by UUIDs seen in the log. Must not be modified."""
+        self._update_indexes()
+        return self._uuids
+
+    def uuid_for(self, name: str) -> Optional[str]:
+        self._update_indexes()
+        if name in self._uuids:
+            return self._uuids[name]
+        # Player names are case-insensitive
+        return self._uuids_lower.get(name.lower())
+
+    def name_for(self, uuid: str) -> Optional[str]:
+        """Returns the current name of a UUID, preferring names seen in the log over the usercache."""
+        self._update_indexes()
+        return self._names.get(uuid.lower())
+
+    def on_log_event(self, event_type: LogPattern, data: dict):
+        """StateManager listener that feeds PLAYER_UUID events into the UUID index."""
+        if event_type == LogPattern.PLAYER_UUID and data.get("username") and data.get("uuid"):
+            self.record_uuid(data["username"], data["uuid"])
@@ -1,13 +1,31 @@
+import os
 import subprocess
 import logging
+import threading
+import time
+from typing import Optional
 from mcrcon import MCRcon, MCRconException
 
 from src.config_models import ServerConfig
-from src.terminal_service import run_commands, get_all_running_screens
+from src.terminal_service import (run_commands, get_all_running_screens, get_screen_pid, pid_exists, quit_screen,
+                                  get_child_pids)
+from src.metrics.registry import REGISTRY
+from src.metrics.tracing import span
 from .server_commands import ServerCommand
 
 logger = logging.getLogger(__name__)
 
+RCON_LATENCY = REGISTRY.histogram("mc_rcon_command_seconds", "Round trip time of RCON commands.", ("command",))
+RCON_ERRORS = REGISTRY.counter("mc_rcon_errors_total", "Failed RCON commands by error type.", ("command", "error"))
+
+# Command names used as metric labels, anything else is reported as 'other' to bound the label set.
+_KNOWN_COMMANDS = {command.value for command in ServerCommand}
+
+
+def _command_label(command: str) -> str:
+    name = command.split(maxsplit=1)[0] if command.strip() else ""
+    return name if name in _KNOWN_COMMANDS else "other"
+
 class MinecraftServerController:
     def __init__(self, server_config: ServerConfig):
         self.config = server_config
@@ -16,6 +34,16 @@ class MinecraftServerController:
             port=self.config.rcon_port,
             password=self.config.rcon_password
         )
+        # MCRcon keeps a single socket, so a whole connect -> command(s) -> disconnect sequence
+        # must not interleave with another thread's (pollers run next to user commands)
+        self._rcon_lock = threading.Lock()
+        # PID of the screen session the server runs in, if it was started by us
+        self.pid: Optional[int] = None
+        # Wall-clock time of the last start, used to find crash reports of this run
+        self.started_at: Optional[float] = None
+        # Set while a stop was requested by us, so an exit is not mistaken for a crash.
+        # Cleared by the supervisor once the process is down, or by the next start()
+        self.stop_requested = False
 
     def _compose_server_start_command(self) -> list:
         """Returns a list of the start command arguments for a server."""
@@ -31,13 +59,20 @@ class MinecraftServerController:
         Checks if the server is running by attempting an RCON connection.
         This is more reliable than checking for a screen session.
         """
+        start = time.perf_counter()
         try:
-            self.rcon.connect()
-            self.rcon.disconnect()
+            with span("rcon:connect"), self._rcon_lock:
+                try:
+                    self.rcon.connect()
+                finally:
+                    self.rcon.disconnect()
+            RCON_LATENCY.observe(time.perf_counter() - start, command="connect")
             return True
         except MCRconException:
+            RCON_ERRORS.inc(command="connect", error="rcon")
             return False
         except ConnectionRefusedError: # Also catch if the port is not even open
+            RCON_ERRORS.inc(command="connect", error="refused")
             return False
 
     def start(self):
@@ -51,15 +86,81 @@ class MinecraftServerController:
         logger.info(">> Launching the server...")
         try:
             run_commands(server_start_command, self.config.dir)
-            logger.info(f"Server process started in screen session '{self.screen_name}'.")
+            self.stop_requested = False
+            self.started_at = time.time()
+            self.pid = get_screen_pid(self.screen_name)
+            logger.info(f"Server process started in screen session '{self.screen_name}' (PID {self.pid}).")
         except (subprocess.CalledProcessError, FileNotFoundError) as e:
             logger.exception("Could not start the server! Check your 'config.toml' and ensure 'screen' is installed.")
             raise e
 
+    def process_alive(self) -> bool:
+        """Checks whether the server process still exists, via the PID of its screen session."""
+        if self.pid is None:
+            # E.g. the bot was restarted while the server kept running
+            self.pid = get_screen_pid(self.screen_name)
+        if self.pid is None or not pid_exists(self.pid):
+            self.pid = None
+            return False
+        return True
+
+    def kill_session(self) -> bool:
+        """Terminates the screen session of a server that no longer responds."""
+        logger.warning(f">> Terminating the screen session '{self.screen_name}'...")
+        return quit_screen(self.screen_name)
+
+    def send_signal(self, sig: int) -> bool:
+        """
+        Sends a signal to the Java process inside the screen session
+        (or to the screen session itself if the child cannot be found).
+        """
+        if not self.process_alive():
+            return False
+        target = next(iter(get_child_pids(self.pid)), self.pid)
+        try:
+            os.kill(target, sig)
+            logger.warning(f">> Sent signal {sig} to the server process (PID {target}).")
+            return True
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            logger.error(f"Not allowed to send signal {sig} to PID {target}.")
+            return False
+
     def stop(self) -> bool:
         """Stops the Minecraft server using an RCON command."""
         logger.info(">> Sending stop command to the server via RCON...")
-        return self.run_server_command(ServerCommand.STOP.value)
+        self.stop_requested = True
+        response = self.run_server_command(ServerCommand.STOP.value)
+        if response is False:
+            self.stop_requested = False
+        return response
+
+    def run_server_commands(self, commands: list[str]) -> list[bool | str]:
+        """
+        Runs several commands in one RCON session, saving a connect and login per command.
+        Returns one response per command, False for commands that could not be sent.
+        """
+        responses: list[bool | str] = []
+        try:
+            with span("rcon:batch"), self._rcon_lock:
+                try:
+                    self.rcon.connect()
+                    for command in commands:
+                        label = _command_label(command)
+                        start = time.perf_counter()
+                        responses.append(self.rcon.command(command))
+                        RCON_LATENCY.observe(time.perf_counter() - start, command=label)
+                finally:
+                    self.rcon.disconnect()
+            logger.info(f"Executed {len(commands)} commands in one RCON session.")
+        except MCRconException as e:
+            RCON_ERRORS.inc(command="batch", error="rcon")
+            logger.error(f"RCON session failed after {len(responses)} of {len(commands)} commands: {e}")
+        except ConnectionRefusedError:
+            RCON_ERRORS.inc(command="batch", error="refused")
+            logger.error(f"RCON connection refused. Is the server running and is RCON configured correctly?")
+        return responses + [False] * (len(commands) - len(responses))
 
     def run_server_command(self, command: str) -> bool | str:
         """Runs a command on the Minecraft server via RCON."""
@@ -67,15 +168,23 @@ class MinecraftServerController:
             logger.error("Invalid command type. Command must be a string.")
             return False
         
+        label = _command_label(command)
+        start = time.perf_counter()
         try:
-            self.rcon.connect()
-            response = self.rcon.command(command)
+            with span(f"rcon:{label}"), self._rcon_lock:
+                try:
+                    self.rcon.connect()
+                    response = self.rcon.command(command)
+                finally:
+                    self.rcon.disconnect()
             logger.info(f"Command '{command.strip()}' executed via RCON. Response: {response}")
-            self.rcon.disconnect()
+            RCON_LATENCY.observe(time.perf_counter() - start, command=label)
             return response
         except MCRconException as e:
+            RCON_ERRORS.inc(command=label, error="rcon")
             logger.error(f"Failed to execute RCON command '{command.strip()}': {e}")
             return False
         except ConnectionRefusedError:
+            RCON_ERRORS.inc(command=label, error="refused")
             logger.error(f"RCON connection refused. Is the server running and is RCON configured correctly?")
             return False
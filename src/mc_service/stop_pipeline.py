@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import signal
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+from src.config_models import StopConfig
+from src.server_log.parser import LogPattern
+from src.server_log.state_manager import StateManager
+from .command_models import SaveAllCommand
+from .services import MinecraftServerController
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[str], Awaitable[None]]
+
+# Seconds between two checks whether the server process has exited.
+_EXIT_POLL_INTERVAL = 0.5
+
+
+@dataclass
+class StopResult:
+    success: bool = False
+    duration: float = 0.0  # Seconds from the first stage until the process was gone
+    escalation: Optional[str] = None  # 'SIGTERM' or 'SIGKILL' if the server had to be forced down
+    stages: dict[str, float] = field(default_factory=dict)  # Stage name -> seconds since the start
+
+
+class _StopRun:
+    """State of a single pipeline run, shared between the log watcher thread and the event loop."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, progress: ProgressCallback):
+        self.loop = loop
+        self.progress = progress
+        self.start = time.monotonic()
+        self.result = StopResult()
+        self.log_events: dict[str, asyncio.Event] = {"stopping": asyncio.Event(), "saved": asyncio.Event()}
+
+    def mark(self, stage: str):
+        self.result.stages.setdefault(stage, time.monotonic() - self.start)
+
+    def on_log_event(self, event_type: LogPattern, data: dict):
+        # Called from the log watcher thread
+        if event_type == LogPattern.SERVER_STOPPING:
+            self.loop.call_soon_threadsafe(self.log_events["stopping"].set)
+        elif event_type == LogPattern.WORLD_SAVED:
+            self.loop.call_soon_threadsafe(self.log_events["saved"].set)
+
+
+class StopPipeline:
+    """
+    Stops the server in stages and only reports success once the process has really exited:
+    save-all, stop, waiting for the shutdown log lines and the process exit, then SIGTERM and
+    SIGKILL if a timeout passes.
+    """
+
+    LOG_STAGE_MESSAGES = {
+        "stopping": "🛑 Server is shutting down...",
+        "saved": "💾 All dimensions are saved, waiting for the process to exit...",
+    }
+
+    def __init__(self, stop_config: StopConfig, msc: MinecraftServerController, state_manager: StateManager):
+        self.config = stop_config
+        self.msc = msc
+        self.state_manager = state_manager
+        self._lock = asyncio.Lock()
+
+    async def run(self, progress: Optional[ProgressCallback] = None) -> StopResult:
+        """Runs the pipeline. A second caller waits for the running pipeline to finish first."""
+        async with self._lock:
+            run = _StopRun(asyncio.get_running_loop(), progress or _no_progress)
+            self.state_manager.add_listener(run.on_log_event)
+            try:
+                return await self._run(run)
+            finally:
+                self.state_manager.remove_listener(run.on_log_event)
+
+    async def _run(self, run: _StopRun) -> StopResult:
+        result = run.result
+        if await asyncio.to_thread(self.msc.run_server_command, SaveAllCommand().to_command_string()) is not False:
+            run.mark("save-all")
+            await run.progress("💾 World saved, sending stop...")
+
+        if await asyncio.to_thread(self.msc.stop) is not False:
+            run.mark("stop")
+        else:
+            logger.warning("Stop pipeline: the stop command could not be sent.")
+        # Set even if RCON failed, so the supervisor does not treat the exit as a crash
+        self.msc.stop_requested = True
+
+        exited = await self._wait_for_exit(run, self.config.stop_timeout)
+        for sig, timeout in ((signal.SIGTERM, self.config.term_timeout), (signal.SIGKILL, self.config.kill_timeout)):
+            if exited:
+                break
+            await run.progress(f"⚠️ Server did not exit in time, sending {sig.name}...")
+            await asyncio.to_thread(self.msc.send_signal, sig)
+            result.escalation = sig.name
+            run.mark(sig.name)
+            exited = await self._wait_for_exit(run, timeout)
+
+        result.success = exited
+        result.duration = time.monotonic() - run.start
+        if exited:
+            run.mark("exited")
+            self.state_manager.reset()
+            logger.info(f"Server stopped in {result.duration:.1f}s (escalation: {result.escalation}).")
+        else:
+            logger.error(f"Server is still running after {result.duration:.1f}s, giving up.")
+        return result
+
+    async def _wait_for_exit(self, run: _StopRun, timeout: float) -> bool:
+        """Waits for the process to exit, reporting shutdown log lines and periodic progress."""
+        deadline = time.monotonic() + timeout
+        next_update = time.monotonic() + self.config.progress_interval
+        while time.monotonic() < deadline:
+            if not await asyncio.to_thread(self.msc.process_alive):
+                return True
+
+            for stage, event in run.log_events.items():
+                if event.is_set() and stage not in run.result.stages:
+                    run.mark(stage)
+                    await run.progress(self.LOG_STAGE_MESSAGES[stage])
+
+            if time.monotonic() >= next_update:
+                next_update += self.config.progress_interval
+                await run.progress(f"⏳ Still waiting for the server to exit ({deadline - time.monotonic():.0f}s left)...")
+            await asyncio.sleep(min(_EXIT_POLL_INTERVAL, max(deadline - time.monotonic(), 0)))
+        return not await asyncio.to_thread(self.msc.process_alive)
+
+
+async def _no_progress(message: str) -> None:
+    pass
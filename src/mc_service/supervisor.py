@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+from src.config_models import SupervisorConfig
+from src.server_log.state_manager import StateManager
+from .services import MinecraftServerController
+
+logger = logging.getLogger(__name__)
+
+CRASH_REPORT_DIR = "crash-reports"
+
+
+def summarize_crash_report(server_dir: str, since: Optional[float] = None) -> Optional[str]:
+    """
+    Returns a short summary of the newest crash report written after 'since',
+    or None if there is none.
+    """
+    report_dir = Path(server_dir) / CRASH_REPORT_DIR
+    if not report_dir.is_dir():
+        return None
+    reports = [p for p in report_dir.glob("crash-*.txt") if since is None or p.stat().st_mtime >= since]
+    if not reports:
+        return None
+    report = max(reports, key=lambda p: p.stat().st_mtime)
+
+    description, exception = None, None
+    with report.open("r", encoding="utf-8", errors="replace") as f:
+        lines = [line.rstrip() for line in f]
+    for i, line in enumerate(lines):
+        if line.startswith("Description:"):
+            description = line.removeprefix("Description:").strip()
+            # The exception follows the description after an empty line
+            exception = next((l for l in lines[i + 1:] if l.strip()), None)
+            break
+
+    summary = f"{report.name}"
+    if description:
+        summary += f"\nDescription: {description}"
+    if exception:
+        summary += f"\n{exception.strip()}"
+    return summary
+
+
+class ServerSupervisor:
+    """
+    Detects unexpected server exits and restarts the server with exponential backoff.
+
+    A crash is an exit we did not ask for: the screen session/PID disappears, or RCON stays dead
+    for several checks while the server was ready. After 'max_restarts' restarts within
+    'restart_window' seconds the supervisor gives up, to avoid crash loops.
+    """
+
+    def __init__(self, supervisor_config: SupervisorConfig, msc: MinecraftServerController,
+                 state_manager: StateManager,
+                 start_server: Callable[[], Awaitable[None]],
+                 notify: Callable[[str], Awaitable[None]]):
+        self.config = supervisor_config
+        self.msc = msc
+        self.state_manager = state_manager
+        self._start_server = start_server
+        self._notify = notify
+        self._armed = False
+        self._rcon_failures = 0
+        self._restarts: deque[float] = deque()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Starts the periodic health check on the running event loop."""
+        if self.config.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run_loop(), name="supervisor")
+            logger.info("Server supervisor started.")
+
+    async def stop(self):
+        """Stops the health check."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run_loop(self):
+        while True:
+            await asyncio.sleep(self.config.check_interval)
+            try:
+                await self.check()
+            except Exception as e:
+                logger.exception(f"Supervisor check failed: {e}")
+
+    async def check(self, now: Optional[float] = None):
+        """Runs one health check and handles a crash if one is detected."""
+        now = time.monotonic() if now is None else now
+        if self.msc.stop_requested:
+            # The server is going down on purpose
+            self._armed = False
+            self._rcon_failures = 0
+            if not await asyncio.to_thread(self.msc.process_alive):
+                # The stop is done, so a server started later (e.g. from the console) is supervised again
+                logger.info("Supervisor: the server stopped as requested.")
+                self.msc.stop_requested = False
+            return
+
+        alive = await asyncio.to_thread(self.msc.process_alive)
+        if not self._armed:
+            # Only supervise a server that was seen running
+            self._armed = alive
+            return
+
+        if not alive:
+            await self._handle_crash("the server process disappeared", now)
+            return
+
+        if not self.state_manager.get_current_state().is_ready:
+            return  # RCON is not up yet while the server is starting
+        if await asyncio.to_thread(lambda: self.msc.is_running):
+            self._rcon_failures = 0
+            return
+
+        self._rcon_failures += 1
+        logger.warning(f"Supervisor: RCON is not responding ({self._rcon_failures}/{self.config.rcon_failure_threshold}).")
+        if self._rcon_failures >= self.config.rcon_failure_threshold:
+            await asyncio.to_thread(self.msc.kill_session)
+            await self._handle_crash("RCON stopped responding", now)
+
+    def backoff_delay(self, restarts_in_window: int) -> float:
+        """Exponential backoff: base, 2*base, 4*base, ... capped at backoff_max."""
+        return min(self.config.backoff_base * 2 ** restarts_in_window, self.config.backoff_max)
+
+    async def _handle_crash(self, reason: str, now: float):
+        self._armed = False
+        self._rcon_failures = 0
+        self.state_manager.reset()
+        logger.error(f"Supervisor: server crash detected, {reason}.")
+
+        notice = f"💥 The server crashed: {reason}."
+        summary = await asyncio.to_thread(summarize_crash_report, self.msc.config.dir, self.msc.started_at)
+        if summary:
+            notice += f"\n\n📄 Crash report:\n{summary}"
+
+        while self._restarts and now - self._restarts[0] > self.config.restart_window:
+            self._restarts.popleft()
+
+        if not self.config.auto_restart:
+            await self._notify(notice)
+            return
+        if len(self._restarts) >= self.config.max_restarts:
+            logger.error("Supervisor: crash loop detected, giving up.")
+            await self._notify(notice + f"\n\n🛑 Crashed {len(self._restarts) + 1} times within "
+                                        f"{self.config.restart_window}s, not restarting again.")
+            return
+
+        delay = self.backoff_delay(len(self._restarts))
+        self._restarts.append(now)
+        await self._notify(notice + f"\n\n🔄 Restarting in {delay:.0f}s "
+                                    f"(attempt {len(self._restarts)}/{self.config.max_restarts}).")
+        await asyncio.sleep(delay)
+        if self.msc.stop_requested:
+            logger.info("Supervisor: a stop was requested during the backoff, not restarting.")
+            return
+        await self._start_server()
@@ -0,0 +1,67 @@
+import asyncio
+import logging
+from typing import Optional
+
+from .registry import MetricsRegistry, REGISTRY
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds a client may take to send its request.
+_REQUEST_TIMEOUT = 5
+
+
+class MetricsServer:
+    """A minimal asyncio HTTP server that exposes the registry on GET /metrics."""
+
+    def __init__(self, host: str, port: int, registry: MetricsRegistry = REGISTRY):
+        self.host = host
+        self.port = port
+        self.registry = registry
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def bound_port(self) -> Optional[int]:
+        if not self._server or not self._server.sockets:
+            return None
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        logger.info(f"Metrics endpoint listening on http://{self.host}:{self.bound_port}/metrics")
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), _REQUEST_TIMEOUT)
+            # Skip the headers, nothing in them matters here
+            while (await asyncio.wait_for(reader.readline(), _REQUEST_TIMEOUT)).strip():
+                pass
+
+            parts = request_line.decode("latin-1").split()
+            if len(parts) < 2 or parts[0] not in ("GET", "HEAD"):
+                await self._respond(writer, "405 Method Not Allowed", "Method not allowed\n")
+            elif parts[1].split("?", 1)[0] != "/metrics":
+                await self._respond(writer, "404 Not Found", "Not found, try /metrics\n")
+            else:
+                await self._respond(writer, "200 OK", self.registry.render(), head_only=parts[0] == "HEAD")
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: str, body: str, head_only: bool = False):
+        payload = body.encode("utf-8")
+        headers = (f"HTTP/1.1 {status}\r\n"
+                   f"Content-Type: {CONTENT_TYPE}\r\n"
+                   f"Content-Length: {len(payload)}\r\n"
+                   f"Connection: close\r\n\r\n")
+        writer.write(headers.encode("latin-1") + (b"" if head_only else payload))
+        await writer.drain()
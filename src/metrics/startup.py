@@ -0,0 +1,73 @@
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Awaitable, Optional, TypeVar
+
+from .registry import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+STARTUP_PHASE = REGISTRY.gauge("mc_bot_startup_phase_seconds", "Duration of each bot startup phase.", ("phase",))
+STARTUP_READY = REGISTRY.gauge("mc_bot_startup_ready_seconds",
+                               "Time from process start until the bot accepted Telegram updates.")
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class Phase:
+    name: str
+    start: float  # Seconds after process start
+    duration: float
+
+
+class StartupProfile:
+    """
+    Records how long each startup phase took, relative to process start.
+    Phases may overlap, e.g. when they run concurrently.
+    """
+
+    def __init__(self, started_at: Optional[float] = None):
+        # A time.perf_counter() value, taken as early as possible in main.py
+        self.started_at = time.perf_counter() if started_at is None else started_at
+        self.phases: list[Phase] = []
+        self.ready_at: Optional[float] = None
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    def record(self, name: str, start: float, end: float):
+        """Records a phase from two time.perf_counter() values."""
+        phase = Phase(name, start - self.started_at, end - start)
+        self.phases.append(phase)
+        STARTUP_PHASE.set(phase.duration, phase=name)
+        logger.debug(f"Startup phase '{name}' took {phase.duration * 1000:.0f}ms.")
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter())
+
+    async def run(self, name: str, awaitable: Awaitable[T]) -> T:
+        """Awaits as a phase, so concurrent phases can be measured with asyncio.gather."""
+        with self.phase(name):
+            return await awaitable
+
+    def mark_ready(self):
+        """Marks the moment the bot answers commands."""
+        self.ready_at = self.elapsed()
+        STARTUP_READY.set(self.ready_at)
+        logger.info(f"Bot is accepting updates {self.ready_at * 1000:.0f}ms after process start.")
+
+    def report(self) -> str:
+        """Lists the phases in the order they started, with their offset from process start."""
+        lines = ["Startup profile:"]
+        for phase in sorted(self.phases, key=lambda p: p.start):
+            lines.append(f"  +{phase.start * 1000:>6.0f}ms {phase.name:<20} {phase.duration * 1000:>6.0f}ms")
+        if self.ready_at is not None:
+            lines.append(f"  accepting updates after {self.ready_at * 1000:.0f}ms")
+        return "\n".join(lines)
@@ -0,0 +1,213 @@
+import contextvars
+import logging
+import math
+import os
+import sys
+import threading
+import time
+from collections import Counter as CollectionsCounter, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# If set, the first request slower than this many milliseconds gets its sampled profile dumped.
+PROFILE_ENV_VAR = "MC_BOT_PROFILE_SLOW_MS"
+PROFILE_DIR = Path("profiles")
+_PROFILE_SAMPLE_INTERVAL = 0.005
+
+
+@dataclass
+class Span:
+    name: str
+    offset: float  # Seconds since the start of the trace
+    duration: float
+
+
+@dataclass
+class Trace:
+    command: str
+    started_at: datetime
+    duration: float = 0.0
+    error: bool = False
+    spans: list[Span] = field(default_factory=list)
+    _start: float = field(default_factory=time.perf_counter, repr=False)
+
+
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("current_trace", default=None)
+
+
+@contextmanager
+def span(name: str):
+    """
+    Records a span in the trace of the current request, if there is one.
+    The trace travels with the context, so spans inside asyncio.to_thread() are recorded too.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        trace.spans.append(Span(name, start - trace._start, end - start))
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(q / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class TraceStore:
+    """Keeps the most recent traces and per-command durations in bounded memory."""
+
+    def __init__(self, max_traces: int = 500, max_samples_per_command: int = 1000):
+        self._traces: deque[Trace] = deque(maxlen=max_traces)
+        self._durations: dict[str, deque[float]] = {}
+        self._max_samples = max_samples_per_command
+        self._lock = threading.Lock()
+
+    def add(self, trace: Trace):
+        with self._lock:
+            self._traces.append(trace)
+            self._durations.setdefault(trace.command, deque(maxlen=self._max_samples)).append(trace.duration)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Returns count and p50/p95/p99 durations (seconds) per command."""
+        with self._lock:
+            durations = {command: sorted(values) for command, values in self._durations.items()}
+        return {
+            command: {
+                "count": len(values),
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "p99": percentile(values, 99),
+            }
+            for command, values in durations.items()
+        }
+
+    def slowest(self, n: int = 5) -> list[Trace]:
+        """Returns the n slowest of the recent traces."""
+        with self._lock:
+            traces = list(self._traces)
+        return sorted(traces, key=lambda t: t.duration, reverse=True)[:n]
+
+
+class SamplingProfiler:
+    """Samples the stacks of all threads at a fixed interval and counts them as collapsed stacks."""
+
+    def __init__(self, interval: float = _PROFILE_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples: CollectionsCounter[str] = CollectionsCounter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def _run(self):
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                if thread_id not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                thread_name = names.get(thread_id, str(thread_id))
+                self.samples[";".join([thread_name, *reversed(stack)])] += 1
+
+    def __enter__(self) -> "SamplingProfiler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def dump(self, path: Path):
+        """Writes the samples in the collapsed stack format used by flame graph tools."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def _profile_threshold() -> Optional[float]:
+    value = os.getenv(PROFILE_ENV_VAR)
+    if not value:
+        return None
+    try:
+        return float(value) / 1000
+    except ValueError:
+        logger.error(f"{PROFILE_ENV_VAR} must be a number of milliseconds, got '{value}'.")
+        return None
+
+
+class Tracer:
+    """Creates a trace per handler invocation and, if enabled, profiles one slow request."""
+
+    def __init__(self, store: TraceStore):
+        self.store = store
+        self.profile_dumped: Optional[Path] = None
+        self._profile_threshold: Optional[float] = None
+        self._threshold_read = False
+
+    @property
+    def profile_threshold(self) -> Optional[float]:
+        """Read on first use, the process-wide tracer is created before main.py loads the .env file."""
+        if not self._threshold_read:
+            self._profile_threshold = _profile_threshold()
+            self._threshold_read = True
+        return self._profile_threshold
+
+    @property
+    def profiling(self) -> bool:
+        return self.profile_threshold is not None and self.profile_dumped is None
+
+    def traced(self, command: str) -> Callable:
+        """Decorator that records a trace for every call of an async handler."""
+        def decorator(func: Callable) -> Callable:
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                trace = Trace(command=command, started_at=datetime.now())
+                token = _current_trace.set(trace)
+                profiler = SamplingProfiler() if self.profiling else None
+                try:
+                    if profiler:
+                        with profiler:
+                            return await func(*args, **kwargs)
+                    return await func(*args, **kwargs)
+                except Exception:
+                    trace.error = True
+                    raise
+                finally:
+                    _current_trace.reset(token)
+                    trace.duration = time.perf_counter() - trace._start
+                    self.store.add(trace)
+                    if profiler and self.profiling and trace.duration >= self.profile_threshold:
+                        self._dump_profile(trace, profiler)
+            return wrapper
+        return decorator
+
+    def _dump_profile(self, trace: Trace, profiler: SamplingProfiler):
+        path = PROFILE_DIR / f"{trace.command}-{trace.started_at.strftime('%Y%m%d-%H%M%S')}.collapsed"
+        profiler.dump(path)
+        self.profile_dumped = path
+        logger.warning(f"Slow request '/{trace.command}' took {trace.duration * 1000:.0f}ms, profile written to {path}.")
+
+
+# The process-wide trace store and tracer used by the bot.
+TRACE_STORE = TraceStore()
+TRACER = Tracer(TRACE_STORE)
@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+
+# Shortcuts supported in place of a five-field expression.
+CRON_ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+    "@yearly": "0 0 1 1 *",
+}
+
+# (min, max) for minute, hour, day of month, month and day of week (0 = Sunday).
+_FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+# A cron expression never matches if nothing is found within this many days (e.g. "0 0 31 2 *").
+_MAX_LOOKAHEAD_DAYS = 366 * 5
+
+
+def _parse_field(field: str, low: int, high: int) -> set[int]:
+    """Parses a single cron field like '*/15', '1-5' or '0,30' into the set of allowed values."""
+    values = set()
+    for part in field.split(","):
+        part_range, _, step_str = part.partition("/")
+        step = int(step_str) if step_str else 1
+        if step < 1:
+            raise ValueError(f"Invalid step in cron field '{field}'.")
+
+        if part_range == "*":
+            start, end = low, high
+        elif "-" in part_range:
+            start_str, end_str = part_range.split("-", 1)
+            start, end = int(start_str), int(end_str)
+        else:
+            start = int(part_range)
+            end = high if step_str else start
+
+        if not low <= start <= end <= high:
+            raise ValueError(f"Cron field '{field}' is out of range ({low}-{high}).")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronExpression:
+    """A standard five-field cron expression: minute, hour, day of month, month, day of week."""
+
+    def __init__(self, expression: str):
+        self.expression = expression.strip()
+        fields = CRON_ALIASES.get(self.expression, self.expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression '{expression}' must have 5 fields.")
+
+        try:
+            parsed = [_parse_field(f, low, high) for f, (low, high) in zip(fields, _FIELD_RANGES)]
+        except ValueError as e:
+            raise ValueError(f"Invalid cron expression '{expression}': {e}") from e
+
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        # Both 0 and 7 mean Sunday
+        self.weekdays = {d % 7 for d in weekdays}
+        # Like cron: if both day fields are restricted, a day matches if either one does
+        self._day_restricted = fields[2] != "*"
+        self._weekday_restricted = fields[4] != "*"
+
+    def _day_matches(self, dt: datetime) -> bool:
+        day_ok = dt.day in self.days
+        # datetime.weekday() is Monday = 0, cron is Sunday = 0
+        weekday_ok = (dt.weekday() + 1) % 7 in self.weekdays
+        if self._day_restricted and self._weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, dt: datetime) -> datetime:
+        """Returns the first matching minute strictly after 'dt'."""
+        candidate = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=_MAX_LOOKAHEAD_DAYS)
+
+        while candidate < limit:
+            if candidate.month not in self.months:
+                # Jump to the first minute of the next month
+                year, month = divmod(candidate.month, 12)
+                candidate = candidate.replace(year=candidate.year + year, month=month + 1, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+                continue
+            if candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+                continue
+            return candidate
+
+        raise ValueError(f"Cron expression '{self.expression}' never matches.")
+
+    def __str__(self) -> str:
+        return self.expression
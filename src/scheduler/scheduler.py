@@ -0,0 +1,175 @@
+import asyncio
+import json
+import logging
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+from src.config_models import ScheduleConfig, ScheduledJobConfig
+from .cron import CronExpression
+
+logger = logging.getLogger(__name__)
+
+JobAction = Callable[[ScheduledJobConfig], Awaitable[Any]]
+
+# Actions that must never overlap with each other (e.g. no backup during a restart).
+EXCLUSIVE_ACTIONS = {"restart", "backup"}
+
+# Upper bound for a single sleep, so clock jumps are picked up quickly.
+_MAX_SLEEP_SECONDS = 60
+
+
+class JobBusyError(RuntimeError):
+    """Raised when a job cannot run because it, or a conflicting job, is already running."""
+
+
+@dataclass
+class ScheduledJob:
+    config: ScheduledJobConfig
+    cron: CronExpression
+    next_run: datetime
+    last_run: Optional[datetime] = None
+    last_result: Optional[str] = None
+    running: bool = False
+
+    @property
+    def name(self) -> str:
+        return self.config.name
+
+
+class Scheduler:
+    """
+    A cron-like asyncio scheduler for routine server work.
+
+    Actions are registered by name and looked up when a job fires. Jobs whose action is in
+    EXCLUSIVE_ACTIONS share the maintenance lock, so they are skipped instead of overlapping.
+    """
+
+    def __init__(self, schedule_config: ScheduleConfig, maintenance_lock: asyncio.Lock):
+        self.config = schedule_config
+        self.maintenance_lock = maintenance_lock
+        self.state_path = Path(schedule_config.state_file).resolve()
+        self._actions: dict[str, JobAction] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._running_tasks: set[asyncio.Task] = set()
+
+        last_runs = self._load_state()
+        now = datetime.now()
+        self.jobs: dict[str, ScheduledJob] = {}
+        for job_config in schedule_config.jobs:
+            if not job_config.enabled:
+                continue
+            cron = CronExpression(job_config.cron)
+            last_run = last_runs.get(job_config.name)
+            job = ScheduledJob(config=job_config, cron=cron, next_run=self._next_run(job_config, cron, now),
+                               last_run=last_run)
+            if job_config.catch_up and last_run and cron.next_after(last_run) < now:
+                logger.info(f"Scheduler: job '{job.name}' missed a run while offline, catching up.")
+                job.next_run = now
+            self.jobs[job.name] = job
+
+    def register_action(self, name: str, action: JobAction):
+        """Registers the coroutine function that executes jobs of the given action type."""
+        self._actions[name] = action
+
+    @staticmethod
+    def _next_run(job_config: ScheduledJobConfig, cron: CronExpression, after: datetime) -> datetime:
+        next_run = cron.next_after(after)
+        if job_config.jitter_seconds:
+            next_run += timedelta(seconds=random.uniform(0, job_config.jitter_seconds))
+        return next_run
+
+    def _load_state(self) -> dict[str, datetime]:
+        if not self.state_path.exists():
+            return {}
+        try:
+            with self.state_path.open("r", encoding="utf-8") as f:
+                return {name: datetime.fromisoformat(ts) for name, ts in json.load(f).items()}
+        except (ValueError, OSError) as e:
+            logger.error(f"Could not read the scheduler state file '{self.state_path}': {e}")
+            return {}
+
+    def _save_state(self):
+        state = {job.name: job.last_run.isoformat() for job in self.jobs.values() if job.last_run}
+        tmp = self.state_path.with_suffix(".tmp")
+        try:
+            with tmp.open("w", encoding="utf-8") as f:
+                json.dump(state, f, indent=2)
+            tmp.replace(self.state_path)
+        except OSError as e:
+            logger.error(f"Could not write the scheduler state file '{self.state_path}': {e}")
+
+    def start(self):
+        """Starts the scheduler loop on the running event loop."""
+        if self._task is None and self.jobs:
+            self._task = asyncio.create_task(self._run_loop(), name="scheduler")
+            logger.info(f"Scheduler started with {len(self.jobs)} job(s).")
+
+    async def stop(self):
+        """Stops the scheduler loop and cancels jobs that are still running."""
+        tasks = [t for t in (self._task, *self._running_tasks) if t]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+
+    async def _run_loop(self):
+        while True:
+            now = datetime.now()
+            for job in self.jobs.values():
+                if job.next_run <= now:
+                    job.next_run = self._next_run(job.config, job.cron, now)
+                    task = asyncio.create_task(self._run_job(job, scheduled=True), name=f"job:{job.name}")
+                    self._running_tasks.add(task)
+                    task.add_done_callback(self._running_tasks.discard)
+
+            next_due = min(job.next_run for job in self.jobs.values())
+            delay = min(max((next_due - datetime.now()).total_seconds(), 0), _MAX_SLEEP_SECONDS)
+            await asyncio.sleep(delay)
+
+    async def trigger(self, name: str) -> str:
+        """Runs a job immediately, outside of its schedule, and returns its result."""
+        job = self.jobs.get(name)
+        if job is None:
+            raise KeyError(name)
+        return await self._run_job(job, scheduled=False)
+
+    async def _run_job(self, job: ScheduledJob, scheduled: bool) -> str:
+        action = self._actions.get(job.config.action)
+        if action is None:
+            raise ValueError(f"No action registered for '{job.config.action}'.")
+
+        if job.running:
+            return self._skip(scheduled, f"Job '{job.name}' is still running.")
+        exclusive = job.config.action in EXCLUSIVE_ACTIONS
+        if exclusive and self.maintenance_lock.locked():
+            return self._skip(scheduled, f"Job '{job.name}' skipped: another maintenance task is running.")
+
+        job.running = True
+        try:
+            logger.info(f"Scheduler: running job '{job.name}' ({job.config.action}).")
+            if exclusive:
+                async with self.maintenance_lock:
+                    result = await action(job.config)
+            else:
+                result = await action(job.config)
+            job.last_result = "ok" if result is not False else "failed"
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception(f"Scheduler: job '{job.name}' failed: {e}")
+            job.last_result = f"error: {e}"
+        finally:
+            job.running = False
+            job.last_run = datetime.now()
+            self._save_state()
+        return job.last_result
+
+    @staticmethod
+    def _skip(scheduled: bool, reason: str) -> str:
+        logger.warning(f"Scheduler: {reason}")
+        if not scheduled:
+            raise JobBusyError(reason)
+        return "skipped"
@@ -0,0 +1,328 @@
+import gzip
+import hashlib
+import json
+import logging
+import lzma
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Callable, Optional
+
+from src.config_models import LogArchiveConfig
+from .parser import LogParser, LogPattern
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_SUFFIX = ".log.xz"
+INDEX_SUFFIX = ".idx.json"
+INDEX_VERSION = 1
+
+# Rotated logs are named like '2026-10-18-1.log.gz'
+_ROTATED_NAME = re.compile(r"^(?P<date>\d{4}-\d{2}-\d{2})-\d+\.log\.gz$")
+_LINE_TIME = re.compile(rb"^\[(\d{2}:\d{2}:\d{2})")
+
+
+@dataclass
+class BlockInfo:
+    """One independently compressed block of an archive and what it contains."""
+    offset: int
+    length: int
+    lines: int
+    first_time: Optional[str]  # 'HH:MM:SS' of the first and last line with a timestamp
+    last_time: Optional[str]
+    players: list[str]
+    patterns: list[str]  # LogPattern names
+
+
+@dataclass
+class ArchiveIndex:
+    """The sidecar index of an archive, stored as '<archive>.idx.json'."""
+    source: str
+    date: Optional[str]
+    source_size: int
+    raw_size: int
+    size: int
+    sha256: str  # Of the uncompressed log
+    blocks: list[BlockInfo]
+
+    def save(self, path: Path):
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps({"version": INDEX_VERSION, **asdict(self)}, separators=(",", ":")))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "ArchiveIndex":
+        data = json.loads(path.read_text())
+        if data.pop("version", None) != INDEX_VERSION:
+            raise ValueError(f"Unknown index format in '{path}'.")
+        data["blocks"] = [BlockInfo(**block) for block in data["blocks"]]
+        return cls(**data)
+
+    def candidate_blocks(self, player: Optional[str] = None, pattern: Optional[LogPattern] = None) -> list[BlockInfo]:
+        """The blocks that can contain lines of 'player' and 'pattern', all others are skipped."""
+        blocks = self.blocks
+        if player:
+            blocks = [b for b in blocks if player.lower() in (p.lower() for p in b.players)]
+        if pattern:
+            blocks = [b for b in blocks if pattern.name in b.patterns]
+        return blocks
+
+
+@dataclass
+class RecompressResult:
+    source: str
+    archive: str
+    bytes_before: int
+    bytes_after: int  # Archive and index
+    blocks: int
+    # A typical search, for the rarest player of the archive: a full scan of the gzip file vs. the indexed archive
+    scan_seconds: Optional[float] = None
+    indexed_seconds: Optional[float] = None
+    blocks_read: Optional[int] = None
+
+
+@dataclass
+class ArchiveReport:
+    """What a run of the log archiver did."""
+    results: list[RecompressResult] = field(default_factory=list)
+    failed: list[str] = field(default_factory=list)
+    duration: float = 0.0
+
+    @property
+    def bytes_before(self) -> int:
+        return sum(r.bytes_before for r in self.results)
+
+    @property
+    def bytes_after(self) -> int:
+        return sum(r.bytes_after for r in self.results)
+
+    @property
+    def search_speedup(self) -> Optional[float]:
+        """How many times faster the measured searches were on the indexed archives."""
+        measured = [r for r in self.results if r.indexed_seconds]
+        if not measured:
+            return None
+        return sum(r.scan_seconds for r in measured) / sum(r.indexed_seconds for r in measured)
+
+    @property
+    def blocks_read_fraction(self) -> Optional[float]:
+        measured = [r for r in self.results if r.blocks_read is not None]
+        if not measured:
+            return None
+        return sum(r.blocks_read for r in measured) / sum(r.blocks for r in measured)
+
+
+def index_path(archive: Path) -> Path:
+    return archive.with_name(archive.name + INDEX_SUFFIX)
+
+
+def archive_path(source: Path) -> Path:
+    """'2026-10-18-1.log.gz' -> '2026-10-18-1.log.xz'"""
+    return source.with_name(source.name.removesuffix(".log.gz") + ARCHIVE_SUFFIX)
+
+
+def _split_blocks(data: bytes, block_size: int) -> list[bytes]:
+    """Splits a log into blocks of about 'block_size' bytes, at line ends."""
+    blocks, start = [], 0
+    while start < len(data):
+        end = data.find(b"\n", min(start + block_size, len(data)) - 1) + 1 or len(data)
+        blocks.append(data[start:end])
+        start = end
+    return blocks
+
+
+def _describe_block(raw: bytes, parser: LogParser) -> tuple[int, Optional[str], Optional[str], set[str], set[str]]:
+    """Returns the line count, first and last time, the players parsed from its events and the pattern names."""
+    lines = raw.splitlines()
+    times = [m.group(1).decode() for m in (_LINE_TIME.match(line) for line in lines) if m]
+    players, patterns = set(), set()
+    for line in lines:
+        result = parser.parse_line(line.decode("utf-8", errors="replace"))
+        if result:
+            pattern, data = result
+            patterns.add(pattern.name)
+            if data.get("username"):
+                players.add(data["username"])
+    return len(lines), times[0] if times else None, times[-1] if times else None, players, patterns
+
+
+def _line_filter(player: Optional[str], pattern: Optional[LogPattern], text: Optional[str]) -> Callable[[str], bool]:
+    """Builds the per-line check of a search, compiled once instead of per line."""
+    player_re = re.compile(rf"\b{re.escape(player)}\b", re.IGNORECASE) if player else None
+    text = text.lower() if text else None
+
+    def matches(line: str) -> bool:
+        if player_re and not player_re.search(line):
+            return False
+        if pattern and not pattern.value.search(line):
+            return False
+        return not text or text in line.lower()
+    return matches
+
+
+def read_block(archive: Path, block: BlockInfo) -> bytes:
+    with open(archive, "rb") as f:
+        f.seek(block.offset)
+        return lzma.decompress(f.read(block.length))
+
+
+def search_archive(archive: Path, index: ArchiveIndex, player: Optional[str] = None,
+                   pattern: Optional[LogPattern] = None, text: Optional[str] = None) -> tuple[list[str], int]:
+    """Returns the matching lines and how many blocks had to be read. Blocks the index rules out are skipped."""
+    matches = []
+    line_filter = _line_filter(player, pattern, text)
+    blocks = index.candidate_blocks(player, pattern)
+    for block in blocks:
+        matches.extend(filter(line_filter, read_block(archive, block).decode("utf-8", errors="replace").splitlines()))
+    return matches, len(blocks)
+
+
+def _scan_gzip(source: Path, player: str) -> list[str]:
+    """The search without an index: decompress the whole file and look at every line."""
+    with gzip.open(source, "rb") as f:
+        lines = f.read().decode("utf-8", errors="replace").splitlines()
+    return list(filter(_line_filter(player, None, None), lines))
+
+
+def recompress_archive(source: str, block_size: int, preset: int, delete_source: bool) -> RecompressResult:
+    """
+    Recompresses a rotated gzip log into independently compressed xz blocks with a sidecar index.
+    The blocks are concatenated xz streams, so 'xz -dc' still reads the whole file.
+    Runs inside the process pool, so it must stay a module-level function.
+    """
+    source_path = Path(source)
+    archive = archive_path(source_path)
+    with gzip.open(source_path, "rb") as f:
+        data = f.read()
+
+    parser = LogParser()
+    blocks, all_players = [], set()
+    tmp = archive.with_name(archive.name + ".tmp")
+    with open(tmp, "wb") as out:
+        for raw in _split_blocks(data, block_size):
+            compressed = lzma.compress(raw, preset=preset)
+            lines, first_time, last_time, players, patterns = _describe_block(raw, parser)
+            all_players |= players
+            blocks.append((raw, BlockInfo(out.tell(), len(compressed), lines, first_time, last_time,
+                                          sorted(players), sorted(patterns))))
+            out.write(compressed)
+
+    # Players are also listed for blocks that mention them without a parsed event, e.g. death messages
+    for raw, block in blocks:
+        text = raw.decode("utf-8", errors="replace").lower()
+        block.players = sorted(set(block.players) | {p for p in all_players if p.lower() in text})
+
+    sha256 = hashlib.sha256(data).hexdigest()
+    with open(tmp, "rb") as f:
+        if hashlib.sha256(lzma.decompress(f.read())).hexdigest() != sha256:
+            tmp.unlink()
+            raise ValueError(f"Recompressed '{source_path.name}' does not match the original.")
+    os.replace(tmp, archive)
+
+    date = _ROTATED_NAME.match(source_path.name)
+    index = ArchiveIndex(source_path.name, date.group("date") if date else None, source_path.stat().st_size,
+                         len(data), archive.stat().st_size, sha256, [block for _, block in blocks])
+    index.save(index_path(archive))
+
+    result = RecompressResult(source_path.name, archive.name, index.source_size,
+                              index.size + index_path(archive).stat().st_size, len(blocks))
+    if all_players:
+        # Measure a typical search, for the player in the fewest blocks
+        player = min(sorted(all_players), key=lambda p: len(index.candidate_blocks(p)))
+        start = time.perf_counter()
+        expected = _scan_gzip(source_path, player)
+        result.scan_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        found, result.blocks_read = search_archive(archive, index, player)
+        result.indexed_seconds = time.perf_counter() - start
+        if found != expected:
+            logger.warning(f"Indexed search in '{archive.name}' found {len(found)} lines, a full scan {len(expected)}.")
+
+    if delete_source:
+        source_path.unlink()
+    return result
+
+
+class LogArchiver:
+    """
+    Maintenance job that turns the server's rotated gzip logs into seekable archives.
+
+    Every archive is a series of independently compressed blocks plus a small index with each
+    block's time range, byte offset, players and LogPattern types, so searches only decompress
+    the blocks that can match instead of whole files.
+    """
+
+    def __init__(self, config: LogArchiveConfig, logs_dir: Path):
+        self.config = config
+        self.logs_dir = Path(logs_dir)
+        self.last_report: Optional[ArchiveReport] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return self._lock.locked()
+
+    def pending(self) -> list[Path]:
+        """Rotated logs that have no archive yet, oldest first."""
+        if not self.logs_dir.is_dir():
+            return []
+        return sorted(p for p in self.logs_dir.glob("*.log.gz") if not index_path(archive_path(p)).exists())
+
+    def archives(self) -> list[tuple[Path, ArchiveIndex]]:
+        """The archives with a readable index, newest first."""
+        result = []
+        for path in sorted(self.logs_dir.glob(f"*{ARCHIVE_SUFFIX}"), reverse=True):
+            try:
+                result.append((path, ArchiveIndex.load(index_path(path))))
+            except (OSError, ValueError, TypeError, KeyError) as e:
+                logger.warning(f"Skipping archive '{path.name}' without a usable index: {e}")
+        return result
+
+    def run(self) -> ArchiveReport:
+        """Recompresses all pending logs in a process pool. Blocking, call it in a thread."""
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("The log archiver is already running.")
+        try:
+            # multiprocessing is only imported when there is work, not at bot startup
+            from concurrent.futures import ProcessPoolExecutor
+            start = time.perf_counter()
+            report = ArchiveReport()
+            pending = self.pending()
+            if pending:
+                with ProcessPoolExecutor(max_workers=self.config.workers) as pool:
+                    futures = {path: pool.submit(recompress_archive, str(path), self.config.block_size,
+                                                 self.config.preset, self.config.delete_source)
+                               for path in pending}
+                    for path, future in futures.items():
+                        try:
+                            report.results.append(future.result())
+                        except Exception as e:
+                            logger.error(f"Could not recompress '{path.name}': {e}")
+                            report.failed.append(path.name)
+            report.duration = time.perf_counter() - start
+            self.last_report = report
+            logger.info(f"Log archiver: {len(report.results)} archives, {report.bytes_before} -> "
+                        f"{report.bytes_after} bytes, {len(report.failed)} failed, took {report.duration:.1f}s.")
+            return report
+        finally:
+            self._lock.release()
+
+    def search(self, player: Optional[str] = None, pattern: Optional[LogPattern] = None, text: Optional[str] = None,
+               limit: int = 20) -> tuple[list[tuple[str, str]], int, int]:
+        """
+        Searches the archives, newest first, and returns up to 'limit' (date, line) matches
+        with the number of blocks read and the total number of blocks.
+        """
+        matches, blocks_read, blocks_total = [], 0, 0
+        for path, index in self.archives():
+            blocks_total += len(index.blocks)
+            if len(matches) >= limit:
+                continue
+            lines, read = search_archive(path, index, player, pattern, text)
+            blocks_read += read
+            # Newest first within the archive, too
+            matches.extend((index.date or index.source, line) for line in reversed(lines))
+        return matches[:limit], blocks_read, blocks_total
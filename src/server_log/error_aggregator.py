@@ -0,0 +1,202 @@
+import asyncio
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+from src.config_models import ErrorsConfig
+from src.metrics.registry import REGISTRY
+from .parser import LogPattern
+
+logger = logging.getLogger(__name__)
+
+SERVER_ERRORS = REGISTRY.counter("mc_server_errors_total", "ERROR/SEVERE entries in the server log, stack traces counted once.")
+
+# Parts of a message that differ between occurrences of the same error
+_NORMALIZERS = [
+    (re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"), "<uuid>"),
+    (re.compile(r"/?\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?"), "<ip>"),
+    (re.compile(r"\b0x[0-9a-fA-F]+\b|@[0-9a-fA-F]{4,}\b"), "<hex>"),
+    (re.compile(r"-?\d+(?:\.\d+)?"), "<n>"),
+]
+# '[thread/ERROR]' or '[time ERROR]', a log line with a header; anything else continues the previous entry
+_LOG_LINE = re.compile(r"^\[[^\]]+\]")
+_FRAME = re.compile(r"^at\s+(?P<frame>[\w$.<>/]+)")
+
+
+def normalize_message(message: str) -> str:
+    for pattern, replacement in _NORMALIZERS:
+        message = pattern.sub(replacement, message)
+    return message.strip()
+
+
+def fingerprint(message: str, frames: list[str]) -> str:
+    """Identifies an error type by its normalized message and its top stack frames."""
+    key = normalize_message(message) + "\n" + "\n".join(frames)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+
+@dataclass
+class ErrorEvent:
+    """One error: the header message plus the lines of its stack trace."""
+    message: str
+    trace: list[str] = field(default_factory=list)
+
+    def top_frames(self, count: int) -> list[str]:
+        frames = []
+        for line in self.trace:
+            match = _FRAME.match(line)
+            if match:
+                frames.append(match.group("frame"))
+                if len(frames) == count:
+                    break
+        return frames
+
+    @property
+    def exception(self) -> Optional[str]:
+        """The exception line of the trace, e.g. 'java.lang.NullPointerException: ...'."""
+        return next((line for line in self.trace if not _FRAME.match(line)), None)
+
+
+@dataclass
+class ErrorStats:
+    fingerprint: str
+    example: str
+    first_seen: float
+    last_seen: float
+    count: int = 0
+    window_count: int = 0  # Occurrences since the last digest
+    reported: bool = False  # Part of a digest already, so no longer 'new'
+
+
+class ErrorAggregator:
+    """
+    Groups ERROR log entries with their stack traces, counts them per fingerprint in a bounded
+    LRU and sends periodic digests instead of one alert per line.
+    """
+
+    def __init__(self, config: ErrorsConfig, notify: Callable[[str], Awaitable[None]]):
+        self.config = config
+        self._notify = notify
+        self._stats: OrderedDict[str, ErrorStats] = OrderedDict()
+        self._pending: Optional[ErrorEvent] = None
+        self._pending_updated = 0.0  # When the pending entry got its last line
+        self._window_start = time.monotonic()
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Starts sending digests on the running event loop."""
+        if self.config.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run_loop(), name="error-digest")
+            logger.info("Error aggregator started.")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run_loop(self):
+        next_digest = time.monotonic() + self.config.digest_interval
+        while True:
+            # Woken up often enough to count an error at the end of the log soon after its trace ended
+            await asyncio.sleep(min(self.config.trace_idle_timeout, max(next_digest - time.monotonic(), 0)))
+            self.flush_idle()
+            if time.monotonic() < next_digest:
+                continue
+            next_digest += self.config.digest_interval
+            try:
+                digest = self.digest()
+                if digest:
+                    await self._notify(digest)
+            except Exception as e:
+                logger.exception(f"Sending the error digest failed: {e}")
+
+    def feed_line(self, line: str):
+        """Consumes one raw log line. Called from the log watcher thread."""
+        if not self.config.enabled:
+            return
+        with self._lock:
+            if self._pending is not None and line and not _LOG_LINE.match(line):
+                # Continuation of the pending entry's stack trace
+                if len(self._pending.trace) < self.config.max_trace_lines:
+                    self._pending.trace.append(line)
+                self._pending_updated = time.monotonic()
+                return
+            self._finish_pending()
+            match = LogPattern.SERVER_ERROR.value.search(line)
+            if match:
+                self._pending = ErrorEvent(match.group("error_message"))
+                self._pending_updated = time.monotonic()
+
+    def flush(self):
+        """Counts the pending entry, e.g. once the log watcher stopped."""
+        with self._lock:
+            self._finish_pending()
+
+    def flush_idle(self, now: Optional[float] = None):
+        """
+        Counts the pending entry if no line continued its stack trace for 'trace_idle_timeout'
+        seconds. A trace written across two log batches is still counted as one error.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if now - self._pending_updated >= self.config.trace_idle_timeout:
+                self._finish_pending()
+
+    def _finish_pending(self):
+        event, self._pending = self._pending, None
+        if event is None:
+            return
+        key = fingerprint(event.message, event.top_frames(self.config.top_frames))
+        now = time.monotonic()
+        stats = self._stats.get(key)
+        if stats is None:
+            example = event.message if not event.exception else f"{event.message} ({event.exception})"
+            stats = self._stats[key] = ErrorStats(key, example[:300], first_seen=now, last_seen=now)
+            while len(self._stats) > self.config.max_fingerprints:
+                self._stats.popitem(last=False)
+        else:
+            self._stats.move_to_end(key)
+        stats.count += 1
+        stats.window_count += 1
+        stats.last_seen = now
+        SERVER_ERRORS.inc()
+
+    def snapshot(self) -> list[ErrorStats]:
+        """Returns the tracked error types, most frequent first."""
+        with self._lock:
+            return sorted(self._stats.values(), key=lambda s: s.count, reverse=True)
+
+    def digest(self, now: Optional[float] = None) -> Optional[str]:
+        """
+        Summarises the errors since the last digest and starts a new window.
+        Returns None if there were none.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            # A trace that is still being written is counted in the next window
+            if now - self._pending_updated >= self.config.trace_idle_timeout:
+                self._finish_pending()
+            active = [s for s in self._stats.values() if s.window_count]
+            window = now - self._window_start
+            self._window_start = now
+            if not active:
+                return None
+            new = [s for s in active if not s.reported]
+            total = sum(s.window_count for s in active)
+            top = sorted(active, key=lambda s: s.window_count, reverse=True)[:self.config.digest_top]
+            lines = [f"⚠️ {len(new)} new error type{'s' if len(new) != 1 else ''}, "
+                     f"{total:,} occurrence{'s' if total != 1 else ''} in {max(round(window / 60), 1)} min"]
+            for stats in top:
+                marker = "🆕 " if not stats.reported else ""
+                lines.append(f"• {marker}{stats.window_count:,}x {stats.example}")
+            for stats in active:
+                stats.window_count = 0
+                stats.reported = True
+        return "\n".join(lines)
@@ -1,26 +1,72 @@
 import os
+import threading
 import time
 import logging
+from contextlib import nullcontext
+from typing import Callable, Optional, Sequence
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
+from src.metrics.registry import REGISTRY
 from .parser import LogParser
 from .state_manager import StateManager
+from src.storage.store import BotStore, LogPosition
 
 logger = logging.getLogger(__name__)
 
+LINES_READ = REGISTRY.counter("mc_log_lines_read_total", "Non-empty lines read from the server log.")
+LINES_PARSED = REGISTRY.counter("mc_log_lines_parsed_total", "Log lines that matched a LogPattern.")
+LOG_LAG = REGISTRY.histogram("mc_log_state_lag_seconds", "Time from the log file write to the state update.",
+                             buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0))
+
+def _position_matches(stored: LogPosition, stat: os.stat_result) -> bool:
+    """True if a stored position lies within the current log file, not one that replaced it."""
+    return stored.inode == stat.st_ino and stored.offset <= stat.st_size
+
+def can_resume(log_file: str, store: BotStore) -> bool:
+    """
+    True if tailing resumes at the stored position, so state stored with it still applies.
+    False if the log was replaced since, e.g. by a server restart while the bot was down.
+    """
+    stored = store.log_position(os.path.abspath(log_file))
+    if stored is None:
+        return False
+    try:
+        return _position_matches(stored, os.stat(log_file))
+    except FileNotFoundError:
+        return False
+
 class LogFileHandler(FileSystemEventHandler):
     """Handles file system events for the log file."""
 
-    def __init__(self, file_path: str, state_manager: StateManager):
+    def __init__(self, file_path: str, state_manager: StateManager,
+                 line_listeners: Sequence[Callable[[str], None]] = (), store: Optional[BotStore] = None):
         self.file_path = os.path.abspath(file_path)
         self.parser = LogParser()
         self.state_manager = state_manager
-        # Start reading from the end of the file
+        # Called with every raw line, for consumers that need more than one line, like stack traces
+        self.line_listeners = list(line_listeners)
+        self.store = store
+        self._lock = threading.Lock()
+        self.inode, self.last_pos = self._initial_position()
+
+    def _initial_position(self) -> tuple[Optional[int], int]:
+        """
+        Resumes at the stored position if it belongs to the same file, otherwise starts at the end
+        of the file (or at its start, if the file was replaced since the position was stored).
+        """
         try:
-            self.last_pos = os.path.getsize(self.file_path)
+            stat = os.stat(self.file_path)
         except FileNotFoundError:
-            self.last_pos = 0
+            return None, 0
+        stored = self.store.log_position(self.file_path) if self.store else None
+        if stored is None:
+            return stat.st_ino, stat.st_size
+        if _position_matches(stored, stat):
+            logger.info(f"Resuming '{os.path.basename(self.file_path)}' at byte {stored.offset} of {stat.st_size}.")
+            return stat.st_ino, stored.offset
+        logger.info(f"Log file '{os.path.basename(self.file_path)}' was replaced while the bot was down. Reading it from the start.")
+        return stat.st_ino, 0
 
     def on_created(self, event):
         """
@@ -29,7 +75,8 @@ class LogFileHandler(FileSystemEventHandler):
         """
         if event.src_path == self.file_path:
             logger.info(f"Log file '{os.path.basename(self.file_path)}' was created. Resetting position.")
-            self.last_pos = 0
+            with self._lock:
+                self.last_pos = 0
             self._process_new_lines()
 
     def on_modified(self, event):
@@ -40,44 +87,83 @@ class LogFileHandler(FileSystemEventHandler):
             self._process_new_lines()
         # Note: We don't need on_moved, as watchdog reports it as on_deleted for the old path
 
+    def catch_up(self):
+        """Processes the lines written since the stored position, e.g. while the bot was down."""
+        self._process_new_lines()
+
     def _process_new_lines(self):
         """Reads and processes new lines from the log file."""
-        try:
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                f.seek(self.last_pos)
-                new_lines = f.readlines()
-                if not new_lines:
-                    return
-
-                logger.info(f"Detected {len(new_lines)} new lines in {os.path.basename(self.file_path)}.")
+        with self._lock:
+            try:
+                self._read_batch()
+            except Exception as e:
+                logger.exception(f"Error processing log file: {e}")
+
+    def _read_batch(self):
+        with open(self.file_path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            if stat.st_ino != self.inode or stat.st_size < self.last_pos:
+                # Replaced or truncated without a 'created' event
+                self.inode, self.last_pos = stat.st_ino, 0
+            f.seek(self.last_pos)
+            chunk = f.read()
+            # Only complete lines are consumed, a partly written last line is read again next time
+            end = chunk.rfind(b"\n") + 1
+            if not end:
+                return
+            new_lines = chunk[:end].decode("utf-8", errors="replace").splitlines()
+
+            # The modification time is the latest write, so the lag is measured for the newest line
+            written_at = stat.st_mtime
+            logger.info(f"Detected {len(new_lines)} new lines in {os.path.basename(self.file_path)}.")
+            with self.store.batch() if self.store else nullcontext():
+                lines_read, lines_parsed = 0, 0
                 for line in new_lines:
                     line = line.strip()
                     if not line:
                         continue
 
+                    lines_read += 1
+                    for listener in self.line_listeners:
+                        try:
+                            listener(line)
+                        except Exception as e:
+                            logger.exception(f"Log line listener failed: {e}")
                     result = self.parser.parse_line(line)
                     if result:
+                        lines_parsed += 1
                         pattern_found, data = result
                         # Pass the event to the state manager
                         self.state_manager.update_from_log(pattern_found, data)
 
-                self.last_pos = f.tell()
-        except Exception as e:
-            logger.exception(f"Error processing log file: {e}")
+                self.last_pos += end
+                if self.store:
+                    # The offset is stored in the same transaction as the effects of these lines
+                    self.store.commit_log_batch(LogPosition(self.file_path, self.inode, self.last_pos),
+                                                self.state_manager.snapshot())
+            LINES_READ.inc(lines_read)
+            LINES_PARSED.inc(lines_parsed)
+            if lines_parsed:
+                LOG_LAG.observe(max(time.time() - written_at, 0))
 
 
-def start_watching(log_file: str, state_manager: StateManager):
+def start_watching(log_file: str, state_manager: StateManager,
+                   line_listeners: Sequence[Callable[[str], None]] = (), store: Optional[BotStore] = None):
     """
     Creates and starts the watchdog observer to monitor the log file.
+    With a store, tailing resumes where it stopped and lines written in between are processed first.
     Returns the observer instance so it can be managed externally.
     """
     watch_dir = os.path.dirname(log_file)
-    event_handler = LogFileHandler(log_file, state_manager)
+    event_handler = LogFileHandler(log_file, state_manager, line_listeners, store)
     observer = Observer()
     observer.schedule(event_handler, watch_dir, recursive=False)
 
     logger.info(f"Starting watchdog for {log_file}")
     observer.start()
+    if store:
+        # Lines written while nobody watched do not cause a file event, read them now
+        threading.Thread(target=event_handler.catch_up, name="log-catch-up", daemon=True).start()
     return observer
 
 def stop_watching(observer: Observer):
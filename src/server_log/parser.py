@@ -1,7 +1,15 @@
+import itertools
 import re
+import time
 from enum import Enum
 from typing import Optional, Tuple
 
+from src.metrics.registry import REGISTRY
+
+# The whole prefix of a server message: vanilla '[time] [thread/LEVEL]: ' or Paper '[time LEVEL]: '.
+# Server events are anchored to it, chat messages can contain ']: ' but never start the line
+_LOG_PREFIX = r"^\[[^\]]+\](?: \[[^\]]+\])?: "
+
 
 class LogPattern(Enum):
     """Enumeration of regex patterns for parsing Minecraft log lines."""
@@ -9,15 +17,42 @@ class LogPattern(Enum):
     USER_LOGOUT = re.compile(r": (?P<username>\w+) left the game")
     PLAYER_DISCONNECTED = re.compile(r": (?P<username>\w+) lost connection: (?P<reason>.*)")
     SERVER_DONE = re.compile(r"Done \([\d.]+s\)! For help, type \"help\"") # Server finished loading
+    SERVER_STOPPING = re.compile(_LOG_PREFIX + r"Stopping server$") # First line of a shutdown
+    WORLD_SAVED = re.compile(_LOG_PREFIX + r"(?:\w+: )?All dimensions are saved$") # Last chunk save of a shutdown
+    SERVER_OVERLOADED = re.compile(_LOG_PREFIX + r"Can't keep up! Is the server overloaded\? Running (?P<ms>\d+)ms or (?P<ticks>\d+) ticks behind")
     USER_COMMAND = re.compile(r": (?P<username>\w+) issued server command: (?P<command>.*)")
     PLAYER_UUID = re.compile(r"UUID of player (?P<username>\w+) is (?P<uuid>[\w-]+)")
     PLAYER_CHAT = re.compile(r"<(?P<username>\w+)> (?P<message>.*)")
 
-    # Catches severe errors and exceptions from the server log
-    SERVER_ERROR = re.compile(r"^(?:\[[^\]]+\])? \[(?:[^\]]+)\] \[(?:ERROR|SEVERE)\]: (?!\[Trident\])(?P<error_message>.*)", re.MULTILINE)
+    # Progress of the Chunky pre-generation plugin. Percent and rate use the server's locale, so ',' may be the decimal mark
+    PREGEN_PROGRESS = re.compile(r"\[Chunky\] Task running for (?P<world>\S+)\. Processed: (?P<chunks>\d+) chunks \((?P<percent>[\d.,]+)%\), "
+                                 r"ETA: (?P<eta>[\d:]+), Rate: (?P<rate>[\d.,]+) cps")
+    PREGEN_DONE = re.compile(r"\[Chunky\] Task finished for (?P<world>\S+)\. Processed: (?P<chunks>\d+) chunks")
+    PREGEN_STOPPED = re.compile(r"\[Chunky\] Task (?P<state>stopped|paused|cancelled) for (?P<world>\S+)\.")
+
+    # Catches severe errors and exceptions from the server log, in the
+    # '[time] [thread] [ERROR]:', vanilla '[time] [thread/ERROR]:' and Paper '[time ERROR]:' formats
+    SERVER_ERROR = re.compile(r"^(?:\[[^\]]+\])?(?: \[(?:[^\]]+)\] \[(?:ERROR|SEVERE)\]| \[[^\]/]+/(?:ERROR|SEVERE)\]|\[[^\]]* (?:ERROR|SEVERE)\]): (?!\[Trident\])(?P<error_message>.*)", re.MULTILINE)
 
     # Parses the output of the /list command. The space after the colon is optional.
     LIST_PLAYERS = re.compile(r"There are (?P<online>\d+) of a max of (?P<max>\d+) players online: ?(?P<players>.*)")
+    # Parses the output of Paper's /tps command, the 1 minute average may be prefixed by a color code and '*' if capped
+    TPS_REPORT = re.compile(r"TPS from last 1m, 5m, 15m: (?:§.)?\*?(?P<tps>[\d.]+)")
+
+
+# Only 1 in this many lines is timed per pattern, the others are matched without any bookkeeping
+TIMING_SAMPLE_RATE = 64
+
+PATTERN_SECONDS = REGISTRY.counter("mc_log_pattern_seconds_total",
+                                   f"Estimated time spent matching lines against each LogPattern "
+                                   f"(1 in {TIMING_SAMPLE_RATE} lines timed).", ("pattern",))
+PATTERN_MATCHES = REGISTRY.counter("mc_log_pattern_matches_total", "Log lines matched by each LogPattern.", ("pattern",))
+
+# Pre-bound per pattern, so the hot loop skips the label lookup
+_PATTERN_TIMERS = {p: PATTERN_SECONDS.labels(pattern=p.name) for p in LogPattern}
+_PATTERN_MATCHES = {p: PATTERN_MATCHES.labels(pattern=p.name) for p in LogPattern}
+_PATTERNS = list(LogPattern)
+_line_counter = itertools.count()
 
 
 class LogParser:
@@ -35,9 +70,24 @@ class LogParser:
             A tuple containing the matched LogPattern and a dictionary
             of the extracted data (from named groups), or None if no pattern matched.
         """
-        for pattern_enum in LogPattern:
+        if next(_line_counter) % TIMING_SAMPLE_RATE == 0:
+            return LogParser._parse_line_timed(line)
+        for pattern_enum in _PATTERNS:
+            match = pattern_enum.value.search(line)
+            if match:
+                _PATTERN_MATCHES[pattern_enum].inc()
+                return pattern_enum, match.groupdict()
+        return None
+
+    @staticmethod
+    def _parse_line_timed(line: str) -> Optional[Tuple[LogPattern, dict]]:
+        """parse_line for a sampled line, each pattern's time counts for TIMING_SAMPLE_RATE lines."""
+        for pattern_enum in _PATTERNS:
+            start = time.perf_counter()
             match = pattern_enum.value.search(line)
+            _PATTERN_TIMERS[pattern_enum].inc((time.perf_counter() - start) * TIMING_SAMPLE_RATE)
             if match:
+                _PATTERN_MATCHES[pattern_enum].inc()
                 return pattern_enum, match.groupdict()
         return None
 
@@ -49,6 +99,8 @@ if __name__ == "__main__":
         "[12:59:33] [Server thread/INFO]: RebellTank joined the game",
         "[13:05:34] [Server thread/INFO]: RebellTank left the game",
         "[12:56:44] [Server thread/INFO]: Done (22.664s)! For help, type \"help\"",
+        "[13:30:01] [Server thread/INFO]: Stopping server",
+        "[13:30:05] [Server thread/INFO]: ThreadedAnvilChunkStorage: All dimensions are saved",
         "[14:53:51 INFO]: RebellTank issued server command: /gamemode creative",
         "[13:05:34] [Server thread/INFO]: SomeUser lost connection: Disconnected",
         "[12:59:31] [User Authenticator #0/INFO]: UUID of player RebellTank is de3b7906-f31a-48f7-9bf4-84d477003cb2",
@@ -56,6 +108,8 @@ if __name__ == "__main__":
         "[main/ERROR]: Failed to load properties from file: server.properties",
         "[12:59:47] [Server thread/INFO]: There are 2 of a max of 20 players online: RebellTank, Steve",
         "[12:57:26] [Server thread/INFO]: There are 0 of a max of 20 players online:",
+        "[15:02:10 INFO]: [Chunky] Task running for minecraft:overworld. Processed: 16384 chunks (25.00%), ETA: 0:05:12, Rate: 120.5 cps, Current: -12, 34",
+        "[15:07:22 INFO]: [Chunky] Task finished for minecraft:overworld. Processed: 65536 chunks (100.00%), Total time: 0:09:05",
         "[12:56:22] [ServerMain/INFO]: [bootstrap] Loading Paper 1.21.10-108-main@97452e1 (2025-11-10T18:27:52Z) for Minecraft 1.21.10"  # Should not match
     ]
 
@@ -22,6 +22,7 @@ class StateManager:
         self._state = ServerState()
         self._lock = threading.Lock()
         self._ready_callback: Optional[Callable[[], Awaitable[None]]] = None
+        self._listeners: List[Callable[[LogPattern, dict], None]] = []
         self.loop: Optional[asyncio.AbstractEventLoop] = None
 
     def set_event_loop(self, loop: asyncio.AbstractEventLoop):
@@ -32,6 +33,18 @@ class StateManager:
         """Registers an async callback to be called when the server is ready."""
         self._ready_callback = callback
 
+    def add_listener(self, listener: Callable[[LogPattern, dict], None]):
+        """
+        Registers a function that is called with every parsed log event.
+        Listeners are called from the log watcher thread and must not block.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[LogPattern, dict], None]):
+        """Removes a previously registered listener."""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
     def get_current_state(self) -> ServerState:
         """Returns a copy of the current server state in a thread-safe manner."""
         with self._lock:
@@ -41,8 +54,55 @@ class StateManager:
                 online_players=list(self._state.online_players)
             )
 
+    def snapshot(self) -> dict:
+        """Returns the state as a JSON serializable dict, e.g. to persist it."""
+        state = self.get_current_state()
+        return {
+            "is_ready": state.is_ready,
+            "started_at": state.started_at.isoformat() if state.started_at else None,
+            "online_players": state.online_players,
+        }
+
+    def restore(self, data: dict):
+        """Restores a state saved with snapshot(), e.g. after the bot restarted next to a running server."""
+        with self._lock:
+            self._state = ServerState(
+                is_ready=data.get("is_ready", False),
+                started_at=datetime.fromisoformat(data["started_at"]) if data.get("started_at") else None,
+                online_players=list(data.get("online_players", [])),
+            )
+        logger.info(f"Server state restored: {self._state}")
+
+    def reset(self):
+        """Resets the state, e.g. after the server was stopped or restarted."""
+        with self._lock:
+            self._state = ServerState()
+        logger.info("Server state has been reset.")
+
+    def set_online_players(self, players: List[str]) -> tuple[List[str], List[str]]:
+        """
+        Replaces the player list with an authoritative one, e.g. from an RCON 'list'.
+        Returns the (joined, left) players compared to the previous list.
+        """
+        with self._lock:
+            previous = self._state.online_players
+            joined = [p for p in players if p not in previous]
+            left = [p for p in previous if p not in players]
+            self._state.online_players = list(players)
+        if joined or left:
+            logger.info(f"Player list replaced: {players}")
+        return joined, left
+
     def update_from_log(self, event_type: LogPattern, data: dict):
         """Updates the server state based on a parsed log event."""
+        self._apply(event_type, data)
+        for listener in list(self._listeners):
+            try:
+                listener(event_type, data)
+            except Exception as e:
+                logger.exception(f"Log event listener failed: {e}")
+
+    def _apply(self, event_type: LogPattern, data: dict):
         with self._lock:
             if event_type == LogPattern.SERVER_DONE and not self._state.is_ready:
                 self._state.is_ready = True
@@ -51,6 +111,10 @@ class StateManager:
                 if self._ready_callback and self.loop:
                     asyncio.run_coroutine_threadsafe(self._ready_callback(), self.loop)
 
+            elif event_type == LogPattern.SERVER_STOPPING:
+                self._state.is_ready = False
+                logger.info(f"Server state updated: IS_READY = False (server is stopping)")
+
             elif event_type == LogPattern.USER_LOGIN:
                 player_name = data.get("username")
                 if player_name and player_name not in self._state.online_players:
@@ -0,0 +1,200 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from src.server_log.parser import LogPattern
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    player TEXT NOT NULL,
+    joined_at REAL NOT NULL,
+    left_at REAL
+);
+CREATE INDEX IF NOT EXISTS sessions_open ON sessions (player) WHERE left_at IS NULL;
+CREATE TABLE IF NOT EXISTS player_snapshots (
+    ts REAL NOT NULL,
+    players TEXT NOT NULL
+);
+"""
+
+_SESSION_END_EVENTS = (LogPattern.USER_LOGOUT, LogPattern.PLAYER_DISCONNECTED)
+
+
+@dataclass(frozen=True)
+class LogPosition:
+    """Where tailing a log file stopped: the file's inode and the byte offset after the last full line."""
+    path: str
+    inode: int
+    offset: int
+
+
+@dataclass
+class Session:
+    player: str
+    joined_at: float
+    left_at: Optional[float]
+
+
+class BotStore:
+    """
+    An embedded SQLite store (WAL mode) for state that has to survive a bot restart:
+    the log position, player sessions and snapshots and small key/value state.
+
+    Writes are queued and committed together, either with a batch of log lines (so the
+    log offset and the effects of those lines are stored atomically) or by flush().
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # With WAL, NORMAL only risks the last transactions on power loss, never corruption
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.RLock()
+        self._pending: list[tuple[str, tuple]] = []
+        self._kv_cache: dict[str, Any] = {
+            key: json.loads(value) for key, value in self._conn.execute("SELECT key, value FROM kv")}
+        # State derived from the log, stored with every log batch: key -> provider returning None if unchanged
+        self._batch_state: dict[str, Callable[[], Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, flush_interval: float):
+        """Periodically commits writes that are not part of a log batch."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_loop(flush_interval), name="store-flush")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await asyncio.to_thread(self.flush)
+
+    async def _flush_loop(self, flush_interval: float):
+        while True:
+            await asyncio.sleep(flush_interval)
+            await asyncio.to_thread(self.flush)
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+    # --- Batching ---
+
+    @contextmanager
+    def batch(self):
+        """Holds back other flushes while a batch of log lines is processed, so it is committed as a whole."""
+        with self._lock:
+            yield self
+
+    def _queue(self, sql: str, params: tuple):
+        with self._lock:
+            self._pending.append((sql, params))
+
+    def flush(self) -> int:
+        """Commits all queued writes in one transaction and returns how many there were."""
+        with self._lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, []
+            try:
+                self._conn.execute("BEGIN")
+                for sql, params in pending:
+                    self._conn.execute(sql, params)
+                self._conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                self._conn.execute("ROLLBACK")
+                logger.error(f"Could not write {len(pending)} changes to the store: {e}")
+                return 0
+            return len(pending)
+
+    # --- Key/value state ---
+
+    def get(self, key: str, default: Any = None) -> Any:
+        # The cache is only replaced key by key, so reads need no lock
+        return self._kv_cache.get(key, default)
+
+    def set(self, key: str, value: Any):
+        """Stores a JSON serializable value, written with the next flush."""
+        with self._lock:
+            self._kv_cache[key] = value
+            self._queue("INSERT INTO kv (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                        (key, json.dumps(value)))
+
+    # --- Log position ---
+
+    def track(self, key: str, provider: Callable[[], Any]):
+        """
+        Stores the value of 'provider' under 'key' with every log batch, so state derived
+        from the log always matches the stored log position. A None value is not written.
+        """
+        self._batch_state[key] = provider
+
+    def log_position(self, path: str) -> Optional[LogPosition]:
+        data = self.get(f"log_position:{path}")
+        return LogPosition(path, data["inode"], data["offset"]) if data else None
+
+    def commit_log_batch(self, position: LogPosition, server_state: Optional[dict] = None):
+        """Stores the new log position together with everything the batch changed, atomically."""
+        with self._lock:
+            if server_state is not None:
+                if server_state.get("online_players") != (self.get("server_state") or {}).get("online_players"):
+                    self._queue("INSERT INTO player_snapshots (ts, players) VALUES (?, ?)",
+                                (time.time(), json.dumps(server_state.get("online_players", []))))
+                self.set("server_state", server_state)
+            for key, provider in self._batch_state.items():
+                value = provider()
+                if value is not None:
+                    self.set(key, value)
+            self.set(f"log_position:{position.path}", {"inode": position.inode, "offset": position.offset})
+            self.flush()
+
+    # --- Sessions ---
+
+    def on_log_event(self, event_type: LogPattern, data: dict):
+        """StateManager listener that records player sessions, committed with the log batch."""
+        now = time.time()
+        if event_type == LogPattern.USER_LOGIN and data.get("username"):
+            self.close_sessions(now, data["username"])
+            self._queue("INSERT INTO sessions (player, joined_at) VALUES (?, ?)", (data["username"], now))
+        elif event_type in _SESSION_END_EVENTS and data.get("username"):
+            self.close_sessions(now, data["username"])
+        elif event_type == LogPattern.SERVER_STOPPING:
+            self.close_sessions(now)
+
+    def close_sessions(self, ts: float, player: Optional[str] = None):
+        """Ends the open sessions of a player, or of everyone, e.g. after the server went down."""
+        if player is None:
+            self._queue("UPDATE sessions SET left_at = ? WHERE left_at IS NULL", (ts,))
+        else:
+            self._queue("UPDATE sessions SET left_at = ? WHERE left_at IS NULL AND player = ?", (ts, player))
+
+    def sessions(self, since: float = 0) -> list[Session]:
+        """Returns the committed sessions that were active after 'since', oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT player, joined_at, left_at FROM sessions WHERE left_at IS NULL OR left_at >= ? "
+                "ORDER BY joined_at", (since,)).fetchall()
+        return [Session(*row) for row in rows]
+
+    def player_snapshots(self, since: float = 0) -> list[tuple[float, list[str]]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT ts, players FROM player_snapshots WHERE ts >= ? ORDER BY ts",
+                                      (since,)).fetchall()
+        return [(ts, json.loads(players)) for ts, players in rows]
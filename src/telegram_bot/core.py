@@ -1,16 +1,42 @@
 import asyncio
 import logging
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 
-from telegram.ext import Application, CommandHandler
+from telegram.ext import Application, CommandHandler, MessageHandler, filters
 
 from src.mc_service.command_service import CommandService
 from ..config_models import AppConfig
 from src.mc_service.services import MinecraftServerController
 from ..server_log.state_manager import StateManager
+from ..config_models import ScheduledJobConfig
+from src.mc_service.stop_pipeline import StopPipeline, StopResult
+from src.mc_service.player_lists import PlayerListSync
+from src.mc_service.server_files import ServerFiles
+from src.mc_service.supervisor import ServerSupervisor
+from src.mc_service.reconciler import PlayerListReconciler
+from src.mc_service.pregen import PregenOrchestrator
+from ..metrics.registry import REGISTRY
+from ..metrics.tracing import TRACER
+from ..server_log.error_aggregator import ErrorAggregator
+from ..server_log.parser import LogPattern
+from ..server_log.log_watcher import can_resume
+from .subscriptions import Notifier, SubscriptionStore, Topic
+from ..storage.store import BotStore
+from ..analytics.activity import ActivityStats
 from . import handlers
+from .traced_request import TracedHTTPXRequest
+
+if TYPE_CHECKING:
+    # Off by default, imported where they are created so they stay off the startup path
+    from ..scheduler.scheduler import Scheduler
 
 logger = logging.getLogger(__name__)
 
+# Background services in bot_data that are None when disabled, in the order they are started
+_OPTIONAL_SERVICES = ("scheduler", "idle_monitor")
+
 class TelegramBot:
     def __init__(self, token: str, msc: MinecraftServerController, state_manager: StateManager, config: AppConfig):
         self.msc = msc
@@ -19,12 +45,20 @@ class TelegramBot:
         self.application = (
             Application.builder()
             .token(token)
+            .request(TracedHTTPXRequest())
             .post_init(self._post_init)
             .build()
         )
         
+        self._last_lag_alert = float("-inf")
         self._setup_bot_data()
         self._add_handlers()
+        self._register_metrics()
+        self.metrics_server = None
+        if config.metrics.enabled:
+            # Only imported when enabled, to keep it off the startup path
+            from ..metrics.http_server import MetricsServer
+            self.metrics_server = MetricsServer(config.metrics.host, config.metrics.port)
         # _register_callbacks() is now called from _post_init
 
     def _setup_bot_data(self):
@@ -32,11 +66,67 @@ class TelegramBot:
         self.application.bot_data["msc"] = self.msc
         self.application.bot_data["state_manager"] = self.state_manager
         self.application.bot_data["config"] = self.config
+        self.application.bot_data["store"] = BotStore(Path(self.config.store.path))
         self.application.bot_data["command_service"] = CommandService(self.msc)
+        # Created on first use by handlers.get_backup_engine()
+        self.application.bot_data["backup_engine"] = None
+        self.application.bot_data["server_files"] = ServerFiles(Path(self.config.mc.dir))
+        self.application.bot_data["player_list_sync"] = PlayerListSync(
+            self.application.bot_data["command_service"], self.application.bot_data["server_files"])
+        self.application.bot_data["stop_pipeline"] = StopPipeline(self.config.stop, self.msc, self.state_manager)
+        # Held by backups and restarts, so these never overlap
+        self.application.bot_data["maintenance_lock"] = asyncio.Lock()
+        # Long commands running after their handler returned, see handlers.run_in_background()
+        self.application.bot_data["background_tasks"] = set()
+        # Created on first use by handlers.get_log_archiver()
+        self.application.bot_data["log_archiver"] = None
+        self._setup_optional_services()
+        self.application.bot_data["supervisor"] = ServerSupervisor(
+            self.config.supervisor, self.msc, self.state_manager,
+            start_server=lambda: handlers.start_server(self.application.bot_data),
+            notify=self.notify,
+        )
+        self.application.bot_data["reconciler"] = PlayerListReconciler(self.config.reconciler, self.msc, self.state_manager)
+        self.application.bot_data["pregen"] = PregenOrchestrator(
+            self.config.pregen, self.msc, self.state_manager, notify=lambda text: self.notify(text, Topic.SERVER))
+        self.application.bot_data["subscriptions"] = SubscriptionStore(
+            Path(self.config.notifications.state_file), [Topic(t) for t in self.config.notifications.default_topics])
+        self.application.bot_data["notifier"] = Notifier(
+            self.application.bot, self.application.bot_data["subscriptions"], self.config.bot.allowed_chat_ids,
+            self.config.notifications.max_concurrent_sends)
+        self.application.bot_data["error_aggregator"] = ErrorAggregator(
+            self.config.errors, notify=lambda text: self.notify(text, Topic.ERRORS))
+        self.application.bot_data["activity"] = self._create_activity_stats()
         self.application.bot_data["watchdog_observer"] = None  # To hold the log watcher instance
-        self.application.bot_data["last_chat_id"] = None  # To notify the user who started the server
+        # Also told when the server is ready, even if not subscribed
+        self.application.bot_data["last_chat_id"] = self.application.bot_data["store"].get("last_chat_id")
         self.application.bot_data["shutdown_event"] = asyncio.Event() # For graceful shutdown
 
+    def _setup_optional_services(self):
+        """Creates the scheduler and the idle monitor if they are used, otherwise they are None and never imported."""
+        bot_data = self.application.bot_data
+        enabled_jobs = any(job.enabled for job in self.config.schedule.jobs)
+        bot_data["scheduler"] = self._create_scheduler() if enabled_jobs else None
+        bot_data["idle_monitor"] = None
+        if self.config.idle.enabled:
+            from ..idle.idle_monitor import IdleMonitor
+            bot_data["idle_monitor"] = IdleMonitor(
+                self.config.idle, self.msc, self.state_manager, bot_data["maintenance_lock"],
+                stop_server=self._stop_server,
+                start_server=lambda: handlers.start_server(bot_data),
+                notify=self.notify,
+            )
+
+    def _create_activity_stats(self) -> ActivityStats:
+        """Creates the player statistics, continuing from the ones stored with the log position."""
+        store: BotStore = self.application.bot_data["store"]
+        activity = ActivityStats(self.config.analytics)
+        saved = store.get("activity")
+        if saved:
+            activity.load(saved)
+        store.track("activity", activity.export_if_changed)
+        return activity
+
     def _add_handlers(self):
         """Creates and registers all command handlers for the bot."""
         handler_definitions = {
@@ -47,52 +137,215 @@ class TelegramBot:
             "cmd": handlers.server_cmd_command,
             "kick": handlers.server_kick_command,
             "op": handlers.server_op_command,
+            "backup": handlers.server_backup_command,
+            "schedule": handlers.schedule_command,
+            "sync": handlers.sync_command,
+            "whitelist": handlers.whitelist_command,
+            "ops": handlers.ops_command,
+            "props": handlers.props_command,
+            "subscribe": handlers.subscribe_command,
+            "unsubscribe": handlers.unsubscribe_command,
+            "perf": handlers.perf_command,
+            "stats": handlers.stats_command,
+            "pregen": handlers.pregen_command,
+            "logs": handlers.logs_command,
             "exit": handlers.server_exit_command,
         }
         
         for command, handler_func in handler_definitions.items():
-            self.application.add_handler(CommandHandler(command, handler_func))
+            traced_handler = TRACER.traced(command)(handler_func)
+            self.application.add_handler(CommandHandler(command, handlers.track_latency(command)(traced_handler)))
+
+        # Player list files are uploaded as documents with '/sync <list>' as the caption
+        self.application.add_handler(MessageHandler(
+            filters.Document.ALL & filters.CaptionRegex(r"^/sync(@\w+)?\b"),
+            handlers.track_latency("sync")(TRACER.traced("sync")(handlers.sync_command))))
         
         logger.info("All command handlers have been registered.")
 
+    def _register_metrics(self):
+        """Exposes the server state as gauges, read whenever the metrics are scraped."""
+        REGISTRY.gauge("mc_players_online", "Players online according to the StateManager.").set_function(
+            lambda: len(self.state_manager.get_current_state().online_players))
+        REGISTRY.gauge("mc_server_ready", "1 if the server finished loading, else 0.").set_function(
+            lambda: int(self.state_manager.get_current_state().is_ready))
+
+    def _create_scheduler(self) -> "Scheduler":
+        """Creates the task scheduler and registers the actions its jobs can run."""
+        from ..scheduler.scheduler import Scheduler
+        scheduler = Scheduler(self.config.schedule, self.application.bot_data["maintenance_lock"])
+        scheduler.register_action("save", self._job_save)
+        scheduler.register_action("broadcast", self._job_broadcast)
+        scheduler.register_action("command", self._job_command)
+        scheduler.register_action("restart", self._job_restart)
+        scheduler.register_action("backup", self._job_backup)
+        scheduler.register_action("compress_logs", self._job_compress_logs)
+        return scheduler
+
+    async def _job_save(self, job: ScheduledJobConfig):
+        command_service: CommandService = self.application.bot_data["command_service"]
+        return await command_service.save_all()
+
+    async def _job_broadcast(self, job: ScheduledJobConfig):
+        command_service: CommandService = self.application.bot_data["command_service"]
+        return await command_service.say(job.args)
+
+    async def _job_command(self, job: ScheduledJobConfig):
+        return await asyncio.to_thread(self.msc.run_server_command, job.args)
+
+    async def _job_backup(self, job: ScheduledJobConfig):
+        backup_engine = handlers.get_backup_engine(self.application.bot_data)
+        return await asyncio.to_thread(backup_engine.run)
+
+    async def _job_compress_logs(self, job: ScheduledJobConfig):
+        log_archiver = handlers.get_log_archiver(self.application.bot_data)
+        report = await asyncio.to_thread(log_archiver.run)
+        return not report.failed
+
+    async def _job_restart(self, job: ScheduledJobConfig):
+        """Warns the players with a countdown, then stops and starts the server again."""
+        if not await asyncio.to_thread(lambda: self.msc.is_running):
+            logger.info("Scheduled restart: server is not running, starting it.")
+            await handlers.start_server(self.application.bot_data)
+            return True
+
+        command_service: CommandService = self.application.bot_data["command_service"]
+        countdown = sorted(job.countdown, reverse=True)
+        for i, seconds in enumerate(countdown):
+            await command_service.say(f"Server restarts in {seconds} seconds!")
+            next_warning = countdown[i + 1] if i + 1 < len(countdown) else 0
+            await asyncio.sleep(seconds - next_warning)
+
+        if not await self._stop_server():
+            logger.error("Scheduled restart: the server did not stop, not starting it again.")
+            return False
+
+        await handlers.start_server(self.application.bot_data)
+        return True
+
+    async def _stop_server(self) -> bool:
+        """Stops the server through the stop pipeline and returns whether it is down."""
+        result = await handlers.stop_server(self.application.bot_data)
+        return result.success
+
+    async def stop_server(self) -> StopResult:
+        """Stops the server through the stop pipeline, e.g. when the bot shuts down."""
+        return await handlers.stop_server(self.application.bot_data)
+
     def _register_callbacks(self, loop: asyncio.AbstractEventLoop):
         """Registers callbacks for server events, like the 'ready' signal."""
         self.state_manager.register_ready_callback(self.on_server_ready)
+        # Keeps the UUID <-> name index current with the 'UUID of player' log lines
+        self.state_manager.add_listener(self.application.bot_data["server_files"].on_log_event)
+        self.state_manager.add_listener(self._on_log_event)
+        self.state_manager.add_listener(self.application.bot_data["activity"].on_log_event)
+        # Player sessions are committed together with the log position
+        self.state_manager.add_listener(self.application.bot_data["store"].on_log_event)
         # Pass the event loop to the state manager for safe async callbacks
         self.state_manager.set_event_loop(loop)
         logger.info("Server-ready callback and event loop have been registered with the StateManager.")
 
+    async def notify(self, text: str, topic: Topic = Topic.SERVER, extra_chat_ids: tuple[int, ...] = ()):
+        """Sends a notification to every chat subscribed to the topic."""
+        notifier: Notifier = self.application.bot_data["notifier"]
+        await notifier.publish(topic, text, extra_chat_ids=extra_chat_ids)
+
+    def _on_log_event(self, event_type: LogPattern, data: dict):
+        """
+        StateManager listener that turns log events into notifications.
+        Runs in the log watcher thread, so the sending is handed to the event loop.
+        """
+        if event_type == LogPattern.USER_LOGIN:
+            notification = (Topic.PLAYERS, f"➕ {data['username']} joined the game")
+        elif event_type in (LogPattern.USER_LOGOUT, LogPattern.PLAYER_DISCONNECTED):
+            notification = (Topic.PLAYERS, f"➖ {data['username']} left the game")
+        elif event_type == LogPattern.PLAYER_CHAT:
+            notification = (Topic.CHAT, f"💬 <{data['username']}> {data['message']}")
+        elif event_type == LogPattern.SERVER_STOPPING:
+            notification = (Topic.SERVER, "🛑 Server is stopping...")
+        elif event_type == LogPattern.SERVER_OVERLOADED:
+            now = time.monotonic()
+            if now - self._last_lag_alert < self.config.notifications.lag_alert_cooldown:
+                return
+            self._last_lag_alert = now
+            notification = (Topic.PERFORMANCE, f"🐢 Server can't keep up, running {data['ms']}ms "
+                                               f"({data['ticks']} ticks) behind.")
+        else:
+            return
+        if self.state_manager.loop:
+            asyncio.run_coroutine_threadsafe(self.notify(*notification), self.state_manager.loop)
+
     async def on_server_ready(self):
         """Async callback triggered by StateManager when the server is ready."""
-        chat_id_to_notify = self.application.bot_data.get("last_chat_id")
-        if chat_id_to_notify:
-            logger.info(f"Server is ready. Notifying chat_id: {chat_id_to_notify}")
-            try:
-                await self.application.bot.send_message(
-                    chat_id=chat_id_to_notify,
-                    text="🚀 Server is now ready and accepting players!"
-                )
-            except Exception as e:
-                logger.error(f"Failed to send 'server ready' notification: {e}")
-
-    async def initial_state_sync(self):
+        logger.info("Server is ready. Sending notification.")
+        last_chat_id = self.application.bot_data.get("last_chat_id")
+        await self.notify("🚀 Server is now ready and accepting players!",
+                          extra_chat_ids=(last_chat_id,) if last_chat_id else ())
+
+    async def initial_state_sync(self, server_running: Optional[bool] = None):
         """
         Checks server status on bot start and syncs state if necessary.
         This is useful if the bot is restarted while the server is already running.
+        'server_running' is the result of an RCON probe made during startup, if there was one.
         """
-        if self.msc.is_running:
+        store: BotStore = self.application.bot_data["store"]
+        if server_running is None:
+            server_running = await asyncio.to_thread(lambda: self.msc.is_running)
+        if server_running:
             logger.info("Server is already running on bot startup. Starting log watcher and syncing state.")
-            # Start watching logs for live updates
-            observer = handlers.start_watching(str(self.config.mc.full_log_path), self.state_manager)
-            self.application.bot_data["watchdog_observer"] = observer
+            # Continue from the state at the stored log position, the watcher applies the lines after it
+            saved_state = store.get("server_state")
+            if saved_state and can_resume(str(self.config.mc.full_log_path), store):
+                self.state_manager.restore(saved_state)
+            elif saved_state:
+                # The log was replaced, so the saved state is from an earlier server run. The watcher
+                # reads the new log from its start and rebuilds the state
+                logger.info("The log was replaced while the bot was down, not restoring the saved server state.")
+                self.state_manager.reset()
+                store.close_sessions(time.time())
+            self.application.bot_data["watchdog_observer"] = handlers.start_log_watcher(self.application.bot_data)
 
-            # Request player list to get an initial state
-            # Use a small delay to ensure RCON is ready
-            await asyncio.sleep(2)
-            await asyncio.to_thread(self.msc.run_server_command, "list")
+            # Double-check the player list over RCON, which just answered the probe
+            reconciler: PlayerListReconciler = self.application.bot_data["reconciler"]
+            await reconciler.check(force=True)
+        else:
+            # The server went down while the bot was not watching
+            store.close_sessions(time.time())
+            store.set("server_state", self.state_manager.snapshot())
+            await asyncio.to_thread(store.flush)
 
     async def _post_init(self, app: Application) -> None:
         """Post-initialization hook to set up async components."""
         loop = asyncio.get_running_loop()
         self._register_callbacks(loop)
+        for name in _OPTIONAL_SERVICES:
+            if self.application.bot_data[name]:
+                self.application.bot_data[name].start()
+        self.application.bot_data["supervisor"].start()
+        self.application.bot_data["reconciler"].start()
+        self.application.bot_data["pregen"].start()
+        self.application.bot_data["error_aggregator"].start()
+        self.application.bot_data["store"].start(self.config.store.flush_interval)
+        if self.metrics_server:
+            try:
+                await self.metrics_server.start()
+            except OSError as e:
+                logger.error(f"Could not start the metrics endpoint: {e}")
         logger.info("Async components initialized via post_init.")
+
+    async def shutdown(self) -> None:
+        """Stops the background services started in post_init."""
+        background_tasks = list(self.application.bot_data["background_tasks"])
+        for task in background_tasks:
+            task.cancel()
+        await asyncio.gather(*background_tasks, return_exceptions=True)
+        for name in _OPTIONAL_SERVICES:
+            if self.application.bot_data[name]:
+                await self.application.bot_data[name].stop()
+        await self.application.bot_data["supervisor"].stop()
+        await self.application.bot_data["reconciler"].stop()
+        await self.application.bot_data["pregen"].stop()
+        await self.application.bot_data["error_aggregator"].stop()
+        await self.application.bot_data["store"].stop()
+        if self.metrics_server:
+            await self.metrics_server.stop()
@@ -1,7 +1,12 @@
 import asyncio
+import contextvars
+import io
+import json
 import logging
+import time
+from datetime import date
 from functools import wraps
-from typing import Callable
+from typing import TYPE_CHECKING, Callable, Optional
 
 from telegram import Update
 from telegram.ext import ContextTypes
@@ -10,13 +15,59 @@ from telegram.helpers import escape_markdown
 from src.mc_service.command_service import CommandService
 from ..config_models import AppConfig
 from src.mc_service.services import MinecraftServerController
+from src.mc_service.stop_pipeline import StopPipeline, StopResult, ProgressCallback
 from ..server_log.state_manager import StateManager
 from ..server_log.log_watcher import start_watching, stop_watching
+from ..server_log.error_aggregator import ErrorAggregator
+from ..metrics.registry import REGISTRY
+from src.mc_service.server_files import ServerFiles
+from src.mc_service.player_lists import PlayerList, PlayerListSync, SyncResult, parse_player_names
+from .subscriptions import SubscriptionStore, Topic
+from ..metrics.tracing import TRACE_STORE, TraceStore, span
+from ..storage.store import BotStore
+from ..analytics.activity import ActivityStats
+from src.mc_service.pregen import PregenOrchestrator, PregenState
+
+if TYPE_CHECKING:
+    # Only used on demand or off by default, imported where they are used so they stay off the startup path
+    from ..server_log.archive import ArchiveReport, LogArchiver
+    from ..backup.engine import BackupEngine
+    from ..scheduler.scheduler import Scheduler
+    from ..idle.idle_monitor import IdleMonitor
 
 logger = logging.getLogger(__name__)
 
+# Largest player list file accepted by /sync
+MAX_SYNC_FILE_SIZE = 1024 * 1024
+
+# Shown by /props without arguments
+DEFAULT_PROPERTIES = ("motd", "max-players", "view-distance", "simulation-distance", "difficulty", "gamemode",
+                      "level-name", "white-list", "enforce-whitelist", "online-mode", "pvp", "server-port")
+
+HANDLER_LATENCY = REGISTRY.histogram("mc_telegram_handler_seconds", "Latency of Telegram command handlers.", ("command",))
+HANDLER_ERRORS = REGISTRY.counter("mc_telegram_handler_errors_total", "Telegram command handlers that raised.", ("command",))
+
 # --- Decorators for Command Handlers ---
 
+def track_latency(command: str) -> Callable:
+    """Decorator to record the latency and errors of a command handler in the metrics registry."""
+    def decorator(func: Callable) -> Callable:
+        latency = HANDLER_LATENCY.labels(command=command)
+        errors = HANDLER_ERRORS.labels(command=command)
+
+        @wraps(func)
+        async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(update, context, *args, **kwargs)
+            except Exception:
+                errors.inc()
+                raise
+            finally:
+                latency.observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
 def user_is_whitelisted(func: Callable) -> Callable:
     """Decorator to check if the user is allowed to execute a command."""
     @wraps(func)
@@ -24,7 +75,9 @@ def user_is_whitelisted(func: Callable) -> Callable:
         config: AppConfig = context.bot_data["config"]
         user_id = update.effective_chat.id
 
-        if user_id not in config.bot.allowed_chat_ids:
+        with span("auth"):
+            allowed = user_id in config.bot.allowed_chat_ids
+        if not allowed:
             logger.warning(f"Unauthorized access attempt by user: {user_id}")
             await context.bot.send_message(chat_id=user_id, text="You are not authorized to use this bot.")
             return
@@ -36,7 +89,9 @@ def require_server_running(func: Callable) -> Callable:
     @wraps(func)
     async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs):
         msc: MinecraftServerController = context.bot_data["msc"]
-        if not msc.is_running:
+        with span("liveness"):
+            running = msc.is_running
+        if not running:
             await context.bot.send_message(
                 chat_id=update.effective_chat.id,
                 text="🔴 Server is not running. Please start it first with /start."
@@ -72,6 +127,18 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
         "/cmd      \\- Executes a command on the server \\(e\\.g\\., `/cmd say Hello`\\)\n"
         "/kick     \\- Kicks a player \\(e\\.g\\., `/kick Notch`\\)\n"
         "/op       \\- Grants operator status to a player \\(e\\.g\\., `/op Notch`\\)\n"
+        "/backup   \\- Creates an incremental world backup\n"
+        "/schedule \\- Lists scheduled jobs, `/schedule run <name>` runs one now\n"
+        "/whitelist \\- Lists the whitelisted players\n"
+        "/ops      \\- Lists the operators\n"
+        "/props    \\- Shows server\\.properties values \\(e\\.g\\., `/props view`\\)\n"
+        "/sync     \\- Syncs whitelist, ops or bans from the config or an uploaded file\n"
+        "/subscribe \\- Shows or changes this chat's notification topics\n"
+        "/unsubscribe \\- Stops notifications of the given topics\n"
+        "/perf     \\- Shows command latencies and the slowest recent requests\n"
+        "/stats    \\- Shows player statistics, `/stats <player>` or `/stats export`\n"
+        "/pregen   \\- Chunk pre\\-generation progress, `/pregen start <radius> [world]`, `pause`, `resume`, `cancel`\n"
+        "/logs     \\- Log archive status, `/logs compress` or `/logs search <player|text>`\n"
         "/exit     \\- Stops the server and the bot"
     )
     await context.bot.send_message(
@@ -106,6 +173,54 @@ async def server_status_command(update: Update, context: ContextTypes.DEFAULT_TY
     status_text = _create_status_message(msc, state_manager)
     await context.bot.send_message(chat_id=update.effective_chat.id, text=status_text, parse_mode='MarkdownV2')
 
+# --- Server Lifecycle Helpers (shared with scheduled jobs) ---
+
+def start_log_watcher(bot_data: dict):
+    """Starts watching the server log, feeding parsed events and raw lines to their consumers."""
+    config: AppConfig = bot_data["config"]
+    error_aggregator: Optional[ErrorAggregator] = bot_data.get("error_aggregator")
+    line_listeners = [error_aggregator.feed_line] if error_aggregator else []
+    return start_watching(str(config.mc.full_log_path), bot_data["state_manager"], line_listeners,
+                          store=bot_data.get("store"))
+
+async def start_server(bot_data: dict) -> None:
+    """Launches the server and starts watching its log file."""
+    msc: MinecraftServerController = bot_data["msc"]
+
+    # The sleep listener holds the game port while the server is idle-stopped
+    idle_monitor: Optional[IdleMonitor] = bot_data.get("idle_monitor")
+    if idle_monitor:
+        await idle_monitor.cancel_sleep()
+
+    await asyncio.to_thread(msc.start)
+    if bot_data.get("watchdog_observer") is None:
+        bot_data["watchdog_observer"] = start_log_watcher(bot_data)
+
+async def stop_server(bot_data: dict, progress: Optional[ProgressCallback] = None) -> StopResult:
+    """Runs the graceful stop pipeline, then stops the log watcher."""
+    stop_pipeline: StopPipeline = bot_data["stop_pipeline"]
+    # The watcher keeps running until the end, the pipeline waits for the shutdown log lines
+    result = await stop_pipeline.run(progress)
+
+    observer = bot_data.get("watchdog_observer")
+    if observer and result.success:
+        stop_watching(observer)
+        bot_data["watchdog_observer"] = None
+        error_aggregator: Optional[ErrorAggregator] = bot_data.get("error_aggregator")
+        if error_aggregator:
+            # The last lines of the server may end with an error or its stack trace
+            error_aggregator.flush()
+    return result
+
+def _format_stop_result(result: StopResult) -> str:
+    """Helper function to describe the outcome of the stop pipeline."""
+    if not result.success:
+        return f"❌ The server is still running after {result.duration:.1f}s. Check logs for details."
+    text = f"✅ Server stopped in {result.duration:.1f}s."
+    if result.escalation:
+        text += f" It had to be forced down with {result.escalation}."
+    return text
+
 @user_is_whitelisted
 async def server_start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Starts the Minecraft server."""
@@ -115,29 +230,23 @@ async def server_start_command(update: Update, context: ContextTypes.DEFAULT_TYP
         return
 
     await context.bot.send_message(chat_id=update.effective_chat.id, text="Starting the server...")
-    await asyncio.to_thread(msc.start)
-
-    config: AppConfig = context.bot_data["config"]
-    state_manager: StateManager = context.bot_data["state_manager"]
-    observer = start_watching(str(config.mc.full_log_path), state_manager)
-    context.bot_data["watchdog_observer"] = observer
+    await start_server(context.bot_data)
     context.bot_data["last_chat_id"] = update.effective_chat.id
+    store: BotStore = context.bot_data["store"]
+    store.set("last_chat_id", update.effective_chat.id)
 
 @user_is_whitelisted
 @require_server_running
 async def server_stop_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Stops the Minecraft server."""
-    msc: MinecraftServerController = context.bot_data["msc"]
-    await context.bot.send_message(chat_id=update.effective_chat.id, text="Stopping the server...")
+    chat_id = update.effective_chat.id
+    await context.bot.send_message(chat_id=chat_id, text="Stopping the server...")
 
-    observer = context.bot_data.get("watchdog_observer")
-    if observer:
-        stop_watching(observer)
-        context.bot_data["watchdog_observer"] = None
+    async def progress(message: str):
+        await context.bot.send_message(chat_id=chat_id, text=message)
 
-    success = await asyncio.to_thread(msc.stop)
-    msg = "Server stopped successfully." if success else "Failed to stop the server. Check logs for details."
-    await context.bot.send_message(chat_id=update.effective_chat.id, text=msg)
+    result = await stop_server(context.bot_data, progress)
+    await context.bot.send_message(chat_id=chat_id, text=_format_stop_result(result))
 
 @user_is_whitelisted
 @require_server_running
@@ -204,15 +313,519 @@ async def server_op_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
     else:
         await context.bot.send_message(chat_id=update.effective_chat.id, text=f"❌ Failed to grant operator status to `{escaped_player_name}`\\.", parse_mode='MarkdownV2')
 
+def _format_sync_result(result: SyncResult) -> str:
+    """Formats the summary of a player list sync as plain text."""
+    title = result.player_list.value.capitalize()
+    if not result.changed and not result.failed and not result.invalid:
+        return f"✅ {title}: already up to date ({result.unchanged} players)."
+    lines = [f"✅ {title}: +{len(result.added)} / -{len(result.removed)}, {result.unchanged} unchanged."]
+    if result.added:
+        lines.append(f"Added: {', '.join(result.added)}")
+    if result.removed:
+        lines.append(f"Removed: {', '.join(result.removed)}")
+    if result.failed:
+        lines.append(f"⚠️ Failed: {', '.join(result.failed)}")
+    if result.invalid:
+        lines.append(f"⚠️ Invalid names skipped: {', '.join(result.invalid)}")
+    return "\n".join(lines)
+
+@user_is_whitelisted
+@require_server_running
+async def sync_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Syncs the whitelist, ops or bans with a desired list, sending only the needed commands.
+    The list comes from an uploaded file captioned '/sync <list>' (or a reply to one),
+    otherwise from the [player_lists] section of the config.
+    """
+    config: AppConfig = context.bot_data["config"]
+    player_list_sync: PlayerListSync = context.bot_data["player_list_sync"]
+    message = update.effective_message
+    chat_id = update.effective_chat.id
+    # Commands in a caption do not fill context.args
+    args = context.args if context.args is not None else (message.caption or "").split()[1:]
+
+    names = [p.value for p in PlayerList]
+    if args and args[0] not in names:
+        await context.bot.send_message(chat_id=chat_id, text=f"Unknown list '{args[0]}'. Use one of: {', '.join(names)}.")
+        return
+
+    document = message.document or (message.reply_to_message.document if message.reply_to_message else None)
+    if document:
+        if not args:
+            await context.bot.send_message(chat_id=chat_id, text="Tell me which list the file is for, e.g. caption it with '/sync whitelist'.")
+            return
+        if document.file_size and document.file_size > MAX_SYNC_FILE_SIZE:
+            await context.bot.send_message(chat_id=chat_id, text="❌ The file is too large for a player list.")
+            return
+        try:
+            file = await document.get_file()
+            desired = {PlayerList(args[0]): parse_player_names((await file.download_as_bytearray()).decode("utf-8"))}
+        except (ValueError, KeyError, TypeError) as e:
+            await context.bot.send_message(chat_id=chat_id, text=f"❌ Could not read the player list: {e}")
+            return
+    else:
+        configured = {p: getattr(config.player_lists, p.name.lower()) for p in PlayerList}
+        desired = {p: players for p, players in configured.items()
+                   if players is not None and (not args or p.value == args[0])}
+        if not desired:
+            await context.bot.send_message(
+                chat_id=chat_id,
+                text="Nothing to sync. Upload a file captioned '/sync whitelist|ops|bans' or set lists in the '[player_lists]' section of your 'config.toml'.")
+            return
+
+    for player_list, players in desired.items():
+        result = await player_list_sync.sync(player_list, players, prune=config.player_lists.prune)
+        await context.bot.send_message(chat_id=chat_id, text=_format_sync_result(result))
+
+def _format_player_entries(title: str, entries: list[dict], detail: Optional[Callable[[dict], str]] = None) -> str:
+    """Formats the entries of a player file as a MarkdownV2 list."""
+    if not entries:
+        return f"{title}: *none*"
+    names = sorted(entries, key=lambda e: e.get("name", "").lower())
+    lines = [f"{title} \\({len(entries)}\\):"]
+    for entry in names:
+        suffix = f" \\({escape_markdown(detail(entry), version=2)}\\)" if detail else ""
+        lines.append(f"• `{escape_markdown(entry.get('name', '?'), version=2, entity_type='code')}`{suffix}")
+    return "\n".join(lines)
+
+@user_is_whitelisted
+async def whitelist_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Lists the whitelisted players from whitelist.json, no RCON needed."""
+    server_files: ServerFiles = context.bot_data["server_files"]
+    text = _format_player_entries("📜 *Whitelisted players*", server_files.whitelist())
+    await context.bot.send_message(chat_id=update.effective_chat.id, text=text, parse_mode='MarkdownV2')
+
+@user_is_whitelisted
+async def ops_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Lists the operators and their permission level from ops.json, no RCON needed."""
+    server_files: ServerFiles = context.bot_data["server_files"]
+    text = _format_player_entries("🛡️ *Operators*", server_files.ops(), lambda e: f"level {e.get('level', '?')}")
+    await context.bot.send_message(chat_id=update.effective_chat.id, text=text, parse_mode='MarkdownV2')
+
+@user_is_whitelisted
+async def props_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Shows server.properties values, '/props <key>...' shows specific (or prefix matching) keys."""
+    server_files: ServerFiles = context.bot_data["server_files"]
+    properties = server_files.properties()
+    if not properties:
+        await context.bot.send_message(chat_id=update.effective_chat.id, text="Could not find a 'server.properties' in the server directory.")
+        return
+
+    if context.args:
+        keys = [k for k in properties if any(k.startswith(arg.lower()) for arg in context.args)]
+    else:
+        keys = [k for k in DEFAULT_PROPERTIES if k in properties]
+    # Never leak credentials like the RCON password into a chat
+    keys = [k for k in keys if "password" not in k and "secret" not in k]
+    if not keys:
+        await context.bot.send_message(chat_id=update.effective_chat.id, text="No matching properties.")
+        return
+
+    lines = ["⚙️ *server\\.properties*"]
+    for key in keys:
+        lines.append(f"`{escape_markdown(key, version=2, entity_type='code')}` \\= "
+                     f"`{escape_markdown(properties[key], version=2, entity_type='code')}`")
+    await context.bot.send_message(chat_id=update.effective_chat.id, text="\n".join(lines), parse_mode='MarkdownV2')
+
+def _parse_topics(args: list[str]) -> tuple[set[Topic], list[str]]:
+    """Returns the topics named in 'args' ('all' for every topic) and the unknown names."""
+    topics, unknown = set(), []
+    for arg in args:
+        name = arg.lower()
+        if name == "all":
+            topics.update(Topic)
+        elif name in {t.value for t in Topic}:
+            topics.add(Topic(name))
+        else:
+            unknown.append(arg)
+    return topics, unknown
+
+def _format_subscriptions(topics: set[Topic]) -> str:
+    lines = ["🔔 Notifications for this chat:"]
+    for topic in Topic:
+        lines.append(f"{'✅' if topic in topics else '▫️'} {topic.value}")
+    lines.append("\nChange them with /subscribe <topic...> or /unsubscribe <topic...> ('all' for every topic).")
+    return "\n".join(lines)
+
+@user_is_whitelisted
+async def subscribe_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Shows this chat's notification topics, or subscribes it to the given ones."""
+    subscriptions: SubscriptionStore = context.bot_data["subscriptions"]
+    chat_id = update.effective_chat.id
+    topics, unknown = _parse_topics(context.args)
+    if unknown:
+        await context.bot.send_message(chat_id=chat_id, text=f"Unknown topic(s): {', '.join(unknown)}. "
+                                                             f"Available: {', '.join(t.value for t in Topic)}, all.")
+        return
+    current = subscriptions.subscribe(chat_id, topics) if topics else subscriptions.topics(chat_id)
+    await context.bot.send_message(chat_id=chat_id, text=_format_subscriptions(current))
+
+@user_is_whitelisted
+@require_args(1, "Please name the topics to unsubscribe from\\. Example: `/unsubscribe chat players`")
+async def unsubscribe_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Unsubscribes this chat from the given notification topics."""
+    subscriptions: SubscriptionStore = context.bot_data["subscriptions"]
+    chat_id = update.effective_chat.id
+    topics, unknown = _parse_topics(context.args)
+    if unknown:
+        await context.bot.send_message(chat_id=chat_id, text=f"Unknown topic(s): {', '.join(unknown)}. "
+                                                             f"Available: {', '.join(t.value for t in Topic)}, all.")
+        return
+    await context.bot.send_message(chat_id=chat_id, text=_format_subscriptions(subscriptions.unsubscribe(chat_id, topics)))
+
+def _format_bytes(num: float) -> str:
+    """Formats a byte count in a human readable unit."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(num) < 1024:
+            return f"{num:.1f} {unit}"
+        num /= 1024
+    return f"{num:.1f} TB"
+
+def get_backup_engine(bot_data: dict) -> "BackupEngine":
+    """Returns the backup engine, created on first use."""
+    if bot_data.get("backup_engine") is None:
+        from ..backup.engine import BackupEngine
+        config: AppConfig = bot_data["config"]
+        bot_data["backup_engine"] = BackupEngine(config.backup, bot_data["msc"])
+    return bot_data["backup_engine"]
+
+def get_log_archiver(bot_data: dict) -> "LogArchiver":
+    """Returns the log archiver, created on first use."""
+    if bot_data.get("log_archiver") is None:
+        from ..server_log.archive import LogArchiver
+        config: AppConfig = bot_data["config"]
+        bot_data["log_archiver"] = LogArchiver(config.log_archive, config.mc.full_log_path.parent)
+    return bot_data["log_archiver"]
+
+def run_in_background(bot_data: dict, coro, name: str) -> asyncio.Task:
+    """
+    Runs a long command (backups, jobs) in its own task, so other updates are handled meanwhile.
+    The task reports back itself and is cancelled when the bot shuts down.
+    """
+    tasks: set[asyncio.Task] = bot_data["background_tasks"]
+    # Started from an empty context, so it does not add spans to the trace of the finished handler
+    task = contextvars.Context().run(asyncio.create_task, coro, name=name)
+    tasks.add(task)
+    task.add_done_callback(tasks.discard)
+    return task
+
+@user_is_whitelisted
+async def server_backup_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Starts an incremental backup of the world folders and reports when it is done."""
+    maintenance_lock: asyncio.Lock = context.bot_data["maintenance_lock"]
+    if maintenance_lock.locked():
+        await context.bot.send_message(chat_id=update.effective_chat.id, text="⏳ Another maintenance task (backup or restart) is running.")
+        return
+    await context.bot.send_message(chat_id=update.effective_chat.id, text="💾 Starting backup...")
+    run_in_background(context.bot_data, _run_backup(context, update.effective_chat.id), "backup")
+
+async def _run_backup(context: ContextTypes.DEFAULT_TYPE, chat_id: int) -> None:
+    from ..backup.engine import BackupInProgressError
+    backup_engine = get_backup_engine(context.bot_data)
+    maintenance_lock: asyncio.Lock = context.bot_data["maintenance_lock"]
+    # Checked again now that the task runs, a restart may have started since the command.
+    # Nothing is awaited between the check and acquiring it, so the backup never queues behind it
+    if maintenance_lock.locked():
+        await context.bot.send_message(chat_id=chat_id, text="⏳ Another maintenance task (backup or restart) is running.")
+        return
+    try:
+        async with maintenance_lock:
+            result = await asyncio.to_thread(backup_engine.run)
+    except BackupInProgressError:
+        await context.bot.send_message(chat_id=chat_id, text="⏳ A backup is already running.")
+        return
+    except Exception as e:
+        logger.exception(f"Backup failed: {e}")
+        await context.bot.send_message(chat_id=chat_id, text="❌ Backup failed. Check logs for details.")
+        return
+
+    ratio = "∞" if result.dedup_ratio == float("inf") else f"{result.dedup_ratio:.1f}x"
+    text = (
+        f"✅ Backup `{escape_markdown(result.snapshot, version=2)}` finished\\.\n\n"
+        f"📁 Files changed: {result.files_changed}/{result.files_total}\n"
+        f"📦 Copied: {escape_markdown(_format_bytes(result.bytes_copied), version=2)} "
+        f"of {escape_markdown(_format_bytes(result.bytes_total), version=2)}\n"
+        f"⏱️ Time taken: {escape_markdown(f'{result.duration:.1f}s', version=2)}\n"
+        f"🔁 Dedup ratio: {escape_markdown(ratio, version=2)}"
+    )
+    if result.pruned:
+        text += f"\n🧹 Pruned snapshots: {len(result.pruned)}"
+    await context.bot.send_message(chat_id=chat_id, text=text, parse_mode='MarkdownV2')
+
+@user_is_whitelisted
+async def schedule_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Lists the scheduled jobs, or triggers one with '/schedule run <name>'."""
+    scheduler: Optional[Scheduler] = context.bot_data["scheduler"]
+    jobs = scheduler.jobs if scheduler else {}
+
+    if len(context.args) >= 2 and context.args[0] == "run":
+        job_name = context.args[1]
+        escaped_job_name = escape_markdown(job_name, version=2)
+        if job_name not in jobs:
+            await context.bot.send_message(chat_id=update.effective_chat.id, text=f"❌ Unknown job `{escaped_job_name}`\\.", parse_mode='MarkdownV2')
+            return
+
+        await context.bot.send_message(chat_id=update.effective_chat.id, text=f"▶️ Running job `{escaped_job_name}`\\.\\.\\.", parse_mode='MarkdownV2')
+        run_in_background(context.bot_data, _run_job(context, update.effective_chat.id, scheduler, job_name),
+                          f"job:{job_name}")
+        return
+
+    if not jobs:
+        await context.bot.send_message(chat_id=update.effective_chat.id, text="No jobs are scheduled. Add them to the '[schedule]' section of your 'config.toml'.")
+        return
+
+    lines = ["🗓️ *Scheduled jobs:*\n"]
+    for job in jobs.values():
+        last_run = job.last_run.strftime("%Y-%m-%d %H:%M") if job.last_run else "never"
+        details = (f"{job.config.action}, cron '{job.cron}'\n"
+                   f"   next: {job.next_run.strftime('%Y-%m-%d %H:%M')}, last: {last_run}"
+                   f"{f' ({job.last_result})' if job.last_result else ''}"
+                   f"{', running' if job.running else ''}")
+        lines.append(f"• *{escape_markdown(job.name, version=2)}* \\- {escape_markdown(details, version=2)}")
+    lines.append("\nRun a job now with `/schedule run <name>`\\.")
+    await context.bot.send_message(chat_id=update.effective_chat.id, text="\n".join(lines), parse_mode='MarkdownV2')
+
+async def _run_job(context: ContextTypes.DEFAULT_TYPE, chat_id: int, scheduler: "Scheduler", job_name: str) -> None:
+    from ..scheduler.scheduler import JobBusyError
+    try:
+        result = await scheduler.trigger(job_name)
+    except JobBusyError as e:
+        await context.bot.send_message(chat_id=chat_id, text=f"⏳ {e}")
+        return
+    except Exception as e:
+        logger.exception(f"Job '{job_name}' failed: {e}")
+        await context.bot.send_message(chat_id=chat_id, text=f"❌ Job '{job_name}' failed. Check logs for details.")
+        return
+    await context.bot.send_message(chat_id=chat_id, text=f"Job '{job_name}' finished: {result}")
+
+def _format_perf_report(store: TraceStore) -> str:
+    """Renders per-command percentiles and the slowest traces as a monospace block."""
+    summary = store.summary()
+    if not summary:
+        return "No requests have been traced yet\\."
+
+    lines = [f"{'command':<10} {'n':>5} {'p50':>7} {'p95':>7} {'p99':>7}"]
+    for command, stats in sorted(summary.items(), key=lambda item: item[1]["p95"], reverse=True):
+        lines.append(f"{command:<10} {stats['count']:>5} {stats['p50'] * 1000:>5.0f}ms "
+                     f"{stats['p95'] * 1000:>5.0f}ms {stats['p99'] * 1000:>5.0f}ms")
+
+    lines.append("\nSlowest recent requests:")
+    for trace in store.slowest(5):
+        error = " (error)" if trace.error else ""
+        lines.append(f"/{trace.command} {trace.duration * 1000:.0f}ms at {trace.started_at.strftime('%H:%M:%S')}{error}")
+        for s in trace.spans:
+            lines.append(f"  +{s.offset * 1000:>5.0f}ms {s.name} {s.duration * 1000:.0f}ms")
+    return "```\n" + "\n".join(lines) + "\n```"
+
+@user_is_whitelisted
+async def perf_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Shows handler latency percentiles and the slowest recent requests with their spans."""
+    await context.bot.send_message(chat_id=update.effective_chat.id, text=_format_perf_report(TRACE_STORE), parse_mode='MarkdownV2')
+
+# Heatmap cells from no activity to the busiest hour
+_HEAT_LEVELS = " ░▒▓█"
+_WEEKDAYS = ("Mo", "Tu", "We", "Th", "Fr", "Sa", "Su")
+
+def _format_duration(seconds: float) -> str:
+    hours, minutes = divmod(int(seconds) // 60, 60)
+    return f"{hours}h {minutes:02d}m" if hours else f"{minutes}m"
+
+def _format_heatmap(heatmap: list[list[int]]) -> list[str]:
+    """Renders events per weekday and hour as one row of shaded cells per weekday."""
+    busiest = max(max(row) for row in heatmap)
+    lines = ["    0     6     12    18"]
+    for weekday, row in zip(_WEEKDAYS, heatmap):
+        cells = "".join(_HEAT_LEVELS[0 if not n else 1 + (n * (len(_HEAT_LEVELS) - 2)) // busiest] for n in row)
+        lines.append(f"{weekday}  {cells}")
+    return lines
+
+def _format_stats_overview(overview: dict) -> str:
+    """Renders the /stats overview as a monospace block."""
+    peak_date = date.fromtimestamp(overview["peak_at"]).isoformat() if overview["peak_at"] else "-"
+    lines = [f"Online now: {overview['online']}, peak today: {overview['peak_today']}, "
+             f"last 24h: {overview['peak_24h']}, all time: {overview['peak_all_time']} ({peak_date})",
+             f"Joins, chats and commands today: {overview['events_today']}, last 24h: {overview['events_24h']}"]
+
+    if overview["top_players"]:
+        lines.append("\nTop players by online time:")
+        for name, online_seconds, stats in overview["top_players"]:
+            lines.append(f"{name:<16} {_format_duration(online_seconds):>8} {stats.joins:>4} joins "
+                         f"{stats.chats:>5} chats {stats.commands:>4} cmds")
+    if overview["top_commands"]:
+        lines.append("\nTop commands:")
+        lines.extend(f"/{name:<15} {count:>6}" for name, count in overview["top_commands"])
+    if any(any(row) for row in overview["heatmap"]):
+        lines.append("\nActivity by weekday and hour:")
+        lines.extend(_format_heatmap(overview["heatmap"]))
+    # Inside a code block only ` and \ need escaping
+    text = "\n".join(lines).replace("\\", "\\\\").replace("`", "\\`")
+    return "📊 *Player statistics*\n```\n" + text + "\n```"
+
+@user_is_whitelisted
+async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Shows player statistics, '/stats <player>' for one player, '/stats export' sends them as JSON."""
+    activity: ActivityStats = context.bot_data["activity"]
+    chat_id = update.effective_chat.id
+    if not context.args:
+        await context.bot.send_message(chat_id=chat_id, text=_format_stats_overview(activity.overview()),
+                                       parse_mode='MarkdownV2')
+        return
+
+    if context.args[0].lower() == "export":
+        data = json.dumps(activity.export(), separators=(",", ":")).encode()
+        await context.bot.send_document(chat_id=chat_id, document=io.BytesIO(data),
+                                        filename=f"activity-{date.today().isoformat()}.json",
+                                        caption="Hourly and daily series, heatmap, player and command counters.")
+        return
+
+    result = activity.player(context.args[0])
+    if result is None:
+        await context.bot.send_message(chat_id=chat_id, text=f"No statistics for '{context.args[0]}' yet.")
+        return
+    name, stats, online_seconds, online = result
+    await context.bot.send_message(
+        chat_id=chat_id,
+        text=f"📊 {name}{' (online)' if online else ''}\n"
+             f"Online time: {_format_duration(online_seconds)}\n"
+             f"Joins: {stats.joins}, chat messages: {stats.chats}, commands: {stats.commands}")
+
+def _format_pregen_status(pregen: PregenOrchestrator) -> str:
+    """Describes the pre-generation task, its progress and the estimated time left."""
+    progress = pregen.progress
+    if pregen.state == PregenState.IDLE or progress is None:
+        return "No pre-generation task. Start one with /pregen start <radius> [world]."
+    if pregen.state == PregenState.DONE:
+        return f"✅ Pre-generation of '{progress.world}' is done: {progress.chunks:,} chunks."
+
+    lines = [f"🗺️ Pre-generation of '{progress.world}': {pregen.state.value}"
+             + (f" ({pregen.pause_reason})" if pregen.pause_reason else ""),
+             f"Progress: {progress.percent:.2f}% ({progress.chunks:,} chunks)"]
+    if pregen.state == PregenState.RUNNING and progress.rate:
+        lines.append(f"Rate: {progress.rate:.1f} chunks/s")
+    eta = pregen.eta()
+    if eta is not None:
+        lines.append(f"Time left: {_format_duration(eta)} of generation" + (", plus pauses" if pregen.state == PregenState.PAUSED else ""))
+    if pregen.last_tps is not None:
+        lines.append(f"TPS: {pregen.last_tps:.1f}")
+    return "\n".join(lines)
+
+@user_is_whitelisted
+async def pregen_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Shows the pre-generation progress, or starts, pauses, resumes or cancels it."""
+    pregen: PregenOrchestrator = context.bot_data["pregen"]
+    chat_id = update.effective_chat.id
+    action = context.args[0].lower() if context.args else "status"
+
+    if action == "status":
+        await context.bot.send_message(chat_id=chat_id, text=_format_pregen_status(pregen))
+        return
+    if action not in ("start", "pause", "resume", "cancel"):
+        await context.bot.send_message(chat_id=chat_id, text="Usage: /pregen [start <radius> [world] | pause | resume | cancel]")
+        return
+
+    msc: MinecraftServerController = context.bot_data["msc"]
+    if not await asyncio.to_thread(lambda: msc.is_running):
+        await context.bot.send_message(chat_id=chat_id, text="🔴 Server is not running. Please start it first with /start.")
+        return
+
+    if action == "start":
+        if len(context.args) < 2 or not context.args[1].isdigit():
+            await context.bot.send_message(chat_id=chat_id, text="Please give a radius in blocks, e.g. /pregen start 5000 world")
+            return
+        world = context.args[2] if len(context.args) > 2 else None
+        ok = await pregen.begin(int(context.args[1]), world)
+        text = ("🗺️ Pre-generation started. It pauses while players are online or the TPS drops." if ok
+                else "❌ Could not start the pre-generation. Is Chunky installed?")
+    elif action == "pause":
+        ok = await pregen.pause()
+        text = "⏸️ Pre-generation paused until /pregen resume." if ok else "❌ Could not pause the pre-generation."
+    elif action == "resume":
+        ok = await pregen.resume()
+        text = "▶️ Pre-generation resumed." if ok else "❌ Could not resume the pre-generation."
+    else:
+        ok = await pregen.cancel()
+        text = "🗑️ Pre-generation cancelled." if ok else "❌ Could not cancel the pre-generation."
+    await context.bot.send_message(chat_id=chat_id, text=text)
+
+def _format_archive_report(report: "ArchiveReport") -> str:
+    """Summarizes a log archiver run: disk saved and how much faster a player search became."""
+    if not report.results and not report.failed:
+        return "No rotated logs to recompress."
+    saved = report.bytes_before - report.bytes_after
+    change = (f"saved {_format_bytes(saved)}, {saved / max(report.bytes_before, 1):.0%}" if saved >= 0
+              else f"{_format_bytes(-saved)} larger")
+    lines = [f"🗜️ Recompressed {len(report.results)} logs in {report.duration:.1f}s: "
+             f"{_format_bytes(report.bytes_before)} → {_format_bytes(report.bytes_after)} ({change})"]
+    if report.search_speedup is not None:
+        lines.append(f"🔎 A player search reads {report.blocks_read_fraction:.0%} of the blocks and takes "
+                     f"{1 / report.search_speedup:.0%} of the time of scanning the gzip files "
+                     f"({report.search_speedup:.1f}x speedup).")
+    if report.failed:
+        lines.append(f"❌ Failed: {', '.join(report.failed)}")
+    return "\n".join(lines)
+
+async def _compress_logs(context: ContextTypes.DEFAULT_TYPE, chat_id: int, log_archiver: "LogArchiver") -> None:
+    try:
+        report = await asyncio.to_thread(log_archiver.run)
+    except Exception as e:
+        logger.exception(f"Recompressing the logs failed: {e}")
+        await context.bot.send_message(chat_id=chat_id, text="❌ Recompressing the logs failed. Check logs for details.")
+        return
+    await context.bot.send_message(chat_id=chat_id, text=_format_archive_report(report))
+
+@user_is_whitelisted
+async def logs_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Shows the log archive status, '/logs compress' recompresses rotated logs, '/logs search <term>' searches them."""
+    log_archiver = get_log_archiver(context.bot_data)
+    chat_id = update.effective_chat.id
+    action = context.args[0].lower() if context.args else "status"
+
+    if action == "compress":
+        if log_archiver.is_running:
+            await context.bot.send_message(chat_id=chat_id, text="⏳ The log archiver is already running.")
+            return
+        await context.bot.send_message(chat_id=chat_id, text=f"🗜️ Recompressing {len(log_archiver.pending())} rotated logs...")
+        run_in_background(context.bot_data, _compress_logs(context, chat_id, log_archiver), "compress_logs")
+        return
+
+    archives = await asyncio.to_thread(log_archiver.archives)
+    if action == "search":
+        term = " ".join(context.args[1:])
+        if not term:
+            await context.bot.send_message(chat_id=chat_id, text="Usage: /logs search <player|text>")
+            return
+        # A known player name can use the index, anything else is a text search through every block
+        is_player = any(term.lower() in (p.lower() for b in index.blocks for p in b.players) for _, index in archives)
+        start = time.perf_counter()
+        matches, blocks_read, blocks_total = await asyncio.to_thread(
+            log_archiver.search, player=term if is_player else None, text=None if is_player else term)
+        duration = time.perf_counter() - start
+        lines = [f"[{day}] {line}" for day, line in matches] or ["No matches."]
+        lines.append(f"\nRead {blocks_read} of {blocks_total} blocks in {duration * 1000:.0f}ms.")
+        # Trimmed before escaping to stay below Telegram's message length, inside a code block only ` and \ need escaping
+        text = "\n".join(lines)[-3500:].replace("\\", "\\\\").replace("`", "\\`")
+        await context.bot.send_message(chat_id=chat_id, text=f"```\n{text}\n```", parse_mode='MarkdownV2')
+        return
+
+    size = sum(index.size for _, index in archives)
+    source_size = sum(index.source_size for _, index in archives)
+    lines = [f"🗂️ {len(archives)} archived logs, {_format_bytes(size)} (were {_format_bytes(source_size)} as gzip), "
+             f"{len(log_archiver.pending())} rotated logs pending."]
+    if log_archiver.last_report:
+        lines.append(_format_archive_report(log_archiver.last_report))
+    await context.bot.send_message(chat_id=chat_id, text="\n".join(lines))
+
 @user_is_whitelisted
 async def server_exit_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Stops the bot and the server gracefully."""
     logger.info("Received /exit command. Initiating graceful shutdown.")
     await context.bot.send_message(chat_id=update.effective_chat.id, text="Shutting down the bot and server...")
     
-    # Stop the Minecraft server first
-    command_service: CommandService = context.bot_data["command_service"]
-    await command_service.stop()
+    # Stop the Minecraft server first and wait until it is really down
+    msc: MinecraftServerController = context.bot_data["msc"]
+    if await asyncio.to_thread(lambda: msc.is_running):
+        result = await stop_server(context.bot_data)
+        await context.bot.send_message(chat_id=update.effective_chat.id, text=_format_stop_result(result))
 
     # Signal the main loop to exit
     shutdown_event: asyncio.Event = context.bot_data.get("shutdown_event")
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import logging
+import threading
+from enum import Enum
+from pathlib import Path
+from typing import Iterable, Optional
+
+from telegram import Bot
+from telegram.error import Forbidden, TelegramError
+
+from ..config_models import NotificationsConfig
+
+logger = logging.getLogger(__name__)
+
+
+class Topic(Enum):
+    """What a chat can subscribe to."""
+    SERVER = "server"  # Ready, stopping, crashes, idle stops
+    PLAYERS = "players"  # Joins and leaves
+    ERRORS = "errors"  # Server error digests
+    PERFORMANCE = "performance"  # Lag warnings
+    CHAT = "chat"  # In-game chat
+
+
+class SubscriptionStore:
+    """
+    Which topics each chat is subscribed to, persisted as JSON.
+    Chats without an entry get the configured default topics.
+    """
+
+    def __init__(self, path: Path, default_topics: Iterable[Topic]):
+        self.path = Path(path).resolve()
+        self.default_topics = frozenset(default_topics)
+        self._subscriptions: dict[int, set[Topic]] = self._load()
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict[int, set[Topic]]:
+        if not self.path.exists():
+            return {}
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+            known = {t.value for t in Topic}
+            return {int(chat_id): {Topic(t) for t in topics if t in known} for chat_id, topics in data.items()}
+        except (ValueError, OSError) as e:
+            logger.error(f"Could not read the subscriptions file '{self.path}': {e}")
+            return {}
+
+    def _save(self):
+        data = {str(chat_id): sorted(t.value for t in topics) for chat_id, topics in self._subscriptions.items()}
+        tmp = self.path.with_suffix(".tmp")
+        try:
+            with tmp.open("w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            tmp.replace(self.path)
+        except OSError as e:
+            logger.error(f"Could not write the subscriptions file '{self.path}': {e}")
+
+    def topics(self, chat_id: int) -> set[Topic]:
+        with self._lock:
+            return set(self._subscriptions.get(chat_id, self.default_topics))
+
+    def subscribe(self, chat_id: int, topics: Iterable[Topic]) -> set[Topic]:
+        with self._lock:
+            current = self._subscriptions.setdefault(chat_id, set(self.default_topics))
+            current.update(topics)
+            self._save()
+            return set(current)
+
+    def unsubscribe(self, chat_id: int, topics: Iterable[Topic]) -> set[Topic]:
+        with self._lock:
+            current = self._subscriptions.setdefault(chat_id, set(self.default_topics))
+            current.difference_update(topics)
+            self._save()
+            return set(current)
+
+    def subscribers(self, topic: Topic, chat_ids: Iterable[int]) -> list[int]:
+        """Returns the chats among 'chat_ids' that are subscribed to 'topic'."""
+        with self._lock:
+            return [c for c in chat_ids if topic in self._subscriptions.get(c, self.default_topics)]
+
+
+class Notifier:
+    """
+    Fans a notification out to every allowed chat subscribed to its topic.
+    The text is rendered once by the caller and sent with a bounded number of concurrent requests.
+    """
+
+    def __init__(self, bot: Bot, store: SubscriptionStore, allowed_chat_ids: list[int], max_concurrent_sends: int):
+        self.bot = bot
+        self.store = store
+        self.allowed_chat_ids = allowed_chat_ids
+        self._semaphore = asyncio.Semaphore(max_concurrent_sends)
+
+    async def _send(self, chat_id: int, text: str, parse_mode: Optional[str]) -> bool:
+        async with self._semaphore:
+            try:
+                await self.bot.send_message(chat_id=chat_id, text=text, parse_mode=parse_mode)
+                return True
+            except Forbidden:
+                logger.warning(f"Chat {chat_id} has blocked the bot, skipping the notification.")
+            except TelegramError as e:
+                logger.error(f"Failed to send notification to chat_id {chat_id}: {e}")
+            return False
+
+    async def publish(self, topic: Topic, text: str, parse_mode: Optional[str] = None,
+                      extra_chat_ids: Iterable[int] = ()) -> int:
+        """Sends 'text' to the subscribers of 'topic' (plus 'extra_chat_ids'), returns the number of chats reached."""
+        recipients = self.store.subscribers(topic, self.allowed_chat_ids)
+        recipients += [c for c in extra_chat_ids if c in self.allowed_chat_ids and c not in recipients]
+        if not recipients:
+            return 0
+        results = await asyncio.gather(*(self._send(chat_id, text, parse_mode) for chat_id in recipients))
+        return sum(results)
@@ -0,0 +1,12 @@
+from telegram.request import HTTPXRequest
+
+from ..metrics.tracing import span
+
+
+class TracedHTTPXRequest(HTTPXRequest):
+    """HTTPXRequest that records every Bot API call as a span of the current trace."""
+
+    async def do_request(self, url: str, method: str, *args, **kwargs) -> tuple[int, bytes]:
+        # The endpoint is the last path segment, e.g. .../bot<token>/sendMessage
+        with span(f"telegram:{url.rsplit('/', 1)[-1]}"):
+            return await super().do_request(url, method, *args, **kwargs)
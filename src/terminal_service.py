@@ -1,3 +1,4 @@
+import os
 import subprocess
 
 import logging
@@ -45,4 +46,56 @@ def get_all_running_screens() -> list[str]:
         return running_screens
     except FileNotFoundError:
         logger.error("The 'screen' command was not found. Is it installed on the system?")
-        return []
\ No newline at end of file
+        return []
+
+
+def get_screen_pid(screen_name: str) -> int | None:
+    """
+    Returns the PID of the screen session with the given name, or None if it is not running.
+    """
+    try:
+        result = subprocess.run(["screen", "-ls"], capture_output=True, text=True)
+    except FileNotFoundError:
+        logger.error("The 'screen' command was not found. Is it installed on the system?")
+        return None
+
+    for line in result.stdout.splitlines():
+        if "\t" in line and "." in line:
+            pid_str, _, name = line.strip().split("\t")[0].partition(".")
+            if name == screen_name and pid_str.isdigit():
+                return int(pid_str)
+    return None
+
+
+def quit_screen(screen_name: str) -> bool:
+    """Terminates a screen session and the process running inside of it."""
+    try:
+        result = subprocess.run(["screen", "-S", screen_name, "-X", "quit"], capture_output=True, text=True)
+    except FileNotFoundError:
+        logger.error("The 'screen' command was not found. Is it installed on the system?")
+        return False
+    return result.returncode == 0
+
+
+def pid_exists(pid: int) -> bool:
+    """Checks whether a process with the given PID exists."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # The process exists, but belongs to another user
+        return True
+    return True
+
+
+def get_child_pids(pid: int) -> list[int]:
+    """Returns the PIDs of the direct children of a process (Linux only, via /proc)."""
+    children = []
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                children.extend(int(child) for child in f.read().split())
+    except (FileNotFoundError, ProcessLookupError, PermissionError):
+        pass
+    return children
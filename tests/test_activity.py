@@ -0,0 +1,69 @@
+import json
+
+from src.analytics.activity import ActivityStats, BucketSeries, OTHER_COMMANDS
+from src.config_models import AnalyticsConfig
+from src.server_log.parser import LogPattern
+from src.telegram_bot.handlers import _format_stats_overview
+
+HOUR = 3600
+T0 = 1_700_000_000 // HOUR * HOUR
+
+
+def test_bucket_series_reuses_slots_for_newer_buckets():
+    series = BucketSeries(3)
+    series.add(10, 5)
+    series.add(13)  # Same slot as 10, which is now too old
+
+    assert series.get(10) == (0, 0)
+    assert series.series(13) == ([0, 0, 1], [0, 0, 0])
+
+
+def test_counts_sessions_commands_and_peaks():
+    stats = ActivityStats(AnalyticsConfig())
+    stats.record(LogPattern.USER_LOGIN, {"username": "Steve"}, T0)
+    stats.record(LogPattern.USER_LOGIN, {"username": "Alex"}, T0 + 60)
+    stats.record(LogPattern.USER_COMMAND, {"username": "Steve", "command": "/tp Alex"}, T0 + 120)
+    stats.record(LogPattern.PLAYER_CHAT, {"username": "Alex", "message": "hi"}, T0 + 180)
+    stats.record(LogPattern.USER_LOGOUT, {"username": "Alex"}, T0 + 600)
+
+    overview = stats.overview(now=T0 + 3 * HOUR)
+    assert overview["online"] == 1 and overview["peak_all_time"] == 2
+    assert overview["top_commands"] == [("tp", 1)]
+    assert overview["events_24h"] == 4
+    # Steve is still online, his time counts up to now
+    assert [(name, seconds) for name, seconds, _ in overview["top_players"]] == [("Steve", 3 * HOUR), ("Alex", 540)]
+
+    hourly_events, hourly_peaks = stats.hourly.series(T0 // HOUR + 3)
+    assert hourly_events[-4:] == [4, 0, 0, 0]
+    # Hours without events still see the player who stayed online
+    assert hourly_peaks[-4:] == [2, 1, 1, 1]
+
+
+def test_distinct_commands_are_bounded():
+    stats = ActivityStats(AnalyticsConfig(max_commands=2))
+    for command in ("/a", "/b", "/c", "/d"):
+        stats.record(LogPattern.USER_COMMAND, {"username": "Steve", "command": command}, T0)
+
+    assert stats.commands == {"a": 1, "b": 1, OTHER_COMMANDS: 2}
+
+
+def test_export_round_trips_through_json():
+    stats = ActivityStats(AnalyticsConfig())
+    stats.record(LogPattern.USER_LOGIN, {"username": "Steve"}, T0)
+    stats.record(LogPattern.USER_COMMAND, {"username": "Steve", "command": "home"}, T0 + 30)
+    assert stats.export_if_changed() is not None
+    assert stats.export_if_changed() is None
+
+    restored = ActivityStats(AnalyticsConfig())
+    restored.load(json.loads(json.dumps(stats.export(now=T0 + 60))))
+
+    assert restored.export(now=T0 + 60) == stats.export(now=T0 + 60)
+    assert restored.player("steve")[1].commands == 1
+
+
+def test_overview_renders_heatmap():
+    stats = ActivityStats(AnalyticsConfig())
+    stats.record(LogPattern.USER_LOGIN, {"username": "Steve"}, T0)
+
+    text = _format_stats_overview(stats.overview(now=T0))
+    assert "Activity by weekday and hour" in text and "█" in text
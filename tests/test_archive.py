@@ -0,0 +1,71 @@
+import gzip
+import lzma
+
+from src.config_models import LogArchiveConfig
+from src.server_log.archive import ArchiveIndex, LogArchiver, index_path, recompress_archive, search_archive
+from src.server_log.parser import LogPattern
+
+
+def write_rotated_log(logs_dir, name, players_by_hour):
+    """Writes a small gzip log. It is too small and repetitive to compress better, so tests do not compare sizes."""
+    lines = []
+    for hour, player in enumerate(players_by_hour):
+        lines.append(f"[{hour:02d}:00:00] [Server thread/INFO]: {player} joined the game")
+        lines.extend(f"[{hour:02d}:00:{i % 60:02d}] [Server thread/INFO]: Saving chunks for level 'world'" for i in range(200))
+        lines.append(f"[{hour:02d}:30:00] [Server thread/INFO]: <{player}> bye")
+        lines.append(f"[{hour:02d}:30:01] [Server thread/INFO]: {player} left the game")
+    data = ("\n".join(lines) + "\n").encode()
+    path = logs_dir / name
+    with gzip.open(path, "wb") as f:
+        f.write(data)
+    return path, data
+
+
+def test_recompressed_archive_is_indexed_and_still_plain_xz(tmp_path):
+    source, data = write_rotated_log(tmp_path, "2026-10-18-1.log.gz", ["Steve", "Alex", "Steve", "Notch"])
+
+    result = recompress_archive(str(source), block_size=8192, preset=1, delete_source=True)
+
+    archive = tmp_path / "2026-10-18-1.log.xz"
+    assert not source.exists()
+    # The blocks are concatenated xz streams, readable as one file
+    assert lzma.decompress(archive.read_bytes()) == data
+
+    index = ArchiveIndex.load(index_path(archive))
+    assert index.date == "2026-10-18" and len(index.blocks) == result.blocks > 2
+    assert index.blocks[0].offset == 0 and index.blocks[0].first_time == "00:00:00"
+    assert sum(b.length for b in index.blocks) == index.size
+    # Notch only played in the last hour, so most blocks are skipped
+    lines, blocks_read = search_archive(archive, index, player="notch")
+    assert blocks_read < len(index.blocks)
+    assert [line.split(": ", 1)[1] for line in lines] == ["Notch joined the game", "<Notch> bye", "Notch left the game"]
+    assert result.blocks_read is not None and result.indexed_seconds > 0
+
+
+def test_pattern_search_skips_blocks_without_the_event(tmp_path):
+    source, _ = write_rotated_log(tmp_path, "2026-10-18-1.log.gz", ["Steve", "Alex"])
+    recompress_archive(str(source), block_size=4096, preset=1, delete_source=False)
+    archive = tmp_path / "2026-10-18-1.log.xz"
+    index = ArchiveIndex.load(index_path(archive))
+
+    lines, blocks_read = search_archive(archive, index, pattern=LogPattern.PLAYER_CHAT)
+
+    assert len(lines) == 2 and blocks_read < len(index.blocks)
+    assert source.exists()
+
+
+def test_archiver_runs_pending_logs_and_searches_newest_first(tmp_path):
+    sources = [write_rotated_log(tmp_path, name, ["Steve"])[0] for name in ("2026-10-17-1.log.gz", "2026-10-18-1.log.gz")]
+    gzip_size = sum(path.stat().st_size for path in sources)
+    archiver = LogArchiver(LogArchiveConfig(block_size=4096, preset=1, workers=1), tmp_path)
+
+    report = archiver.run()
+
+    assert len(report.results) == 2 and not report.failed
+    assert report.bytes_before == gzip_size
+    assert report.bytes_after == sum(path.stat().st_size for path in tmp_path.glob("*.xz*"))
+    assert archiver.pending() == []
+    matches, blocks_read, blocks_total = archiver.search(player="Steve", limit=4)
+    assert [day for day, _ in matches] == ["2026-10-18"] * 3 + ["2026-10-17"]
+    assert matches[0][1].endswith("Steve left the game")
+    assert blocks_read < blocks_total
@@ -0,0 +1,125 @@
+import os
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from src.backup.engine import BackupEngine, BackupInProgressError, SNAPSHOT_TIME_FORMAT, snapshot_time
+from src.config_models import BackupConfig
+
+
+class FakeController:
+    def __init__(self, server_dir, running=True):
+        self.config = SimpleNamespace(dir=str(server_dir))
+        self.is_running = running
+        self.commands = []
+
+    def run_server_command(self, command):
+        self.commands.append(command)
+        return ""
+
+
+@pytest.fixture
+def world(tmp_path):
+    server_dir = tmp_path / "server"
+    (server_dir / "world" / "region").mkdir(parents=True)
+    (server_dir / "world" / "playerdata").mkdir()
+    (server_dir / "world" / "level.dat").write_bytes(b"level")
+    (server_dir / "world" / "region" / "r.0.0.mca").write_bytes(b"a" * 4096)
+    (server_dir / "world" / "region" / "r.0.1.mca").write_bytes(b"a" * 4096)
+    (server_dir / "world" / "playerdata" / "steve.dat").write_bytes(b"steve")
+    (server_dir / "world" / "session.lock").write_bytes(b"lock")
+    return server_dir
+
+
+def make_engine(tmp_path, server_dir, running=True, **kwargs):
+    config = BackupConfig(target_dir=str(tmp_path / "backups"), workers=1, **kwargs)
+    return BackupEngine(config, FakeController(server_dir, running))
+
+
+def test_backup_coordinates_saving_with_server(tmp_path, world):
+    engine = make_engine(tmp_path, world)
+    engine.run()
+    assert engine.msc.commands == ["save-off", "save-all flush", "save-on"]
+
+
+def test_backup_skips_rcon_when_server_offline(tmp_path, world):
+    engine = make_engine(tmp_path, world, running=False)
+    engine.run()
+    assert engine.msc.commands == []
+
+
+def test_first_backup_deduplicates_identical_content(tmp_path, world):
+    engine = make_engine(tmp_path, world, running=False)
+    result = engine.run()
+
+    assert result.files_total == 4  # session.lock is not part of a snapshot
+    assert result.files_changed == 4
+    assert result.bytes_new == result.bytes_total - 4096  # Both region files share one object
+    assert len(list((tmp_path / "backups" / "objects").glob("*/*.gz"))) == 3
+
+
+def test_second_backup_only_copies_changed_files(tmp_path, world):
+    engine = make_engine(tmp_path, world, running=False)
+    engine.run()
+    (world / "world" / "playerdata" / "steve.dat").write_bytes(b"steve moved")
+
+    result = engine.run()
+
+    assert result.files_changed == 1
+    assert result.bytes_new == len(b"steve moved")
+    assert len(engine.list_snapshots()) == 2
+
+
+def test_touched_but_identical_file_is_not_copied(tmp_path, world):
+    engine = make_engine(tmp_path, world, running=False)
+    engine.run()
+
+    level = world / "world" / "level.dat"
+    os.utime(level, ns=(level.stat().st_atime_ns, level.stat().st_mtime_ns + 10**9))
+    result = engine.run()
+
+    assert result.files_changed == 0
+    assert result.bytes_copied == 0
+
+
+def test_backups_in_the_same_second_get_their_own_snapshot(tmp_path, world):
+    engine = make_engine(tmp_path, world, running=False)
+    first = engine.run()
+    taken = datetime.strptime(first.snapshot, SNAPSHOT_TIME_FORMAT)
+
+    assert engine._new_snapshot_name(taken) == f"{first.snapshot}.1"
+    (engine.snapshot_dir / f"{first.snapshot}.1").mkdir()
+    assert engine._new_snapshot_name(taken) == f"{first.snapshot}.2"
+    assert snapshot_time(f"{first.snapshot}.2") == taken
+
+
+def test_restore_file_roundtrip(tmp_path, world):
+    engine = make_engine(tmp_path, world, running=False)
+    result = engine.run()
+    dest = tmp_path / "restored.dat"
+    engine.restore_file(result.snapshot, "world/playerdata/steve.dat", dest)
+    assert dest.read_bytes() == b"steve"
+
+
+def test_prune_keeps_last_and_daily_snapshots(tmp_path, world):
+    engine = make_engine(tmp_path, world, running=False, keep_last=1, keep_days=2)
+    engine.run()
+    manifest = (engine.snapshot_dir / engine.list_snapshots()[0] / "manifest.json").read_text()
+    os.rename(engine.snapshot_dir / engine.list_snapshots()[0], engine.snapshot_dir / "2026-10-18T01-00-00")
+    for name in ["2026-10-10T01-00-00", "2026-10-17T01-00-00", "2026-10-17T02-00-00"]:
+        (engine.snapshot_dir / name).mkdir()
+        (engine.snapshot_dir / name / "manifest.json").write_text(manifest)
+
+    now = datetime.strptime("2026-10-18T12-00-00", SNAPSHOT_TIME_FORMAT)
+    pruned = engine.prune(now=now)
+
+    assert pruned == ["2026-10-10T01-00-00", "2026-10-17T01-00-00"]
+    assert engine.list_snapshots() == ["2026-10-17T02-00-00", "2026-10-18T01-00-00"]
+
+
+def test_concurrent_backup_is_rejected(tmp_path, world):
+    engine = make_engine(tmp_path, world, running=False)
+    engine._lock.acquire()
+    with pytest.raises(BackupInProgressError):
+        engine.run()
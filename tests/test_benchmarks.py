@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+from mcrcon import MCRcon, MCRconException
+from telegram import Bot
+
+from benchmarks.fakes import FakeRconServer, FakeTelegramAPI, LogTraffic
+from benchmarks.run import compare, run_suite
+from src.server_log.parser import LogParser, LogPattern
+
+
+def test_fake_rcon_reassembles_multi_packet_replies():
+    long_reply = "x" * 10_000
+    with FakeRconServer(responses={"banlist": long_reply}) as server:
+        with MCRcon(server.host, server.password, server.port) as rcon:
+            assert rcon.command("banlist") == long_reply
+            assert rcon.command("list").startswith("There are 0")
+    assert server.commands == ["banlist", "list"]
+
+
+def test_fake_rcon_rejects_wrong_password():
+    with FakeRconServer() as server:
+        with pytest.raises(MCRconException):
+            MCRcon(server.host, "wrong", server.port).connect()
+
+
+def test_traffic_lines_parse_as_expected():
+    traffic = LogTraffic()
+    assert LogParser.parse_line(traffic.line("join"))[0] == LogPattern.USER_LOGIN
+    assert LogParser.parse_line(traffic.line("done"))[0] == LogPattern.SERVER_DONE
+    assert LogParser.parse_line(traffic.line("chat"))[0] == LogPattern.PLAYER_CHAT
+
+
+def test_fake_telegram_api_records_messages():
+    async def scenario():
+        async with FakeTelegramAPI() as api:
+            async with Bot("123456:test", base_url=api.base_url) as bot:
+                message = await bot.send_message(chat_id=42, text="hello")
+            return message, api.sent_messages()
+
+    message, sent = asyncio.run(scenario())
+    assert message.chat.id == 42
+    assert [call.params["text"] for call in sent] == ["hello"]
+
+
+def test_compare_flags_only_regressions_beyond_tolerance():
+    baseline = {"log_lines_per_second": 1000, "notify_p95_ms": 10}
+    assert compare({"log_lines_per_second": 900, "notify_p95_ms": 11}, baseline) == []
+    regressions = compare({"log_lines_per_second": 500, "notify_p95_ms": 20}, baseline)
+    assert len(regressions) == 2
+
+
+def test_quick_suite_produces_all_metrics():
+    results = asyncio.run(run_suite(quick=True))
+    assert set(results) == {"rcon_commands_per_second", "rcon_p99_ms", "log_lines_per_second",
+                            "notify_p50_ms", "notify_p95_ms"}
+    assert all(value > 0 for value in results.values())
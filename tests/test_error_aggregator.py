@@ -0,0 +1,83 @@
+from src.config_models import ErrorsConfig
+from src.server_log.error_aggregator import ErrorAggregator, fingerprint, normalize_message
+from src.server_log.log_watcher import LogFileHandler
+from src.server_log.state_manager import StateManager
+
+
+async def ignore(text):
+    pass
+
+
+def feed_trace(aggregator, message, frames, exception="java.lang.NullPointerException: null"):
+    aggregator.feed_line(f"[12:00:00] [Server thread/ERROR]: {message}")
+    aggregator.feed_line(exception)
+    for frame in frames:
+        aggregator.feed_line(f"at {frame}(Plugin.java:42) ~[plugin.jar:?]")
+
+
+def test_normalization_ignores_changing_values():
+    assert normalize_message("Could not pass event to Foo v1.2 at /10.0.0.1:25565") == \
+        normalize_message("Could not pass event to Foo v1.3 at /10.0.0.7:51234")
+    assert fingerprint("Task #12 failed", ["a.B.c"]) == fingerprint("Task #13 failed", ["a.B.c"])
+    assert fingerprint("Task #12 failed", ["a.B.c"]) != fingerprint("Task #12 failed", ["x.Y.z"])
+
+
+def test_stack_traces_are_grouped_with_their_header():
+    aggregator = ErrorAggregator(ErrorsConfig(), ignore)
+    for i in range(100):
+        feed_trace(aggregator, f"Could not pass event PlayerMoveEvent #{i}", ["com.plugin.Listener.onMove", "org.bukkit.Event.call"])
+    feed_trace(aggregator, "Chunk save failed", ["net.minecraft.Chunk.save"])
+    aggregator.feed_line("[12:00:01] [Server thread/INFO]: Steve joined the game")
+
+    stats = aggregator.snapshot()
+    assert [s.count for s in stats] == [100, 1]
+    assert "NullPointerException" in stats[0].example
+
+
+def test_digest_summarises_the_window_and_marks_types_as_known():
+    aggregator = ErrorAggregator(ErrorsConfig(), ignore)
+    feed_trace(aggregator, "A failed", ["a.A.run"])
+    feed_trace(aggregator, "B failed", ["b.B.run"])
+    feed_trace(aggregator, "B failed", ["b.B.run"])
+
+    first = aggregator.digest(now=aggregator._window_start + 300)
+    assert first.startswith("⚠️ 2 new error types, 3 occurrences in 5 min")
+    assert aggregator.digest(now=aggregator._window_start + 300) is None
+
+    feed_trace(aggregator, "B failed", ["b.B.run"])
+    # Its stack trace may still continue
+    assert aggregator.digest(now=aggregator._pending_updated) is None
+    second = aggregator.digest(now=aggregator._window_start + 300)
+    assert second.startswith("⚠️ 0 new error types, 1 occurrence in")
+
+
+def test_lru_is_bounded():
+    aggregator = ErrorAggregator(ErrorsConfig(max_fingerprints=3), ignore)
+    for name in ("a", "b", "c", "d"):
+        feed_trace(aggregator, "failed", [f"{name}.X.run"])
+    aggregator.flush()
+
+    assert len(aggregator.snapshot()) == 3
+
+
+def test_stack_trace_across_two_batches_is_one_error(tmp_path):
+    log_path = tmp_path / "latest.log"
+    log_path.write_text("")
+    aggregator = ErrorAggregator(ErrorsConfig(), ignore)
+    handler = LogFileHandler(str(log_path), StateManager(), [aggregator.feed_line])
+
+    with log_path.open("a") as f:
+        f.write("[12:00:00] [Server thread/ERROR]: Chunk save failed\n"
+                "java.lang.NullPointerException: null\n")
+    handler.catch_up()
+    aggregator.flush_idle()
+    assert aggregator.snapshot() == []
+
+    with log_path.open("a") as f:
+        f.write("\tat net.minecraft.Chunk.save(Chunk.java:42)\n")
+    handler.catch_up()
+    aggregator.flush_idle(now=aggregator._pending_updated + aggregator.config.trace_idle_timeout)
+
+    [stats] = aggregator.snapshot()
+    assert stats.count == 1 and "NullPointerException" in stats.example
+    assert fingerprint("Chunk save failed", ["net.minecraft.Chunk.save"]) == stats.fingerprint
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import struct
+
+from src.config_models import IdleConfig
+from src.idle import protocol
+from src.idle.idle_monitor import IdleMonitor
+from src.idle.sleep_listener import SleepListener
+from src.server_log.parser import LogPattern
+from src.server_log.state_manager import StateManager
+
+
+class FakeClient:
+    """Speaks just enough of the protocol to ping or join a server."""
+
+    def __init__(self, port):
+        self.port = port
+
+    async def _connect(self, next_state):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        writer.write(protocol.encode_handshake(767, "localhost", self.port, next_state))
+        return reader, writer
+
+    async def ping(self):
+        reader, writer = await self._connect(protocol.STATE_STATUS)
+        writer.write(protocol.encode_packet(protocol.STATUS_PACKET_ID))
+        _, payload = await protocol.read_packet(reader)
+        status = json.loads(protocol.decode_string(payload, 0)[0])
+
+        writer.write(protocol.encode_packet(protocol.PING_PACKET_ID, struct.pack(">q", 1234)))
+        packet_id, pong = await protocol.read_packet(reader)
+        writer.close()
+        return status, packet_id, struct.unpack(">q", pong)[0]
+
+    async def login(self, name):
+        reader, writer = await self._connect(protocol.STATE_LOGIN)
+        writer.write(protocol.encode_packet(protocol.LOGIN_START_PACKET_ID, protocol.encode_string(name) + bytes(16)))
+        packet_id, payload = await protocol.read_packet(reader)
+        writer.close()
+        return packet_id, json.loads(protocol.decode_string(payload, 0)[0])
+
+
+def test_varint_roundtrip():
+    for value in (0, 1, 127, 128, 25565, 2 ** 31 - 1, -1):
+        encoded = protocol.encode_varint(value)
+        assert protocol.decode_varint(encoded) == (value, len(encoded))
+
+
+def test_listener_answers_server_list_ping():
+    async def scenario():
+        listener = SleepListener("127.0.0.1", 0, "Sleeping...", "Wait", on_wake=None)
+        await listener.start()
+        try:
+            return await FakeClient(listener.bound_port).ping()
+        finally:
+            await listener.close()
+
+    status, packet_id, pong = asyncio.run(scenario())
+    assert status["description"]["text"] == "Sleeping..."
+    assert status["version"]["protocol"] == 767
+    assert packet_id == protocol.PING_PACKET_ID
+    assert pong == 1234
+
+
+def test_login_attempt_is_disconnected_and_wakes_the_server():
+    async def scenario():
+        woken_by = []
+        wake_done = asyncio.Event()
+
+        async def on_wake(player_name):
+            woken_by.append(player_name)
+            wake_done.set()
+
+        listener = SleepListener("127.0.0.1", 0, "Sleeping...", "Starting up!", on_wake=on_wake)
+        await listener.start()
+        try:
+            client = FakeClient(listener.bound_port)
+            result = await client.login("Steve")
+            await asyncio.wait_for(wake_done.wait(), 1)
+            return result, woken_by
+        finally:
+            await listener.close()
+
+    (packet_id, message), woken_by = asyncio.run(scenario())
+    assert packet_id == protocol.LOGIN_DISCONNECT_PACKET_ID
+    assert message == {"text": "Starting up!"}
+    assert woken_by == ["Steve"]
+
+
+def test_idle_monitor_stops_after_idle_minutes():
+    class FakeController:
+        is_running = True
+
+    async def scenario():
+        stops = []
+
+        async def stop_server():
+            stops.append(True)
+            return True
+
+        async def noop(*args):
+            pass
+
+        state_manager = StateManager()
+        config = IdleConfig(enabled=True, idle_minutes=10, wake_on_connect=False)
+        monitor = IdleMonitor(config, FakeController(), state_manager, asyncio.Lock(),
+                              stop_server=stop_server, start_server=noop, notify=noop)
+
+        state_manager.update_from_log(LogPattern.USER_LOGIN, {"username": "Steve"})
+        await monitor.check(now=0)
+        state_manager.update_from_log(LogPattern.USER_LOGOUT, {"username": "Steve"})
+        await monitor.check(now=60)  # Timer starts
+        await monitor.check(now=60 + 9 * 60)
+        assert stops == []
+        await monitor.check(now=60 + 10 * 60)
+        return stops
+
+    assert asyncio.run(scenario()) == [True]
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from src.metrics.http_server import MetricsServer
+from src.metrics.registry import MetricsRegistry
+from src.server_log.parser import LogParser, PATTERN_MATCHES, PATTERN_SECONDS, TIMING_SAMPLE_RATE
+
+
+def test_counter_and_gauge_render():
+    registry = MetricsRegistry()
+    counter = registry.counter("lines_total", "Lines.", ("kind",))
+    counter.inc(kind="join")
+    counter.labels(kind="join").inc(2)
+    registry.gauge("players", "Players.").set_function(lambda: 3)
+
+    text = registry.render()
+    assert "# TYPE lines_total counter" in text
+    assert 'lines_total{kind="join"} 3' in text
+    assert "players 3" in text
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value)
+
+    text = registry.render()
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "latency_seconds_count 3" in text
+    assert "latency_seconds_sum 5.55" in text
+
+
+def test_registry_rejects_conflicting_metrics():
+    registry = MetricsRegistry()
+    assert registry.counter("a", "A.") is registry.counter("a", "A.")
+    with pytest.raises(ValueError):
+        registry.gauge("a", "A.")
+    with pytest.raises(ValueError):
+        registry.counter("b", "B.", ("x",)).inc(y="1")
+
+
+def test_parser_counts_matches_per_pattern():
+    before = PATTERN_MATCHES.get(pattern="USER_LOGIN")
+    LogParser.parse_line("[12:59:33] [Server thread/INFO]: Steve joined the game")
+    assert PATTERN_MATCHES.get(pattern="USER_LOGIN") == before + 1
+
+
+def test_parser_samples_pattern_timing():
+    before = PATTERN_SECONDS.get(pattern="USER_LOGIN")
+    for _ in range(TIMING_SAMPLE_RATE):
+        LogParser.parse_line("[12:59:33] [Server thread/INFO]: Steve joined the game")
+    assert PATTERN_SECONDS.get(pattern="USER_LOGIN") > before
+
+
+def test_metrics_endpoint_serves_registry():
+    registry = MetricsRegistry()
+    registry.counter("hits_total", "Hits.").inc()
+
+    async def scenario():
+        server = MetricsServer("127.0.0.1", 0, registry)
+        await server.start()
+        try:
+            responses = []
+            for path in ("/metrics", "/other"):
+                reader, writer = await asyncio.open_connection("127.0.0.1", server.bound_port)
+                writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+                responses.append((await reader.read()).decode())
+                writer.close()
+            return responses
+        finally:
+            await server.stop()
+
+    metrics, not_found = asyncio.run(scenario())
+    assert metrics.startswith("HTTP/1.1 200 OK")
+    assert "hits_total 1" in metrics
+    assert not_found.startswith("HTTP/1.1 404")
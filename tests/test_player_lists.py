@@ -0,0 +1,75 @@
+import asyncio
+import json
+
+from benchmarks.fakes import FakeRconServer
+from src.config_models import ServerConfig
+from src.mc_service.command_models import BanPlayerCommand, WhitelistAddCommand
+from src.mc_service.command_service import CommandService
+from src.mc_service.player_lists import PlayerList, PlayerListSync, diff_players, parse_player_names
+from src.mc_service.server_files import ServerFiles
+from src.mc_service.services import MinecraftServerController
+
+
+def write_list(server_dir, file_name, names):
+    (server_dir / file_name).write_text(json.dumps([{"uuid": "00000000", "name": n} for n in names]))
+
+
+def test_diff_is_case_insensitive_and_keeps_server_spelling():
+    to_add, to_remove, unchanged = diff_players(["Notch", "jeb_"], ["notch", "Alex"])
+    assert to_add == ["Alex"]
+    assert to_remove == ["jeb_"]
+    assert unchanged == 1
+    assert diff_players(["jeb_"], ["Alex"], prune=False)[1] == []
+
+
+def test_parse_player_names_accepts_lines_and_server_json():
+    assert parse_player_names("Notch\n# event guests\nAlex  # late\n\n") == ["Notch", "Alex"]
+    assert parse_player_names('[{"uuid": "x", "name": "Steve"}, "Alex"]') == ["Steve", "Alex"]
+
+
+def test_command_models_build_list_commands():
+    assert WhitelistAddCommand(player_name="Steve").to_command_string() == "whitelist add Steve"
+    assert BanPlayerCommand(player_name="Griefer", reason="tnt").to_command_string() == "ban Griefer tnt"
+
+
+def whitelist_reply(command: str) -> str:
+    _, action, name = command.split()
+    return f"Added {name} to the whitelist" if action == "add" else f"Removed {name} from the whitelist"
+
+
+def test_sync_sends_only_the_difference_in_one_session(tmp_path):
+    write_list(tmp_path, "whitelist.json", ["Notch", "jeb_"])
+
+    with FakeRconServer(responses={"whitelist": whitelist_reply}) as server:
+        config = ServerConfig(dir=str(tmp_path), jar="server.jar", min_gb=1, max_gb=1, screen_name="test",
+                              rcon_host=server.host, rcon_port=server.port, rcon_password=server.password)
+        sync = PlayerListSync(CommandService(MinecraftServerController(config)), ServerFiles(tmp_path))
+        result = asyncio.run(sync.sync(PlayerList.WHITELIST, ["Notch", "Alex", "Steve", "bad name!"]))
+
+    assert server.commands == ["whitelist add Alex", "whitelist add Steve", "whitelist remove jeb_"]
+    assert result.added == ["Alex", "Steve"] and result.removed == ["jeb_"]
+    assert result.unchanged == 1
+    assert result.invalid == ["bad name!"]
+
+
+def test_sync_reports_commands_of_a_failed_session_as_failed(tmp_path):
+    config = ServerConfig(dir=str(tmp_path), jar="server.jar", min_gb=1, max_gb=1, screen_name="test",
+                          rcon_host="127.0.0.1", rcon_port=1, rcon_password="secret")
+    sync = PlayerListSync(CommandService(MinecraftServerController(config)), ServerFiles(tmp_path))
+
+    result = asyncio.run(sync.sync(PlayerList.OPS, ["Notch"]))
+
+    assert result.failed == ["Notch"] and not result.added
+
+
+def test_sync_reports_commands_rejected_by_the_server_as_failed(tmp_path):
+    replies = {"Alex": "Made Alex a server operator", "Typo": "That player does not exist"}
+
+    with FakeRconServer(responses={"op": lambda command: replies[command.split()[1]]}) as server:
+        config = ServerConfig(dir=str(tmp_path), jar="server.jar", min_gb=1, max_gb=1, screen_name="test",
+                              rcon_host=server.host, rcon_port=server.port, rcon_password=server.password)
+        sync = PlayerListSync(CommandService(MinecraftServerController(config)), ServerFiles(tmp_path))
+        result = asyncio.run(sync.sync(PlayerList.OPS, ["Alex", "Typo"]))
+
+    assert result.added == ["Alex"]
+    assert result.failed == ["Typo"]
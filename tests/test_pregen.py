@@ -0,0 +1,119 @@
+import asyncio
+
+from src.config_models import PregenConfig
+from src.mc_service import pregen as pregen_module
+from src.mc_service.pregen import PregenOrchestrator, PregenState, parse_tps
+from src.server_log.parser import LogParser, LogPattern
+from src.server_log.state_manager import StateManager
+
+PROGRESS = ("[15:02:10 INFO]: [Chunky] Task running for world. Processed: {chunks} chunks ({percent}%), "
+            "ETA: 0:05:12, Rate: 120.5 cps, Current: -12, 34")
+
+
+class FakeController:
+    def __init__(self, tps=20.0):
+        self.tps = tps
+        self.stop_requested = False
+        self.sent = []
+
+    def run_server_command(self, command):
+        assert command == "tps"
+        return f"§6TPS from last 1m, 5m, 15m: §a{self.tps}, §a20.0, §a20.0"
+
+    def run_server_commands(self, commands):
+        self.sent.extend(commands)
+        return ["Task started." for _ in commands]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def make_orchestrator(monkeypatch, tps=20.0, **config):
+    clock = FakeClock()
+    monkeypatch.setattr(pregen_module.time, "monotonic", clock.monotonic)
+    state_manager = StateManager()
+    state_manager.update_from_log(LogPattern.SERVER_DONE, {})
+    msc = FakeController(tps)
+    orchestrator = PregenOrchestrator(PregenConfig(cooldown=60, max_cooldown=300, **config), msc, state_manager)
+    state_manager.add_listener(orchestrator.on_log_event)
+    asyncio.run(orchestrator.begin(1000))
+    return orchestrator, msc, state_manager, clock
+
+
+def feed(state_manager, line):
+    state_manager.update_from_log(*LogParser.parse_line(line))
+
+
+def test_parse_tps_handles_color_codes_and_vanilla():
+    assert parse_tps("§6TPS from last 1m, 5m, 15m: §a*20.0, §a19.9, §a19.8") == 20.0
+    assert parse_tps("Unknown or incomplete command") is None
+
+
+def test_overload_warning_cannot_be_faked_in_chat():
+    warning = "Can't keep up! Is the server overloaded? Running 2046ms or 40 ticks behind"
+    assert LogParser.parse_line(f"[15:02:10] [Server thread/WARN]: {warning}")[0] == LogPattern.SERVER_OVERLOADED
+    assert LogParser.parse_line(f"[15:02:10 WARN]: {warning}")[0] == LogPattern.SERVER_OVERLOADED
+    assert LogParser.parse_line(f"[15:02:10] [Server thread/INFO]: <Steve> {warning}")[0] == LogPattern.PLAYER_CHAT
+    assert LogParser.parse_line(f"[15:02:10] [Server thread/INFO]: <Steve> ]: {warning}")[0] == LogPattern.PLAYER_CHAT
+
+
+def test_progress_lines_update_progress_and_eta(monkeypatch):
+    orchestrator, msc, state_manager, clock = make_orchestrator(monkeypatch)
+    assert msc.sent == ["chunky world world", "chunky center 0 0", "chunky radius 1000", "chunky start"]
+
+    feed(state_manager, PROGRESS.format(chunks=100, percent="10,00"))
+    clock.now += 60
+    feed(state_manager, PROGRESS.format(chunks=200, percent="20.00"))
+
+    assert orchestrator.progress.chunks == 200 and orchestrator.progress.percent == 20.0
+    # 10% per minute, 80% to go
+    assert orchestrator.eta() == 480
+
+
+def test_pauses_while_players_are_online(monkeypatch):
+    orchestrator, msc, state_manager, clock = make_orchestrator(monkeypatch)
+
+    feed(state_manager, "[15:00:00 INFO]: Steve joined the game")
+    assert asyncio.run(orchestrator.check()) == "paused"
+    # Chunky confirms the pause in the log, that must not count as a pause from outside
+    feed(state_manager, "[15:00:01 INFO]: [Chunky] Task stopped for world.")
+    assert orchestrator.pause_reason == "1 player online" and not orchestrator.manual_pause
+
+    feed(state_manager, "[15:10:00 INFO]: Steve left the game")
+    assert asyncio.run(orchestrator.check()) == "resumed"
+    assert msc.sent[-2:] == ["chunky pause", "chunky continue"]
+
+
+def test_low_tps_pauses_with_growing_cooldown_and_hysteresis(monkeypatch):
+    orchestrator, msc, state_manager, clock = make_orchestrator(monkeypatch, tps=15.0)
+
+    assert asyncio.run(orchestrator.check()) == "paused"
+    msc.tps = 18.0  # Above min_tps, below resume_tps
+    clock.now += 61
+    assert asyncio.run(orchestrator.check()) is None
+    msc.tps = 20.0
+    assert asyncio.run(orchestrator.check()) == "resumed"
+
+    msc.tps = 15.0
+    assert asyncio.run(orchestrator.check()) == "paused"
+    msc.tps = 20.0
+    clock.now += 61
+    # The second pause in a row lasts twice as long
+    assert asyncio.run(orchestrator.check()) is None
+    clock.now += 60
+    assert asyncio.run(orchestrator.check()) == "resumed"
+
+
+def test_manual_pause_is_not_resumed_automatically(monkeypatch):
+    orchestrator, msc, state_manager, clock = make_orchestrator(monkeypatch)
+
+    asyncio.run(orchestrator.pause())
+    clock.now += 1000
+
+    assert asyncio.run(orchestrator.check()) is None
+    assert orchestrator.state == PregenState.PAUSED
@@ -0,0 +1,93 @@
+import asyncio
+
+from src.config_models import ReconcilerConfig
+from src.mc_service.reconciler import PlayerListReconciler, parse_list_response
+from src.server_log.parser import LogPattern
+from src.server_log.state_manager import StateManager
+
+
+class FakeController:
+    def __init__(self, players):
+        self.players = players
+        self.stop_requested = False
+        self.on_command = None
+
+    def run_server_command(self, command):
+        assert command == "list"
+        if self.on_command:
+            self.on_command()
+        return f"There are {len(self.players)} of a max of 20 players online: {', '.join(self.players)}"
+
+
+def ready_state_manager(*players):
+    state_manager = StateManager()
+    state_manager.update_from_log(LogPattern.SERVER_DONE, {})
+    for player in players:
+        state_manager.update_from_log(LogPattern.USER_LOGIN, {"username": player})
+    return state_manager
+
+
+def make_reconciler(msc, state_manager):
+    config = ReconcilerConfig(min_interval=10, max_interval=40, growth_factor=2, burst_events=2, burst_window=60)
+    reconciler = PlayerListReconciler(config, msc, state_manager)
+    state_manager.add_listener(reconciler.on_log_event)
+    return reconciler
+
+
+def test_parse_list_response():
+    assert parse_list_response("There are 0 of a max of 20 players online: ") == []
+    assert parse_list_response("There are 2 of a max of 20 players online: Steve, Alex") == ["Steve", "Alex"]
+    assert parse_list_response("Unknown command") is None
+
+
+def test_agreement_grows_the_interval_up_to_the_maximum():
+    state_manager = ready_state_manager("Steve", "Alex")
+    reconciler = make_reconciler(FakeController(["Alex", "Steve"]), state_manager)
+
+    results = [asyncio.run(reconciler.check()) for _ in range(4)]
+
+    assert results == [False] * 4
+    assert reconciler.interval == 40
+    assert reconciler.drift_count == 0
+
+
+def test_drift_is_corrected_counted_and_shrinks_the_interval():
+    state_manager = ready_state_manager("Steve", "Ghost")
+    reconciler = make_reconciler(FakeController(["Steve", "Alex"]), state_manager)
+    reconciler.interval = 40
+
+    assert asyncio.run(reconciler.check()) is True
+    assert sorted(state_manager.get_current_state().online_players) == ["Alex", "Steve"]
+    assert reconciler.drift_count == 1
+    assert reconciler.interval == 10
+
+
+def test_join_during_the_round_trip_is_inconclusive():
+    state_manager = ready_state_manager()
+    msc = FakeController([])
+    reconciler = make_reconciler(msc, state_manager)
+    msc.on_command = lambda: state_manager.update_from_log(LogPattern.USER_LOGIN, {"username": "Steve"})
+
+    assert asyncio.run(reconciler.check()) is None
+    assert state_manager.get_current_state().online_players == ["Steve"]
+    assert reconciler.drift_count == 0
+
+
+def test_join_burst_resets_the_interval():
+    state_manager = ready_state_manager()
+    reconciler = make_reconciler(FakeController([]), state_manager)
+    reconciler.interval = 40
+
+    state_manager.update_from_log(LogPattern.USER_LOGIN, {"username": "Steve"})
+    assert reconciler.interval == 40
+    state_manager.update_from_log(LogPattern.USER_LOGIN, {"username": "Alex"})
+    assert reconciler.interval == 10
+
+
+def test_not_ready_server_is_skipped_unless_forced():
+    state_manager = StateManager()
+    reconciler = make_reconciler(FakeController(["Steve"]), state_manager)
+
+    assert asyncio.run(reconciler.check()) is None
+    assert asyncio.run(reconciler.check(force=True)) is True
+    assert state_manager.get_current_state().online_players == ["Steve"]
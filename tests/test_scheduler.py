@@ -0,0 +1,130 @@
+import asyncio
+import json
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from pydantic import ValidationError
+
+from src.config_models import ScheduleConfig
+from src.scheduler.cron import CronExpression
+from src.scheduler.scheduler import JobBusyError, Scheduler
+from src.telegram_bot.handlers import schedule_command
+
+
+def test_cron_every_fifteen_minutes():
+    cron = CronExpression("*/15 * * * *")
+    assert cron.next_after(datetime(2026, 1, 1, 10, 7, 30)) == datetime(2026, 1, 1, 10, 15)
+    assert cron.next_after(datetime(2026, 1, 1, 10, 45)) == datetime(2026, 1, 1, 11, 0)
+
+
+def test_cron_rolls_over_to_next_month_and_year():
+    cron = CronExpression("30 4 1 * *")
+    assert cron.next_after(datetime(2026, 12, 15, 12, 0)) == datetime(2027, 1, 1, 4, 30)
+
+
+def test_cron_weekday_and_alias():
+    # 2026-10-18 is a Sunday
+    assert CronExpression("0 4 * * 1-5").next_after(datetime(2026, 10, 18, 12, 0)) == datetime(2026, 10, 19, 4, 0)
+    assert CronExpression("@weekly").next_after(datetime(2026, 10, 18, 12, 0)) == datetime(2026, 10, 25, 0, 0)
+
+
+@pytest.mark.parametrize("expression", ["* * * *", "61 * * * *", "*/0 * * * *", "a * * * *"])
+def test_cron_rejects_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        CronExpression(expression)
+
+
+def test_schedule_config_validates_jobs():
+    with pytest.raises(ValidationError):
+        ScheduleConfig(jobs=[{"name": "bad", "cron": "nope", "action": "save"}])
+    with pytest.raises(ValidationError):
+        ScheduleConfig(jobs=[{"name": "a", "cron": "@daily", "action": "save"},
+                             {"name": "a", "cron": "@daily", "action": "save"}])
+
+
+def make_scheduler(tmp_path, jobs):
+    config = ScheduleConfig(state_file=str(tmp_path / "state.json"), jobs=jobs)
+    return Scheduler(config, asyncio.Lock())
+
+
+def test_trigger_runs_action_and_persists_last_run(tmp_path):
+    scheduler = make_scheduler(tmp_path, [{"name": "autosave", "cron": "@hourly", "action": "save"}])
+    calls = []
+
+    async def save(job):
+        calls.append(job.name)
+
+    scheduler.register_action("save", save)
+    assert asyncio.run(scheduler.trigger("autosave")) == "ok"
+    assert calls == ["autosave"]
+    assert "autosave" in json.loads((tmp_path / "state.json").read_text())
+
+
+def test_exclusive_jobs_never_overlap(tmp_path):
+    scheduler = make_scheduler(tmp_path, [{"name": "restart", "cron": "@daily", "action": "restart"},
+                                          {"name": "backup", "cron": "@daily", "action": "backup"}])
+
+    async def scenario():
+        restart_started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def restart(job):
+            restart_started.set()
+            await release.wait()
+
+        async def backup(job):
+            raise AssertionError("Backup must not run during a restart")
+
+        scheduler.register_action("restart", restart)
+        scheduler.register_action("backup", backup)
+
+        restart_task = asyncio.create_task(scheduler.trigger("restart"))
+        await restart_started.wait()
+        with pytest.raises(JobBusyError):
+            await scheduler.trigger("backup")
+        release.set()
+        return await restart_task
+
+    assert asyncio.run(scenario()) == "ok"
+
+
+def test_missed_run_is_caught_up_on_start(tmp_path):
+    (tmp_path / "state.json").write_text(json.dumps({"nightly": "2000-01-01T04:00:00"}))
+    scheduler = make_scheduler(tmp_path, [{"name": "nightly", "cron": "0 4 * * *", "action": "save", "catch_up": True},
+                                          {"name": "other", "cron": "0 4 * * *", "action": "save"}])
+    assert scheduler.jobs["nightly"].next_run <= datetime.now()
+    assert scheduler.jobs["other"].next_run > datetime.now()
+
+
+class FakeBot:
+    def __init__(self):
+        self.messages = []
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.messages.append(text)
+
+
+def test_schedule_run_returns_before_the_job_finishes(tmp_path):
+    scheduler = make_scheduler(tmp_path, [{"name": "restart", "cron": "@daily", "action": "restart"}])
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def restart(job):
+            await release.wait()
+
+        scheduler.register_action("restart", restart)
+        bot_data = {"config": SimpleNamespace(bot=SimpleNamespace(allowed_chat_ids=[1])), "scheduler": scheduler,
+                    "background_tasks": set()}
+        context = SimpleNamespace(bot=FakeBot(), bot_data=bot_data, args=["run", "restart"])
+        update = SimpleNamespace(effective_chat=SimpleNamespace(id=1))
+
+        # Returns while the job still runs, so other updates are not held up
+        await asyncio.wait_for(schedule_command(update, context), 1)
+        assert scheduler.jobs["restart"].running and len(context.bot.messages) == 1
+        release.set()
+        await asyncio.gather(*bot_data["background_tasks"])
+        return context.bot.messages
+
+    assert asyncio.run(scenario())[-1] == "Job 'restart' finished: ok"
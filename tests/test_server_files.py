@@ -0,0 +1,78 @@
+import json
+import os
+
+from src.mc_service.server_files import ServerFiles, parse_properties
+from src.server_log.parser import LogParser
+
+
+def test_parse_properties_handles_comments_and_escapes():
+    text = "#Minecraft server properties\nmotd=A \\: B\nmax-players=20\nlevel-seed=\nrcon.password = secret\n"
+    properties = parse_properties(text)
+    assert properties["motd"] == "A : B"
+    assert properties["max-players"] == "20"
+    assert properties["level-seed"] == ""
+    assert properties["rcon.password"] == "secret"
+
+
+def test_files_are_reparsed_only_when_they_change(tmp_path):
+    files = ServerFiles(tmp_path)
+    path = tmp_path / "server.properties"
+    path.write_text("view-distance=10\n")
+
+    assert files.properties()["view-distance"] == "10"
+    assert files.properties()["view-distance"] == "10"
+    assert files._properties.parse_count == 1
+
+    path.write_text("view-distance=12\n")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert files.properties()["view-distance"] == "12"
+    assert files._properties.parse_count == 2
+
+
+def test_missing_and_broken_files(tmp_path):
+    files = ServerFiles(tmp_path)
+    assert files.whitelist() == []
+
+    path = tmp_path / "ops.json"
+    path.write_text(json.dumps([{"uuid": "u1", "name": "Notch", "level": 4}]))
+    assert files.ops()[0]["name"] == "Notch"
+    # A half written file keeps the last good content
+    path.write_text('[{"uuid": "u1", "na')
+    assert files.ops()[0]["name"] == "Notch"
+
+
+def test_uuid_index_prefers_log_events_over_usercache(tmp_path):
+    (tmp_path / "usercache.json").write_text(json.dumps([
+        {"name": "OldName", "uuid": "069a79f4-44e9-4726-a5be-fca90e38aaf5", "expiresOn": "2030-01-01"},
+    ]))
+    files = ServerFiles(tmp_path)
+    assert files.name_for("069A79F4-44E9-4726-A5BE-FCA90E38AAF5") == "OldName"
+
+    event = LogParser.parse_line(
+        "[12:00:00] [User Authenticator #1/INFO]: UUID of player NewName is 069a79f4-44e9-4726-a5be-fca90e38aaf5")
+    files.on_log_event(*event)
+
+    assert files.name_for("069a79f4-44e9-4726-a5be-fca90e38aaf5") == "NewName"
+    assert files.uuid_for("newname") == "069a79f4-44e9-4726-a5be-fca90e38aaf5"
+
+
+def test_uuid_index_is_rebuilt_only_when_its_sources_change(tmp_path):
+    path = tmp_path / "usercache.json"
+    path.write_text(json.dumps([{"name": "Steve", "uuid": "u1"}]))
+    files = ServerFiles(tmp_path)
+
+    files.record_uuid("Steve", "u1")
+    index = files.uuid_index()
+    assert files.uuid_index() is index
+    # Every join logs the UUID again
+    files.record_uuid("Steve", "u1")
+    assert files.uuid_index() is index
+
+    files.record_uuid("Alex", "u2")
+    assert files.name_for("U2") == "Alex"
+    path.write_text(json.dumps([{"name": "Steve", "uuid": "u1"}, {"name": "Notch", "uuid": "u3"}]))
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert files.uuid_for("notch") == "u3"
+    assert files.uuid_index() == {"Steve": "u1", "Notch": "u3", "Alex": "u2"}
@@ -0,0 +1,40 @@
+import asyncio
+import subprocess
+import sys
+import time
+
+from src.metrics.startup import StartupProfile
+
+
+def test_concurrent_phases_overlap_in_the_profile():
+    profile = StartupProfile()
+
+    async def startup():
+        await asyncio.gather(profile.run("telegram:initialize", asyncio.sleep(0.05)),
+                             profile.run("rcon:probe", asyncio.to_thread(time.sleep, 0.05)))
+        profile.mark_ready()
+
+    asyncio.run(startup())
+
+    assert {p.name for p in profile.phases} == {"telegram:initialize", "rcon:probe"}
+    assert all(p.duration >= 0.05 for p in profile.phases)
+    # Run side by side, the bot is ready after about one phase, not the sum of both
+    assert profile.ready_at < 0.095
+
+
+def test_report_lists_phases_in_start_order():
+    profile = StartupProfile(started_at=100.0)
+    profile.record("setup", 100.2, 100.25)
+    profile.record("imports", 100.0, 100.2)
+
+    lines = profile.report().splitlines()
+    assert "imports" in lines[1] and "+     0ms" in lines[1]
+    assert "setup" in lines[2] and "50ms" in lines[2]
+
+
+def test_optional_subsystems_are_not_imported_with_the_bot():
+    # Only needed for commands and jobs, or off by default
+    modules = ["src.backup.engine", "src.scheduler.scheduler", "src.idle.idle_monitor", "src.server_log.archive"]
+    code = f"import sys, src.telegram_bot.core; print([m for m in {modules!r} if m in sys.modules])"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "[]"
@@ -0,0 +1,110 @@
+import asyncio
+import signal
+
+from src.config_models import StopConfig
+from src.mc_service.stop_pipeline import StopPipeline
+from src.server_log.parser import LogParser, LogPattern
+from src.server_log.state_manager import StateManager
+
+
+class FakeController:
+    """Exits after 'stop' unless it hangs, in which case only the given signal helps."""
+
+    def __init__(self, state_manager, hangs_until=None):
+        self.state_manager = state_manager
+        self.hangs_until = hangs_until
+        self.alive = True
+        self.stop_requested = False
+        self.commands = []
+        self.signals = []
+
+    def run_server_command(self, command):
+        self.commands.append(command)
+        return ""
+
+    def stop(self):
+        self.commands.append("stop")
+        self.stop_requested = True
+        if self.hangs_until is None:
+            self.state_manager.update_from_log(LogPattern.SERVER_STOPPING, {})
+            self.state_manager.update_from_log(LogPattern.WORLD_SAVED, {})
+            self.alive = False
+        return "Stopping the server"
+
+    def send_signal(self, sig):
+        self.signals.append(sig)
+        if sig == self.hangs_until:
+            self.alive = False
+        return True
+
+    def process_alive(self):
+        return self.alive
+
+
+def run_pipeline(msc, state_manager):
+    config = StopConfig(stop_timeout=0.05, term_timeout=0.05, kill_timeout=0.05, progress_interval=10)
+    messages = []
+
+    async def progress(message):
+        messages.append(message)
+
+    result = asyncio.run(StopPipeline(config, msc, state_manager).run(progress))
+    return result, messages
+
+
+def test_clean_stop_waits_for_exit_and_resets_state():
+    state_manager = StateManager()
+    state_manager.update_from_log(LogPattern.SERVER_DONE, {})
+    msc = FakeController(state_manager)
+
+    result, _ = run_pipeline(msc, state_manager)
+
+    assert result.success and result.escalation is None
+    assert msc.commands == ["save-all", "stop"]
+    assert list(result.stages) == ["save-all", "stop", "exited"]
+    assert not state_manager.get_current_state().is_ready
+
+
+def test_hanging_server_is_escalated_to_sigterm():
+    state_manager = StateManager()
+    msc = FakeController(state_manager, hangs_until=signal.SIGTERM)
+
+    result, messages = run_pipeline(msc, state_manager)
+
+    assert result.success
+    assert result.escalation == "SIGTERM"
+    assert msc.signals == [signal.SIGTERM]
+    assert any("SIGTERM" in m for m in messages)
+
+
+def test_sigkill_is_the_last_resort():
+    state_manager = StateManager()
+    msc = FakeController(state_manager, hangs_until=signal.SIGKILL)
+
+    result, _ = run_pipeline(msc, state_manager)
+
+    assert result.success
+    assert msc.signals == [signal.SIGTERM, signal.SIGKILL]
+    assert result.escalation == "SIGKILL"
+
+
+def test_unkillable_server_is_reported_as_failure():
+    state_manager = StateManager()
+    msc = FakeController(state_manager, hangs_until="never")
+
+    result, _ = run_pipeline(msc, state_manager)
+
+    assert not result.success
+    assert msc.stop_requested
+
+
+def test_shutdown_lines_cannot_be_faked_in_chat():
+    saved = "ThreadedAnvilChunkStorage: All dimensions are saved"
+    assert LogParser.parse_line("[16:20:00] [Server thread/INFO]: Stopping server")[0] == LogPattern.SERVER_STOPPING
+    assert LogParser.parse_line("[16:20:00 INFO]: Stopping server")[0] == LogPattern.SERVER_STOPPING
+    assert LogParser.parse_line(f"[16:20:01] [Server thread/INFO]: {saved}")[0] == LogPattern.WORLD_SAVED
+    assert LogParser.parse_line(f"[16:20:01 INFO]: {saved}")[0] == LogPattern.WORLD_SAVED
+    for message in ("Stopping server", "]: Stopping server", "All dimensions are saved",
+                    "]: All dimensions are saved", f"]: {saved}"):
+        line = f"[16:20:01] [Server thread/INFO]: <Steve> {message}"
+        assert LogParser.parse_line(line)[0] == LogPattern.PLAYER_CHAT, line
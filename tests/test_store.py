@@ -0,0 +1,96 @@
+import os
+
+from src.server_log.log_watcher import LogFileHandler, can_resume
+from src.server_log.state_manager import StateManager
+from src.storage.store import BotStore
+
+JOIN = "[12:00:00] [Server thread/INFO]: {} joined the game\n"
+LEAVE = "[12:00:00] [Server thread/INFO]: {} left the game\n"
+
+
+def run_bot(store_path, log_path):
+    """Simulates a bot start: a fresh StateManager and handler that catch up from the store."""
+    store = BotStore(store_path)
+    state_manager = StateManager()
+    state_manager.add_listener(store.on_log_event)
+    if store.get("server_state"):
+        state_manager.restore(store.get("server_state"))
+    handler = LogFileHandler(str(log_path), state_manager, store=store)
+    handler.catch_up()
+    return store, state_manager, handler
+
+
+def test_store_uses_wal_and_persists_key_values(tmp_path):
+    store = BotStore(tmp_path / "state.db")
+    store.set("last_chat_id", 42)
+    store.close()
+
+    reopened = BotStore(tmp_path / "state.db")
+    assert reopened.get("last_chat_id") == 42
+    assert reopened._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_restart_resumes_without_missing_or_repeating_lines(tmp_path):
+    log_path = tmp_path / "latest.log"
+    log_path.write_text("[11:59:00] [Server thread/INFO]: Starting minecraft server\n")
+    store, state_manager, handler = run_bot(tmp_path / "state.db", log_path)
+
+    with log_path.open("a") as f:
+        f.write(JOIN.format("Steve") + JOIN.format("Alex"))
+    handler.catch_up()
+    store.close()
+
+    # Written while the bot is down
+    with log_path.open("a") as f:
+        f.write(LEAVE.format("Steve") + JOIN.format("Notch"))
+
+    store, state_manager, handler = run_bot(tmp_path / "state.db", log_path)
+
+    assert sorted(state_manager.get_current_state().online_players) == ["Alex", "Notch"]
+    sessions = store.sessions()
+    assert [s.player for s in sessions] == ["Steve", "Alex", "Notch"]
+    assert [s.left_at is not None for s in sessions] == [True, False, False]
+    assert handler.last_pos == log_path.stat().st_size
+    assert [players for _, players in store.player_snapshots()][-1] == ["Alex", "Notch"]
+
+
+def test_partial_lines_are_read_once_complete(tmp_path):
+    log_path = tmp_path / "latest.log"
+    log_path.write_text("")
+    store, state_manager, handler = run_bot(tmp_path / "state.db", log_path)
+
+    with log_path.open("a") as f:
+        f.write("[12:00:00] [Server thread/INFO]: Ste")
+    handler.catch_up()
+    assert state_manager.get_current_state().online_players == []
+
+    with log_path.open("a") as f:
+        f.write("ve joined the game\n")
+    handler.catch_up()
+    assert state_manager.get_current_state().online_players == ["Steve"]
+
+
+def test_replaced_log_file_is_read_from_the_start(tmp_path):
+    log_path = tmp_path / "latest.log"
+    log_path.write_text(JOIN.format("Steve"))
+    store, _, _ = run_bot(tmp_path / "state.db", log_path)
+    store.set(f"log_position:{os.path.abspath(log_path)}", {"inode": -1, "offset": 10})
+    store.close()
+
+    _, state_manager, handler = run_bot(tmp_path / "state.db", log_path)
+
+    assert state_manager.get_current_state().online_players == ["Steve"]
+
+
+def test_saved_state_only_applies_to_the_same_log_file(tmp_path):
+    log_path = tmp_path / "latest.log"
+    log_path.write_text("")
+    store, _, handler = run_bot(tmp_path / "state.db", log_path)
+    with log_path.open("a") as f:
+        f.write(JOIN.format("Steve"))
+    handler.catch_up()
+    assert can_resume(str(log_path), store)
+
+    store.set(f"log_position:{os.path.abspath(log_path)}", {"inode": -1, "offset": 10})
+    assert not can_resume(str(log_path), store)
+    assert not can_resume(str(tmp_path / "other.log"), store)
@@ -0,0 +1,61 @@
+import asyncio
+
+from telegram.error import Forbidden
+
+from src.telegram_bot.subscriptions import Notifier, SubscriptionStore, Topic
+
+
+class FakeBot:
+    def __init__(self, blocked=()):
+        self.sent = []
+        self.blocked = set(blocked)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def send_message(self, chat_id, text, parse_mode=None):
+        if chat_id in self.blocked:
+            raise Forbidden("bot was blocked by the user")
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        self.sent.append((chat_id, text))
+
+
+def test_store_uses_defaults_and_persists_changes(tmp_path):
+    path = tmp_path / "subscriptions.json"
+    store = SubscriptionStore(path, [Topic.SERVER])
+    assert store.topics(1) == {Topic.SERVER}
+
+    store.subscribe(1, [Topic.CHAT])
+    store.unsubscribe(2, [Topic.SERVER])
+
+    reloaded = SubscriptionStore(path, [Topic.SERVER])
+    assert reloaded.topics(1) == {Topic.SERVER, Topic.CHAT}
+    assert reloaded.topics(2) == set()
+    assert reloaded.subscribers(Topic.SERVER, [1, 2, 3]) == [1, 3]
+
+
+def test_publish_fans_out_to_subscribers_with_bounded_concurrency(tmp_path):
+    store = SubscriptionStore(tmp_path / "s.json", [Topic.SERVER])
+    allowed = list(range(1, 11))
+    store.unsubscribe(10, [Topic.SERVER])
+    bot = FakeBot(blocked={9})
+    notifier = Notifier(bot, store, allowed, max_concurrent_sends=3)
+
+    reached = asyncio.run(notifier.publish(Topic.SERVER, "ready"))
+
+    assert reached == 8
+    assert sorted(chat_id for chat_id, _ in bot.sent) == list(range(1, 9))
+    assert bot.max_in_flight <= 3
+
+
+def test_extra_chats_must_be_allowed_and_are_not_duplicated(tmp_path):
+    store = SubscriptionStore(tmp_path / "s.json", [])
+    store.subscribe(1, [Topic.SERVER])
+    bot = FakeBot()
+    notifier = Notifier(bot, store, [1, 2], max_concurrent_sends=2)
+
+    asyncio.run(notifier.publish(Topic.SERVER, "ready", extra_chat_ids=[1, 2, 666]))
+
+    assert sorted(chat_id for chat_id, _ in bot.sent) == [1, 2]
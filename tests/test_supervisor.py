@@ -0,0 +1,160 @@
+import asyncio
+import os
+from types import SimpleNamespace
+
+from src.config_models import SupervisorConfig
+from src.mc_service.supervisor import ServerSupervisor, summarize_crash_report
+from src.server_log.parser import LogPattern
+from src.server_log.state_manager import StateManager
+
+CRASH_REPORT = """---- Minecraft Crash Report ----
+// Don't be sad, have a hug! <3
+
+Time: 2026-10-18 03:12:44
+Description: Exception in server tick loop
+
+java.lang.OutOfMemoryError: Java heap space
+\tat java.base/java.util.Arrays.copyOf(Arrays.java:3537)
+"""
+
+
+class FakeController:
+    def __init__(self, server_dir):
+        self.config = SimpleNamespace(dir=str(server_dir))
+        self.started_at = None
+        self.stop_requested = False
+        self.alive = True
+        self.is_running = True
+        self.killed = False
+
+    def process_alive(self):
+        return self.alive
+
+    def kill_session(self):
+        self.killed = True
+        self.alive = False
+        return True
+
+
+def make_supervisor(tmp_path, **kwargs):
+    notices, starts = [], []
+    msc = FakeController(tmp_path)
+    state_manager = StateManager()
+    state_manager.update_from_log(LogPattern.SERVER_DONE, {})
+    state_manager.update_from_log(LogPattern.USER_LOGIN, {"username": "Steve"})
+
+    async def start_server():
+        starts.append(True)
+        msc.alive = True
+
+    async def notify(text):
+        notices.append(text)
+
+    config = SupervisorConfig(backoff_base=0.001, backoff_max=0.01, **kwargs)
+    supervisor = ServerSupervisor(config, msc, state_manager, start_server=start_server, notify=notify)
+    return supervisor, msc, state_manager, notices, starts
+
+
+def test_summarize_crash_report(tmp_path):
+    (tmp_path / "crash-reports").mkdir()
+    (tmp_path / "crash-reports" / "crash-2026-10-18_03.12.44-server.txt").write_text(CRASH_REPORT)
+
+    summary = summarize_crash_report(str(tmp_path))
+    assert summary == ("crash-2026-10-18_03.12.44-server.txt\n"
+                       "Description: Exception in server tick loop\n"
+                       "java.lang.OutOfMemoryError: Java heap space")
+
+
+def test_old_crash_reports_are_ignored(tmp_path):
+    (tmp_path / "crash-reports").mkdir()
+    report = tmp_path / "crash-reports" / "crash-old.txt"
+    report.write_text(CRASH_REPORT)
+    os.utime(report, (0, 0))
+    assert summarize_crash_report(str(tmp_path), since=1000) is None
+
+
+def test_crash_resets_state_and_restarts(tmp_path):
+    supervisor, msc, state_manager, notices, starts = make_supervisor(tmp_path)
+
+    async def scenario():
+        await supervisor.check(now=0)  # Arms the supervisor
+        msc.alive = False
+        await supervisor.check(now=10)
+
+    asyncio.run(scenario())
+    assert starts == [True]
+    assert state_manager.get_current_state().online_players == []
+    assert not state_manager.get_current_state().is_ready
+    assert "process disappeared" in notices[0]
+
+
+def test_requested_stop_is_not_a_crash(tmp_path):
+    supervisor, msc, _, notices, starts = make_supervisor(tmp_path)
+
+    async def scenario():
+        await supervisor.check(now=0)
+        msc.stop_requested = True
+        msc.alive = False
+        await supervisor.check(now=10)
+        await supervisor.check(now=20)
+
+    asyncio.run(scenario())
+    assert starts == [] and notices == []
+
+
+def test_server_started_after_a_requested_stop_is_supervised(tmp_path):
+    supervisor, msc, _, notices, starts = make_supervisor(tmp_path)
+
+    async def scenario():
+        await supervisor.check(now=0)
+        msc.stop_requested = True
+        await supervisor.check(now=10)  # Still shutting down
+        assert msc.stop_requested
+        msc.alive = False
+        await supervisor.check(now=20)
+        assert not msc.stop_requested
+        # Started from the console, not through the bot
+        msc.alive = True
+        await supervisor.check(now=30)
+        msc.alive = False
+        await supervisor.check(now=40)
+
+    asyncio.run(scenario())
+    assert starts == [True]
+    assert "process disappeared" in notices[0]
+
+
+def test_hung_rcon_kills_and_restarts(tmp_path):
+    supervisor, msc, _, notices, starts = make_supervisor(tmp_path, rcon_failure_threshold=2)
+
+    async def scenario():
+        await supervisor.check(now=0)
+        msc.is_running = False
+        await supervisor.check(now=10)
+        assert starts == []
+        await supervisor.check(now=20)
+
+    asyncio.run(scenario())
+    assert msc.killed
+    assert starts == [True]
+    assert "RCON" in notices[0]
+
+
+def test_crash_loop_gives_up(tmp_path):
+    supervisor, msc, _, notices, starts = make_supervisor(tmp_path, max_restarts=2, restart_window=600)
+
+    async def scenario():
+        for now in range(0, 300, 100):
+            await supervisor.check(now=now)  # Re-arms after the restart
+            msc.alive = False
+            await supervisor.check(now=now + 1)
+
+    asyncio.run(scenario())
+    assert len(starts) == 2
+    assert "not restarting again" in notices[-1]
+
+
+def test_backoff_is_exponential_and_capped(tmp_path):
+    supervisor = make_supervisor(tmp_path)[0]
+    supervisor.config = SupervisorConfig(backoff_base=10, backoff_max=60)
+    assert [supervisor.backoff_delay(n) for n in range(4)] == [10, 20, 40, 60]
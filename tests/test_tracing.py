@@ -0,0 +1,78 @@
+import asyncio
+import time
+
+import pytest
+
+from src.metrics import tracing
+from src.metrics.tracing import Tracer, TraceStore, percentile, span
+
+
+def test_percentile_uses_nearest_rank():
+    values = sorted(float(i) for i in range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([], 95) == 0.0
+
+
+def test_traced_handler_records_spans_including_threads():
+    store = TraceStore()
+    tracer = Tracer(store)
+
+    def rcon_call():
+        with span("rcon:list"):
+            time.sleep(0.01)
+
+    @tracer.traced("status")
+    async def handler():
+        with span("auth"):
+            pass
+        await asyncio.to_thread(rcon_call)
+
+    asyncio.run(handler())
+
+    [trace] = store.slowest()
+    assert trace.command == "status"
+    assert [s.name for s in trace.spans] == ["auth", "rcon:list"]
+    assert trace.spans[1].duration >= 0.01
+    assert store.summary()["status"]["count"] == 1
+
+
+def test_failing_handler_is_marked_as_error():
+    store = TraceStore()
+
+    @Tracer(store).traced("cmd")
+    async def handler():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(handler())
+    assert store.slowest()[0].error
+
+
+def test_span_outside_a_trace_is_a_no_op():
+    with span("orphan"):
+        pass
+
+
+def test_slow_request_dumps_one_profile(tmp_path, monkeypatch):
+    # Created before the variable is set, like the global tracer before main.py loads the .env file
+    tracer = Tracer(TraceStore())
+    monkeypatch.setenv(tracing.PROFILE_ENV_VAR, "20")
+    monkeypatch.setattr(tracing, "PROFILE_DIR", tmp_path)
+
+    def busy_wait():
+        end = time.perf_counter() + 0.05
+        while time.perf_counter() < end:
+            pass
+
+    @tracer.traced("backup")
+    async def handler():
+        await asyncio.to_thread(busy_wait)
+
+    asyncio.run(handler())
+    asyncio.run(handler())
+
+    dumps = list(tmp_path.iterdir())
+    assert len(dumps) == 1 and tracer.profile_dumped == dumps[0]
+    assert "busy_wait" in dumps[0].read_text()
+    assert not tracer.profiling